@@ -23,10 +23,19 @@ Name             Default     Description
                              it to infinite.
 --offset ...     0           Skip first N tokens from UD file you've specified.
 --confs         config.json Address to file with configurations.
+-profile                     Print time spent in each stage of recognizing at
+                             exit.
 """ # noqa E122
         )
     raise SystemExit
 
+if argv.has("-profile"):
+    import libs.timing as timing
+    import atexit
+
+    timing.enable()
+    atexit.register(lambda: print("\n" + timing.report()))
+
 predef = Predefinator(
     fp=open(
         argv.get("--confs", default="config.json"), encoding="utf-8"
@@ -60,7 +69,7 @@ analyzer = predef.inited(
     )
 )
 
-logger.write(f"Connected to {analyzer.recognizer.collection.name}\n")
+logger.write(f"Connected to {analyzer.recognizer.storage.name}\n")
 
 generator = analyzer.init()
 
@@ -22,10 +22,21 @@ Name             Default     Description
 --offset ...     0           Skip first N sentences from UD file you've
                              specified.
 --confs         config.json Address to file with configurations.
+-profile                     Print time spent in each stage of recognizing at
+                             exit.
+-codec                       Compare features of tokens as packed integers
+                             (see libs/ud/featcodec.py).
 """ # noqa E122
         )
     raise SystemExit
 
+if argv.has("-profile"):
+    import libs.timing as timing
+    import atexit
+
+    timing.enable()
+    atexit.register(lambda: print("\n" + timing.report()))
+
 logger = Logger(
     fp=open(
         argv.get("--logfile", default="ccrlog.md"), mode="a+", encoding="utf-8"
@@ -61,6 +72,11 @@ ctxt = predef.inited(
     )
 )
 
+if argv.has("-codec"):
+    from libs.ud.featcodec import FeatureCodec # noqa E402
+
+    ctxt.useCodec(FeatureCodec())
+
 ctxt.train(
     limit=int(argv.get("--limit", default=0)),
     offset=int(argv.get("--offset", default=0))
@@ -0,0 +1,68 @@
+from libs.params import Params
+from libs.snapshot import RuleSnapshot
+from libs.storage import SQLiteStorage
+from predefinator import Predefinator
+
+
+argv = Params()
+
+if argv.has("?"):
+    print(
+"""
+Use this script to export rules from DB collection into a local file, which
+MorphologyRecognizer can use instead of DB: a snapshot (see its `snapshot`
+parameter) or SQLite database (see libs.storage.SQLiteStorage).
+
+Expected parameters:
+Name             Default     Description
+--dbhost ...     atlas       DB to take rules from.
+--collection ... *requiered  Name of collection with rules.
+--format ...     snapshot    Format of the output: 'snapshot' or 'sqlite'.
+--output ...     rules.snap  Path to the output file. SQLite collection will
+                             have the same name as the collection in DB and
+                             replaces its previous content. Pass
+                             "sqlite:<output>#<collection>" as "collection"
+                             in config.json to use it.
+--tagparser ...  (optional)  Name of a tagparser class. XPOSes will be parsed
+                             and stored in the snapshot if given.
+--confs         config.json Address to file with configurations.
+""" # noqa E122
+        )
+    raise SystemExit
+
+predef = Predefinator(
+    fp=open(
+        argv.get("--confs", default="config.json"), encoding="utf-8"
+    )
+)
+
+print("Loading...")
+
+
+from libs.db import DB # noqa E402
+
+
+db = DB(
+    host=argv.get("--dbhost", default="atlas")
+)
+
+collection = db.cli.get_collection(argv.get("--collection"))
+output = argv.get("--output", default="rules.snap")
+
+if argv.get("--format", default="snapshot") == "sqlite":
+    storage = SQLiteStorage(output, name=collection.name)
+    counter = storage.insertMany(collection.find({}), replace=True)
+    storage.close()
+else:
+    counter = RuleSnapshot.compile(
+        collection=collection,
+        path=output,
+        tagparser=(
+            predef.inited(argv.get("--tagparser"))
+            if argv.has("--tagparser") else None
+        )
+    )["documents"]
+
+db.close()
+
+print(f"{counter} documents were written to {output}.")
@@ -1,7 +1,7 @@
 """Contains classes for accuracy analysis.
 """
 
-from ilbs.arrproc import keyExtract
+from libs.arrproc import keyExtract
 
 
 class XPOSRecognitionAnalyzer:
@@ -66,75 +66,101 @@ class XPOSRecognitionAnalyzer:
 
         try:
             # Skip offset
-            if self.offset != 0:
-                i = 0
-                while i < self.offset:
-                    line = self.reader.nextLine()
-                    if line["type"] == self.reader.DATALINE:
-                        i += 1
+            self.reader.skipTokens(self.offset)
 
             # All non-DATALINE lines will be skipped
             while True:
                 if self.limit <= self.CHECKED:
-                    raise StopIteration
-
-                line = self.reader.nextLine()
-                if line["type"] != self.reader.DATALINE:
-                    continue
-
-                token = self.reader.extractProperty(
-                    line, prop=self.reader.FORMNAME
-                )
-                upos = self.reader.extractProperty(
-                    line, prop=self.reader.UPOSNAME
-                )
-                xpos = self.reader.extractProperty(
-                    line, prop=self.reader.XPOSNAME
-                )
-                result = self.recognizer.recognize(
-                    token,
+                    return
+
+                # Tokens are recognized by sentences, so collect datalines
+                # until the blank line, but no more than the limit allows.
+                lines = list()
+                try:
+                    while len(lines) < self.limit - self.CHECKED:
+                        line = self.reader.nextLine()
+                        if line["type"] == self.reader.DATALINE:
+                            lines.append(line)
+                        elif line["type"] == self.reader.BLANKLINE and lines:
+                            break
+                except EOFError:
+                    if not lines:
+                        raise
+
+                tokens = [
+                    self.reader.extractProperty(
+                        line, prop=self.reader.FORMNAME
+                    )
+                    for line in lines
+                ]
+                results = self.recognizer.recognizeMany(
+                    tokens,
                     withApplier=False
                 )
-                applierResult = self.recognizer.recognize(token)
+                applierResults = self.recognizer.recognizeMany(tokens)
 
-                self.CHECKED += 1
+                for line, token, result, applierResult in zip(
+                    lines, tokens, results, applierResults
+                ):
+                    yield self.check(line, token, result, applierResult)
 
-                checks = {
-                    "IMPROVE_UPOS": False,
-                    "IMPROVE_XPOS": False,
-                    "CORRECT_UPOS": False,
-                    "CORRECT_XPOS": False
-                }
+        except EOFError:
+            # Generators must return instead of raising StopIteration
+            return
 
-                if result:
+    def check(self, line, token, result, applierResult):
+        """Compare results of recognizing with the GC line and count them.
 
-                    if upos in keyExtract(result, "upos"):
+        Args:
+            line (dict): A line from reader with DATALINE type.
+            token (str): Form of the token.
+            result (list): Rules returned by the recognizer without applier.
+            applierResult (dict): Rule returned by the recognizer with
+                applier.
 
-                        checks["IMPROVE_UPOS"] = True
-                        self.IMPROVE_UPOS += 1
+        Returns:
+            dict: Info about the check. (See XPOSRecognitionAnalyzer.init)
 
-                        if applierResult and upos == applierResult["upos"]:
+        """
 
-                            checks["CORRECT_UPOS"] = True
-                            self.CORRECT_UPOS += 1
+        upos = self.reader.extractProperty(line, prop=self.reader.UPOSNAME)
+        xpos = self.reader.extractProperty(line, prop=self.reader.XPOSNAME)
 
-                    if xpos in keyExtract(result, "xpos"):
+        self.CHECKED += 1
 
-                        checks["IMPROVE_XPOS"] = True
-                        self.IMPROVE_XPOS += 1
+        checks = {
+            "IMPROVE_UPOS": False,
+            "IMPROVE_XPOS": False,
+            "CORRECT_UPOS": False,
+            "CORRECT_XPOS": False
+        }
 
-                        if applierResult and xpos == applierResult["xpos"]:
+        if result:
 
-                            checks["CORRECT_XPOS"] = True
-                            self.CORRECT_XPOS += 1
+            if upos in keyExtract(result, "upos"):
 
-                yield {
-                    "checks": checks,
-                    "token": token,
-                    "result": result,
-                    "applierResult": applierResult,
-                    "gc": line
-                }
+                checks["IMPROVE_UPOS"] = True
+                self.IMPROVE_UPOS += 1
 
-        except EOFError:
-            raise StopIteration
+                if applierResult and upos == applierResult["upos"]:
+
+                    checks["CORRECT_UPOS"] = True
+                    self.CORRECT_UPOS += 1
+
+            if xpos in keyExtract(result, "xpos"):
+
+                checks["IMPROVE_XPOS"] = True
+                self.IMPROVE_XPOS += 1
+
+                if applierResult and xpos == applierResult["xpos"]:
+
+                    checks["CORRECT_XPOS"] = True
+                    self.CORRECT_XPOS += 1
+
+        return {
+            "checks": checks,
+            "token": token,
+            "result": result,
+            "applierResult": applierResult,
+            "gc": line
+        }
@@ -0,0 +1,200 @@
+"""Asyncio counterparts of MorphologyRecognizer and ContextualProcessor. DB
+lookups are still made by the synchronous recognizer, but in a pool of
+threads, so they don't block the event loop and lookups for all the tokens of
+a sentence go concurrently.
+"""
+
+from libs.ctxmorph import ContextualProcessor
+from libs.lrucache import LRUCache
+from libs.records import TokenRecord
+from libs.strproc import tokenize
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+
+
+class AsyncMorphologyRecognizer:
+    """Wrapper for MorphologyRecognizer with coroutine methods. Results are
+    the same as those of wrapped recognizer.
+
+    Properties:
+        recognizer (MorphologyRecognizer): Wrapped recognizer.
+        tagparser (Class): Tagparser of the wrapped recognizer.
+        executor (ThreadPoolExecutor): Pool where DB requests are made. Size
+            of the pool limits the number of concurrent requests.
+
+    """
+
+    def __init__(self, recognizer, concurrency=8):
+        """Init the wrapper.
+
+        Args:
+            recognizer (MorphologyRecognizer): Initialized recognizer. Its
+                collection can be any object with pymongo-like find and
+                aggregate methods.
+            concurrency (int): Maximum number of DB requests at the same
+                time.
+
+        """
+
+        self.recognizer = recognizer
+        self.tagparser = recognizer.tagparser
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def lookup(self, func, token):
+        """Call one of searching methods of the recognizer in the pool.
+
+        Args:
+            func (function): Method like MorphologyRecognizer.getStatic.
+            token (str)
+
+        Returns:
+            list: Result of the method.
+
+        """
+
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, func, token
+        )
+
+    async def recognize(self, token, withApplier=True, showDB=False):
+        """Coroutine version of MorphologyRecognizer.recognize. Exceptions
+        and static rules for the token are requested at once, rules are
+        requested only if there are none of them.
+
+        Args:
+            (See MorphologyRecognizer.recognize)
+
+        Returns:
+            (See MorphologyRecognizer.recognize)
+
+        """
+
+        recognizer = self.recognizer
+        token = token.lower()
+
+        if recognizer.cache is not None:
+            key = (token, withApplier, showDB)
+            result = recognizer.cache.get(key)
+            if result is not LRUCache.MISSING:
+                return recognizer.copyResult(result)
+
+        result = await self.recognizeToken(token, withApplier, showDB)
+
+        if recognizer.cache is not None:
+            recognizer.cache.put(key, recognizer.copyResult(result))
+
+        return result
+
+    async def recognizeToken(self, token, withApplier=True, showDB=False):
+        """Coroutine version of MorphologyRecognizer.recognizeToken.
+
+        Args:
+            (See MorphologyRecognizer.recognizeToken)
+
+        Returns:
+            (See MorphologyRecognizer.recognize)
+
+        """
+
+        recognizer = self.recognizer
+
+        if recognizer.applySpecial:
+            special = recognizer.recognizeSpecial(token)
+            if special:
+                return special if withApplier else [special]
+
+        if recognizer.lexicon is not None:
+            # Lexicon is in memory, so only rules need requesting
+            query = recognizer.getFromLexicon(token)
+            if len(query) == 0:
+                query = await self.lookup(recognizer.getRulesFor, token)
+        else:
+            # Word lookups are cheap, so both are requested at once. Rules
+            # are searched only if they found nothing, as the sequential
+            # recognizer does.
+            exceptions, static = await asyncio.gather(
+                self.lookup(recognizer.getExceptions, token),
+                self.lookup(recognizer.getStatic, token)
+            )
+            query = exceptions or static
+            if len(query) == 0:
+                query = await self.lookup(recognizer.getRulesFor, token)
+
+        return recognizer.resolve(token, query, withApplier, showDB)
+
+    async def recognizeMany(self, tokens, withApplier=True, showDB=False):
+        """Recognize the tokens concurrently. Every distinct token is
+        recognized only once.
+
+        Args:
+            (See MorphologyRecognizer.recognizeMany)
+
+        Returns:
+            list: Results for each token in the order tokens were given.
+
+        """
+
+        tokens = [token.lower() for token in tokens]
+        distinct = list(dict.fromkeys(tokens))
+
+        results = dict(zip(
+            distinct,
+            await asyncio.gather(*[
+                self.recognize(token, withApplier, showDB)
+                for token in distinct
+            ])
+        ))
+
+        # Repeated tokens must not share the same object, since callers
+        # modify results.
+        seen = set()
+        bundle = list()
+        for token in tokens:
+            bundle.append(
+                self.recognizer.copyResult(results[token]) if token in seen
+                else results[token]
+            )
+            seen.add(token)
+
+        return bundle
+
+    def close(self):
+        """Wait for pending requests and shut the pool down.
+        """
+
+        self.executor.shutdown(wait=True)
+
+
+class AsyncContextualProcessor(ContextualProcessor):
+    """ContextualProcessor with coroutine version of tagged method. It must
+    be initialized with AsyncMorphologyRecognizer as a recognizer.
+    """
+
+    async def tagged(self, sentence):
+        """Coroutine version of ContextualProcessor.tagged. Tokens of the
+        sentence are recognized concurrently.
+
+        Args:
+            sentence (str): String of sentence.
+
+        Returns:
+            (See ContextualProcessor.tagged)
+
+        """
+
+        tokens = tokenize(sentence)
+        processed = list()
+
+        for token, recognized in zip(
+            tokens,
+            await self.recognizer.recognizeMany(tokens, withApplier=True)
+        ):
+            # Return empty dict if token was not recognized
+            if not recognized:
+                recognized = dict()
+            recognized["word"] = token
+            if self.compact:
+                recognized = TokenRecord(recognized)
+            processed.append(recognized)
+
+        return processed
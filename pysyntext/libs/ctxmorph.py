@@ -1,8 +1,11 @@
 """This library contains methods for processing whole sentences and contexts.
 """
 
+from libs.records import TokenRecord
+from libs.storage import asStorage
 from libs.strproc import tokenize
 from ctx19.parsers import Contextual19Parser
+import libs.timing as timing
 
 
 class ContextualProcessor:
@@ -15,25 +18,32 @@ class ContextualProcessor:
         priority (dict): Priority list for MorphologyRecognizer.
         tagparser (class): Class with 'parse' function which can parse XPOSes
            from DB.
-        rulescoll (Collection): A pymongo Collection that will be used for
-            contextual correcting. It must contains rules in Ctx19 object
-            representation.
+        rulescoll (Collection, RuleStorage, str): A pymongo Collection, a
+            storage from libs.storage or an address of SQLite collection (see
+            libs.storage.asStorage) that will be used for contextual
+            correcting. It must contains rules in Ctx19 object representation.
         ctx19 (Contextual19Parser): Parser for Ctx19
+        compact (bool): Whether tagged tokens are TokenRecords.
 
     """
 
-    def __init__(self, recognizer, rulescoll=None):
+    def __init__(self, recognizer, rulescoll=None, compact=False):
         """Init the class with specified db connection.
 
         Args:
             recognizer (MorphologyRecognizer)
-            rulescoll (Collection): A pymongo Collection that will be used for
+            rulescoll (Collection, RuleStorage, str): A pymongo Collection,
+                a storage from libs.storage or an address of SQLite
+                collection (see libs.storage.asStorage) that will be used for
                 contextual correcting. It must contains rules in Ctx19 object
                 representation.
+            compact (bool): If True, then tagged returns TokenRecords (see
+                libs.records) instead of dicts.
 
         """
 
         self.recognizer = recognizer
+        self.compact = compact
         self.ctx19 = Contextual19Parser()
 
         if not rulescoll:
@@ -42,10 +52,11 @@ class ContextualProcessor:
         self.rulescoll = rulescoll
 
         # Upload all the rules to Ctx19 parser
-        dbcursor = rulescoll.find({})
-        dbcursor.skip(1)
+        documents = asStorage(rulescoll).documents()
+        # The first document is an empty one, created with the collection
+        next(documents, None)
 
-        for rule in dbcursor:
+        for rule in documents:
             self.ctx19.data.append(rule)
 
     def tagged(self, sentence):
@@ -62,21 +73,24 @@ class ContextualProcessor:
                 ]
                 There will be this list of properties in each of token:
                     word (str): Word before recognizing.
+                Tokens are TokenRecords if self.compact is True.
 
         """
 
-        tokens = tokenize(sentence)
+        with timing.stage("tokenize"):
+            tokens = tokenize(sentence)
         processed = list()
 
-        for token in tokens:
-            recognized = self.recognizer.recognize(
-                token=token,
-                withApplier=True
-            )
+        for token, recognized in zip(
+            tokens,
+            self.recognizer.recognizeMany(tokens, withApplier=True)
+        ):
             # Return empty dict if token was not recognized
             if not recognized:
                 recognized = dict()
             recognized["word"] = token
+            if self.compact:
+                recognized = TokenRecord(recognized)
             processed.append(recognized)
 
         return processed
@@ -93,7 +107,8 @@ class ContextualProcessor:
 
         """
 
-        sentence = self.ctx19.apply(sentence)
+        with timing.stage("ctx19"):
+            sentence = self.ctx19.apply(sentence)
 
         # Modify XPOS tags in tokens according to their new properties
         for token in sentence:
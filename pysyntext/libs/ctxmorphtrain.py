@@ -13,7 +13,7 @@ class ContextualProcessorTrainer:
     """
 
     def __init__(
-        self, db, reader, recognizer, logger, cmpkeys
+        self, db, reader, recognizer, logger, cmpkeys, codec=None
     ):
         """Init the trainer for contextual processor.
 
@@ -27,10 +27,15 @@ class ContextualProcessorTrainer:
             tagparser (?): Class of XPOS tags parser.
             cmpkeys (list): List of keys to be compared in tokens between two
                 contexts.
+            codec (libs.ud.featcodec.FeatureCodec): If given, features of
+                tokens will be compared as packed integers.
 
         Properties:
-            db, reader, logger, cmpkeys, tagparser: Values you are passing to
-                init function.
+            db, reader, logger, cmpkeys, tagparser, codec: Values you are
+                passing to init function.
+            cmpmask (int): Mask of cmpkeys which are fields of the codec.
+            plainkeys (list): cmpkeys which are not fields of the codec, so
+                they're compared as they are.
             collection (Collection): A collection in DB with EMENDPOS marker,
                 which are being used to upload rules.
             ctxprocc (libs.ctxmorph.ContextualProcessor)
@@ -47,15 +52,35 @@ class ContextualProcessorTrainer:
         self.recognizer = recognizer
         self.reader = reader
         self.cmpkeys = cmpkeys
+        self.useCodec(codec)
 
         logger.write(f"Created collection: {self.collection.name}\n")
 
-    def common(self, t1, t2):
+    def useCodec(self, codec):
+        """Set the codec which tokens are compared with.
+
+        Args:
+            codec (libs.ud.featcodec.FeatureCodec): None to compare tokens as
+                dicts.
+
+        """
+
+        self.codec = codec
+
+        if codec is not None:
+            self.cmpmask = codec.mask(self.cmpkeys)
+            self.plainkeys = [
+                key for key in self.cmpkeys if key not in codec.index
+            ]
+
+    def common(self, t1, t2, c1=None, c2=None):
         """Generator function, yields bundle of properties that are equal
         in two given tokens.
 
         Args:
             t1, t2 (dicts): Two tokens to be compared.
+            c1, c2 (int): Tokens encoded by self.codec. They're encoded here
+                if not given.
 
         Yields:
             tuple:
@@ -64,22 +89,38 @@ class ContextualProcessorTrainer:
 
         """
 
-        for key in t1:
-            if (
-                # This key was allowed to be compared
-                key in self.cmpkeys and
-                # This key is both in t1 and t2
-                key in t2 and
-                t1[key] == t2[key]
-            ):
+        if self.codec is None:
+            for key in t1:
+                if (
+                    # This key was allowed to be compared
+                    key in self.cmpkeys and
+                    # This key is both in t1 and t2
+                    key in t2 and
+                    t1[key] == t2[key]
+                ):
+                    yield (key, t1[key])
+            return
+
+        if c1 is None:
+            c1 = self.codec.encode(t1)
+        if c2 is None:
+            c2 = self.codec.encode(t2)
+
+        for key in self.codec.names(self.codec.common(c1, c2) & self.cmpmask):
+            yield (key, t1[key])
+
+        for key in self.plainkeys:
+            if key in t1 and key in t2 and t1[key] == t2[key]:
                 yield (key, t1[key])
 
-    def differs(self, t1, t2):
+    def differs(self, t1, t2, c1=None, c2=None):
         """Generator function, yields bundle of properties that are differs
         in two given tokens.
 
         Args:
             t1, t2 (dicts): Two tokens to be compared.
+            c1, c2 (int): Tokens encoded by self.codec. They're encoded here
+                if not given.
 
         Yields:
             tuple:
@@ -89,17 +130,33 @@ class ContextualProcessorTrainer:
 
         """
 
-        for key in t1:
-            if (
-                # This key was allowed to be compared
-                key in self.cmpkeys and
-                # This key is both in t1 and t2
-                key in t2 and
-                t1[key] != t2[key]
-            ):
+        if self.codec is None:
+            for key in t1:
+                if (
+                    # This key was allowed to be compared
+                    key in self.cmpkeys and
+                    # This key is both in t1 and t2
+                    key in t2 and
+                    t1[key] != t2[key]
+                ):
+                    yield (key, t1[key], t2[key])
+            return
+
+        if c1 is None:
+            c1 = self.codec.encode(t1)
+        if c2 is None:
+            c2 = self.codec.encode(t2)
+
+        for key in self.codec.names(
+            self.codec.differs(c1, c2) & self.cmpmask
+        ):
+            yield (key, t1[key], t2[key])
+
+        for key in self.plainkeys:
+            if key in t1 and key in t2 and t1[key] != t2[key]:
                 yield (key, t1[key], t2[key])
 
-    def conclude(self, ctxbase, ctxto):
+    def conclude(self, ctxbase, ctxto, codes=None):
         """Compare centers in base context `ctxbase` and gc context `ctxto` and
         generate rules to make base center recognized correctly.
 
@@ -130,6 +187,8 @@ class ContextualProcessorTrainer:
         Args:
             ctxbase, ctxto (dicts): Contexts dict as defined in strproc.context
                 function.
+            codes (tuple): Tokens of sentences of ctxbase and ctxto encoded
+                by self.codec. Tokens are encoded in common if not given.
 
         Returns:
             list: List of `if` block in Ctx19 rule.
@@ -154,7 +213,13 @@ class ContextualProcessorTrainer:
                     else "next"
                 )
             }
-            for key, value in self.common(tokenbase, tokento):
+            if codes is not None:
+                n = ctxbase["i"] + tokenbase["__position"]
+                pair = (codes[0][n], codes[1][n])
+            else:
+                pair = (None, None)
+
+            for key, value in self.common(tokenbase, tokento, *pair):
                 # [bool, str] list are created according to Ctx19 assignment
                 # syntax in object rule representation style.
                 selectorRule[key] = [True, value]
@@ -164,12 +229,13 @@ class ContextualProcessorTrainer:
 
         return ifblock
 
-    def adjust(self, base, gc):
+    def adjust(self, base, gc, cbase=None, cgc=None):
         """Generate `then` block for Ctx19 rule for two tokens to make them
         equal.
 
         Args:
             t1, t2 (dicts): Dicts of tokens.
+            cbase, cgc (int): Tokens encoded by self.codec.
 
         Returns:
             dict: Dict of `then` block.
@@ -178,7 +244,7 @@ class ContextualProcessorTrainer:
 
         then = dict()
 
-        for key, vbase, vgc in self.differs(base, gc):
+        for key, vbase, vgc in self.differs(base, gc, cbase, cgc):
             then[key] = vgc
 
         return then
@@ -236,17 +302,31 @@ class ContextualProcessorTrainer:
             for token in sentence:
                 token.update(self.recognizer.tagparser.parse(token["xpos"]))
 
+        # Tokens are encoded once, contexts refer to them by positions
+        codes = None
+        if self.codec is not None:
+            codes = (
+                [self.codec.encode(token) for token in sentence],
+                [self.codec.encode(token) for token in tagged]
+            )
+
         for gc, tagged in zip(
             context(sentence, r), context(tagged, r)
         ):
-            ifblock = self.conclude(gc, tagged)
+            ifblock = self.conclude(gc, tagged, codes)
 
             # Do not add too small rules. Len of `if` must be less than 4:
             # __position + __name + ...comparisons
             if not ifblock or len(ifblock) < 4:
                 continue
 
-            thenblock = self.adjust(tagged["center"], gc["center"])
+            if codes is not None:
+                thenblock = self.adjust(
+                    tagged["center"], gc["center"],
+                    codes[1][gc["i"]], codes[0][gc["i"]]
+                )
+            else:
+                thenblock = self.adjust(tagged["center"], gc["center"])
 
             yield (ifblock, thenblock)
 
@@ -283,6 +363,14 @@ class ContextualProcessorTrainer:
             "\"relation\" is the number of rules divided by number of tokens."
         )
 
+        # Sentences before the offset are skipped without processing
+        if offset > 1:
+            try:
+                tokenCounter += self.reader.skip(offset - 1)
+            except EOFError:
+                return
+            counter += offset - 1
+
         # All errors in sentence processing will be swallowed (except for
         # EOFError and BreakException)
         while True:
@@ -300,7 +388,7 @@ class ContextualProcessorTrainer:
                     raise ContinueException
 
                 if counter > limit:
-                    raise StopIteration
+                    return
 
                 # processSentence returns list of rules for some sentence
                 self.logger.write(
@@ -1,28 +1,147 @@
 """Contains a class which implements the CYK algorithm.
 """
 
+from libs.storage import asStorage
+
 
 class CYKAnalyzer:
     """Class that uses CYK algorithm to parse sentences with the help of
     context-free grammar.
+
+    Properties:
+        AGREEMENT (tuple): Features which nodes must agree in.
+        ctx (ContextualProcessor)
+        grammar (list): Grammar rules.
+        codec (FeatureCodec): Codec which agreement is checked with. None if
+            it's checked with dicts.
+        masks (dict): {feature: its mask in codec} for AGREEMENT features.
+        ruleCodes (dict): {id of rule: code of its agreement features}.
+
     """
 
-    def __init__(self, ctx, collection):
+    AGREEMENT = ("Gender", "Number")
+
+    def __init__(self, ctx, collection, codec=None):
         """Init the CYKAnalyzer, upload the rules from db to self.grammar.
 
         Args:
             ctx (ContextualProcessor): Initialized class.
-            collection (pymongo.Collection): MongoDB collection which store
+            collection (pymongo.Collection, RuleStorage, str): MongoDB
+                collection, a storage from libs.storage or an address of
+                SQLite collection (see libs.storage.asStorage) which store
                 grammar rules.
+            codec (libs.ud.featcodec.FeatureCodec): If given, agreement of
+                nodes is checked with packed integers.
 
         """
         self.ctx = ctx
         self.grammar = list()
+        self.codec = codec
 
-        for rule in collection.find({}):
+        for rule in asStorage(collection).documents():
             rule["prod"] = tuple(rule["prod"])
             self.grammar.append(rule)
 
+        if codec is not None:
+            self.masks = {
+                name: codec.mask([name]) for name in self.AGREEMENT
+            }
+            self.ruleCodes = {
+                id(rule): self.agreementCode(rule)
+                for rule in self.grammar
+            }
+
+    def agreementCode(self, token):
+        """Encode features of the token which nodes must agree in.
+
+        Args:
+            token (dict)
+
+        Returns:
+            int
+
+        """
+
+        return self.codec.encode(token) & self.codec.mask(self.AGREEMENT)
+
+    def agreement(self, rule, left, right):
+        """Make agreement properties of the node which the rule makes of two
+        nodes. Gender and number are taken from the right node or from the
+        left one. The node doesn't agree with anything if the rule requires
+        agreement (has "full_agr" or "num_agr") but nodes disagree.
+
+        Args:
+            rule (dict): Grammar rule.
+            left, right (dict): Nodes of WFST.
+
+        Returns:
+            tuple: (dict of agreement properties, their code made by
+                self.codec or None if there's no codec).
+
+        """
+
+        # The rule is copied, since it's shared by all the nodes
+        agr_rule = dict(rule)
+
+        if self.codec is None:
+            for name in self.AGREEMENT:
+                if name in right['agr_pos']:
+                    agr_rule[name] = right['agr_pos'][name]
+                elif name in left['agr_pos']:
+                    agr_rule[name] = left['agr_pos'][name]
+
+            if ('full_agr' in rule and
+                ('Gender' in left['agr_pos'] and
+                 'Gender' in right['agr_pos']) and
+                ('Number' in left['agr_pos'] and
+                 'Number' in right['agr_pos']) and
+                ((left['agr_pos']['Gender'] !=
+                    right['agr_pos']['Gender']) or
+                    (left['agr_pos']['Number'] !=
+                        right['agr_pos']['Number']))):
+                return (dict(), None)
+
+            if ('num_agr' in rule and
+                ('Number' in left['agr_pos'] and
+                 'Number' in right['agr_pos']) and
+                (left['agr_pos']['Number'] !=
+                    right['agr_pos']['Number'])):
+                return (dict(), None)
+
+            return (agr_rule, None)
+
+        lcode = left['agr_code']
+        rcode = right['agr_code']
+        code = self.ruleCodes[id(rule)]
+
+        for name, mask in self.masks.items():
+            if rcode & mask:
+                agr_rule[name] = right['agr_pos'][name]
+                code = (code & ~mask) | (rcode & mask)
+            elif lcode & mask:
+                agr_rule[name] = left['agr_pos'][name]
+                code = (code & ~mask) | (lcode & mask)
+
+        gender = self.masks["Gender"]
+        number = self.masks["Number"]
+        different = lcode ^ rcode
+
+        if (
+            'full_agr' in rule and
+            lcode & gender and rcode & gender and
+            lcode & number and rcode & number and
+            different & (gender | number)
+        ):
+            return (dict(), 0)
+
+        if (
+            'num_agr' in rule and
+            lcode & number and rcode & number and different & number
+        ):
+            return (dict(), 0)
+
+        return (agr_rule, code)
+
     def wfst(self, sentence):
         """Create and complete a Well-Formed Substring Table
         (2-dimensional list of used by the algorithm).
@@ -66,11 +185,14 @@ class CYKAnalyzer:
                 raise NotTaggedException(
                     "Some of the words in the input are not tagged.")
 
-            wfst[i][i + 1].append({
+            node = {
                 "pos": token,
                 "agr_pos": token,
                 "children": [None] * 2
-            })
+            }
+            if self.codec is not None:
+                node["agr_code"] = self.agreementCode(token)
+            wfst[i][i + 1].append(node)
 
         size += 1
 
@@ -84,41 +206,18 @@ class CYKAnalyzer:
 
                             for rule in filter(isAppliable, self.grammar):
 
-                                agr_rule = rule
-
-                                if 'Gender' in right['agr_pos']:
-                                    agr_rule['Gender'] = right['agr_pos']['Gender']
-                                elif 'Gender' in left['agr_pos']:
-                                    agr_rule['Gender'] = left['agr_pos']['Gender']
-
-                                if 'Number' in right['agr_pos']:
-                                    agr_rule['Number'] = right['agr_pos']['Number']
-                                elif 'Number' in left['agr_pos']:
-                                    agr_rule['Number'] = left['agr_pos']['Number']
-
-                                if ('full_agr' in rule and
-                                    ('Gender' in left['agr_pos'] and
-                                     'Gender' in right['agr_pos']) and
-                                    ('Number' in left['agr_pos'] and
-                                     'Number' in right['agr_pos']) and
-                                    ((left['agr_pos']['Gender'] !=
-                                        right['agr_pos']['Gender']) or
-                                        (left['agr_pos']['Number'] !=
-                                            right['agr_pos']['Number']))):
-                                    agr_rule = dict()
-
-                                if ('num_agr' in rule and
-                                    ('Number' in left['agr_pos'] and
-                                     'Number' in right['agr_pos']) and
-                                    (left['agr_pos']['Number'] !=
-                                        right['agr_pos']['Number'])):
-                                    agr_rule = dict()
-
-                                wfst[start][end].append({
+                                agr_rule, code = self.agreement(
+                                    rule, left, right
+                                )
+
+                                node = {
                                     'pos': rule,
                                     'agr_pos': agr_rule,
                                     'children': [left, right]
-                                })
+                                }
+                                if code is not None:
+                                    node['agr_code'] = code
+                                wfst[start][end].append(node)
 
         return wfst
 
@@ -1,3 +1,6 @@
+from libs.streams import decompressed
+
+
 class GCReader:
     """Base class for all GC readers.
 
@@ -6,7 +9,8 @@ class GCReader:
         DATALINE = 1 (const int): Marker for line with data.
         BLANKLINE = 2 (const int): Marker for blank line. Blank lines are being
             used to separate sentences.
-        file (_io.TextIOWrapper): Opened file.
+        file (_io.TextIOWrapper): Opened file. Compressed files are
+            decompressed (see libs.streams).
         ignoreComments (bool): Set this True in order to ignore comment lines.
         strict (bool): Set this to True in order to check format strictly.
         cursor (int): Pointer to the current line.
@@ -34,7 +38,8 @@ class GCReader:
         """Open the file for parsing and set cursor to 0.
 
         Args:
-            fp (file): File with GC data you want to parse.
+            fp (file): File with GC data you want to parse. It may be
+                compressed with gzip, bzip2 or xz.
             ignoreComments (bool): When this variable is set to True,
                 all comments in file will be ignored.
             strict (bool): Set this to True in order to check format strictly.
@@ -48,7 +53,7 @@ class GCReader:
 
         """
 
-        self.file = fp
+        self.file = decompressed(fp)
         self.ignoreComments = ignoreComments
         self.cursor = 0
         self.strict = strict
@@ -57,5 +62,197 @@ class GCReader:
         """Move reading cursor to the beginning.
         """
 
-        self.file.seek(0)
-        self.cursor = 0
+        self.seek(0)
+
+    def seek(self, position, cursor=0):
+        """Move reading cursor to the position in file.
+
+        Args:
+            position (int): Position in file. It must be the beginning of a
+                line.
+            cursor (int): Number of the line at this position.
+
+        """
+
+        self.file.seek(position)
+        self.cursor = cursor
+
+    def skipLines(self, n):
+        """Skip the next n lines, as if nextLine was called n times.
+
+        Args:
+            n (int)
+
+        Raises:
+            EOFError: End of the file was reached.
+            ...Errors from nextLine
+
+        """
+
+        for _ in range(n):
+            self.nextLine()
+
+    def skipTokens(self, n):
+        """Read lines until n lines with data are skipped.
+
+        Args:
+            n (int)
+
+        Raises:
+            EOFError: End of the file was reached.
+            ...Errors from nextLine
+
+        """
+
+        i = 0
+        while i < n:
+            if self.nextLine()["type"] == self.DATALINE:
+                i += 1
+
+    def skipSentences(self, n):
+        """Skip the next n sentences, as if nextSentence was called n times.
+
+        Args:
+            n (int)
+
+        Returns:
+            int: Number of tokens in the skipped sentences.
+
+        Raises:
+            EOFError: End of the file was reached.
+            ...Errors from nextSentence
+
+        """
+
+        tokens = 0
+
+        for _ in range(n):
+            tokens += len(self.nextSentence()["sentence"])
+
+        return tokens
+
+    def rawLine(self):
+        """Read the next line without parsing it.
+
+        Returns:
+            str: The line without its last character ("\\n"), as nextLine
+                cuts it. None if end of the file was reached.
+
+        """
+
+        line = self.file.readline()
+
+        return line[:-1] if line else None
+
+    def lineType(self, line):
+        """Find type of the line without parsing it.
+
+        Args:
+            line (str): Result of rawLine.
+
+        Returns:
+            int: COMMENTLINE, DATALINE or BLANKLINE.
+
+        """
+
+        if not line:
+            return self.BLANKLINE
+
+        if line[0] == '#':
+            return self.COMMENTLINE
+
+        return self.DATALINE
+
+    def skip(self, n):
+        """Skip the next n sentences like skipSentences does, but lines are
+        only scanned for blank lines instead of being parsed. Format of the
+        skipped lines is not checked.
+
+        Args:
+            n (int)
+
+        Returns:
+            int: Number of tokens in the skipped sentences.
+
+        Raises:
+            EOFError: End of the file was reached.
+
+        """
+
+        tokens = 0
+
+        while n > 0:
+            line = self.rawLine()
+
+            # Increase cursor to remember current reading line.
+            self.cursor += 1
+
+            if line is None:
+                raise EOFError("End of the file was reached.")
+
+            kind = self.lineType(line)
+            if kind == self.BLANKLINE:
+                n -= 1
+            elif kind == self.DATALINE:
+                tokens += 1
+
+        return tokens
+
+    def lines(self, limit=None):
+        """Iterate over lines until the end of the file.
+
+        Args:
+            limit (int): Maximum number of lines. No limit if None or 0.
+
+        Yields:
+            dict: Results of nextLine.
+
+        """
+
+        counter = 0
+
+        while not limit or counter < limit:
+            try:
+                line = self.nextLine()
+            except EOFError:
+                return
+            counter += 1
+            yield line
+
+    def __iter__(self):
+        """Iterate over lines until the end of the file.
+
+        Yields:
+            dict: Results of nextLine.
+
+        """
+
+        return self.lines()
+
+    def sentences(self, limit=None, offset=0):
+        """Iterate over sentences until the end of the file.
+
+        Args:
+            limit (int): Maximum number of sentences. No limit if None or 0.
+            offset (int): Number of sentences skipped before (see skip).
+
+        Yields:
+            dict: Results of nextSentence.
+
+        """
+
+        if offset > 0:
+            try:
+                self.skip(offset)
+            except EOFError:
+                return
+
+        counter = 0
+
+        while not limit or counter < limit:
+            try:
+                sentence = self.nextSentence()
+            except EOFError:
+                return
+            counter += 1
+            yield sentence
@@ -3,6 +3,7 @@ into streams.
 """
 
 
+from collections.abc import Mapping
 import time
 import json
 
@@ -58,7 +59,10 @@ class Logger:
         dumps = json.dumps(
             data,
             indent=4,
-            default=lambda obj: str(type(obj)),
+            # Mappings like LazyFields of FastConlluReader are logged as dicts
+            default=lambda obj: (
+                dict(obj) if isinstance(obj, Mapping) else str(type(obj))
+            ),
             ensure_ascii=False
         )
 
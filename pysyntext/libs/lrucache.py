@@ -0,0 +1,117 @@
+"""Bounded cache with least-recently-used eviction. It can be used to memoize
+results of expensive lookups (e.g. DB requests) of frequent keys.
+"""
+
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Dictionary-like cache which holds no more than `maxsize` items. Values
+    are stored and returned as they are, so callers which modify values must
+    copy them.
+
+    Properties:
+        MISSING (object): Marker which get() returns by default when key is
+            not cached, since None can be cached too.
+        maxsize (int): Maximum number of items.
+        data (OrderedDict): Cached items. The most recently used are at the
+            end.
+        hits (int increment): Number of successful get() calls.
+        misses (int increment): Number of get() calls for uncached keys.
+        evictions (int increment): Number of items deleted to free space.
+
+    """
+
+    MISSING = object()
+
+    def __init__(self, maxsize=1024):
+        """Init an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of items to hold.
+
+        Raises:
+            ValueError: maxsize is less than 1.
+
+        """
+
+        if maxsize < 1:
+            raise ValueError("Size of the cache must be positive.")
+
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=MISSING):
+        """Returns the cached value and mark it as recently used.
+
+        Args:
+            key (hashable)
+            default (*): Value to return if the key is not cached.
+
+        Returns:
+            *: Cached value or default.
+
+        """
+
+        if key not in self.data:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.data.move_to_end(key)
+
+        return self.data[key]
+
+    def put(self, key, value):
+        """Cache the value. The least recently used item will be
+        deleted if the cache is full.
+
+        Args:
+            key (hashable)
+            value (*)
+
+        """
+
+        self.data[key] = value
+        self.data.move_to_end(key)
+
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def info(self):
+        """Returns statistics of the cache usage.
+
+        Returns:
+            dict: {
+                "hits": int,
+                "misses": int,
+                "evictions": int,
+                "size": int: Number of cached items,
+                "maxsize": int
+            }
+
+        """
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.data),
+            "maxsize": self.maxsize
+        }
+
+    def clear(self):
+        """Delete all the items and reset the statistics.
+        """
+
+        self.data.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.data)
@@ -3,22 +3,35 @@ appropriate rule in DB and returns you the result.
 """
 
 from libs.arrproc import isSupsetTo
+from libs.ruleindex import AffixAutomaton, Lexicon, EdgeTrie, copyRule
+from libs.lrucache import LRUCache
+from libs.snapshot import RuleSnapshot
+from libs.storage import asStorage
 import libs.strproc as strproc
+import libs.timing as timing
 
 
 class MorphologyRecognizer:
     """This class contains methods for morphology processing.
+
+    With selectByEdge as applierFunc, EdgeTrie over all the rules is built in
+    __init__ only if they are loaded anyway (snapshot or indexRules is
+    given). Otherwise no rules are loaded, and selectByEdge checks affixes
+    of each bundle one by one.
     """
 
     def __init__(
         self, collection, tagparser=None, priorityList=None, applierFunc=None,
-        applySpecial=True
+        applySpecial=True, indexRules=False, indexLexicon=False,
+        cacheSize=0, snapshot=None, codec=None
     ):
         """Init the recognizer with specified db connection.
 
         Args:
-            collection (Collection): A Collection from pymongo that will be
-                used for rules searching.
+            collection (Collection, RuleStorage, str): A Collection from
+                pymongo, any of storages from libs.storage or an address of
+                SQLite collection (see libs.storage.asStorage) that will be
+                used for rules searching. Can be None if snapshot is given.
             tagparser (Class): Class with "parse" method which can parse XPOS
                 of the token.
             priorityList (list): Specify dominating of one type over another.
@@ -29,6 +42,23 @@ class MorphologyRecognizer:
                 method selectFirst() from this class to select the first
                 rule from the list.
             applySpecial (bool): Avoid making DB requests for punctuation.
+            indexRules (bool): Load all "rules" documents once and search them
+                with in-memory AffixAutomaton instead of querying DB for each
+                token. Changes in collection made after initialization won't
+                be seen by the recognizer.
+            indexLexicon (bool): Load all "exceptions" and "static" documents
+                into in-memory Lexicon, so these stages will be resolved with
+                one dictionary lookup. The same note as for indexRules is
+                applied.
+            cacheSize (int): Remember results of this number of most recently
+                recognized tokens. Set to 0 to disable caching.
+            snapshot (str): Path to the file compiled by RuleSnapshot.compile.
+                If given, all the rules will be searched in this file instead
+                of DB, and indexRules with indexLexicon are ignored.
+            codec (libs.ud.featcodec.FeatureCodec): If given, properties of
+                the priority list are compared as packed integers. Properties
+                which are not fields of the codec (like "xpos", unless it was
+                given as an extra field) are compared as dicts.
 
         applierFunc Args:
             list: List of rules from DB.
@@ -58,12 +88,64 @@ class MorphologyRecognizer:
 
         """
 
-        self.prioritizer = Prioritizer(priorityList)
+        self.prioritizer = Prioritizer(priorityList, codec)
         self.collection = collection
+        self.storage = (
+            asStorage(collection) if collection is not None else None
+        )
         self.tagparser = tagparser
         self.applier = applierFunc
         self.applySpecial = applySpecial
+        self.rulesIndex = None
+        self.lexicon = None
+        self.cache = LRUCache(cacheSize) if cacheSize else None
+        # Rules for tokens recognized by recognizeSpecial
+        self.specials = None
+        self.snapshot = None
+        self.edgeTrie = None
+
+        if snapshot:
+            self.snapshot = RuleSnapshot(snapshot)
+            # Snapshot implements interfaces of both indexes
+            self.rulesIndex = self.snapshot
+            self.lexicon = self.snapshot
+        else:
+            if indexRules:
+                self.rulesIndex = AffixAutomaton(
+                    self.storage.documents(["rules"])
+                )
+
+            if indexLexicon:
+                self.lexicon = Lexicon(
+                    self.storage.documents(Lexicon.TYPES)
+                )
+
+        if (
+            applierFunc is MorphologyRecognizer.selectByEdge and
+            self.rulesIndex is not None
+        ):
+            # Tries are built once over the rules which are in memory
+            self.edgeTrie = EdgeTrie(self.ruleDocuments())
+            self.applier = self.edgeTrie
+
+    def ruleDocuments(self):
+        """Returns all the "rules" documents of the snapshot or of the index.
+        Rules of the storage aren't loaded.
+
+        Returns:
+            iterable of dict
+
+        """
 
+        if self.snapshot is not None:
+            return self.snapshot.documents(["rules"])
+
+        if isinstance(self.rulesIndex, AffixAutomaton):
+            return self.rulesIndex.documents
+
+        return list()
+
+    @timing.measured("rules")
     def getRulesFor(self, token):
         """Guess all the rules that can be applied to this token.
 
@@ -76,37 +158,12 @@ class MorphologyRecognizer:
 
         """
 
-        query = self.collection.aggregate([
-            {
-                "$match": {
-                    "$expr": {
-                        "$anyElementTrue": {
-                            "$map": {
-                                "input": "$data",
-                                "as": "s",
-                                "in": {
-                                    "$ne": [
-                                        -1,
-                                        {
-                                            "$indexOfBytes": [
-                                                token, "$$s"
-                                            ]
-                                        }
-                                    ]
-                                }
-                            }
-                        }
-                    },
-                    "data": {
-                        "$type": "array"
-                    },
-                    "type": "rules"
-                }
-            }
-        ])
+        if self.rulesIndex is not None:
+            return self.rulesIndex.search(token)
 
-        return list(query)
+        return self.storage.rulesFor(token)
 
+    @timing.measured("static")
     def getStatic(self, token):
         """Look if this token has static POS and returns a rule for it.
 
@@ -119,15 +176,12 @@ class MorphologyRecognizer:
 
         """
 
-        return list(
-            self.collection.find({
-                "type": "static",
-                "data": {
-                    "$in": [token]
-                }
-            })
-        )
+        if self.lexicon is not None:
+            return self.lexicon.get("static", token)
+
+        return self.storage.wordRules("static", token)
 
+    @timing.measured("exceptions")
     def getExceptions(self, token):
         """Look if this token is an exception and returns a rule for it.
 
@@ -140,14 +194,106 @@ class MorphologyRecognizer:
 
         """
 
-        return list(
-            self.collection.find({
-                "type": "exceptions",
-                "data": {
-                    "$in": [token]
-                }
-            })
-        )
+        if self.lexicon is not None:
+            return self.lexicon.get("exceptions", token)
+
+        return self.storage.wordRules("exceptions", token)
+
+    @timing.measured("rulesMany")
+    def getRulesForMany(self, tokens):
+        """Guess all the rules that can be applied to each of the tokens with
+        one DB request.
+
+        Args:
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}, like getRulesFor returns for each
+                token.
+
+        """
+
+        if self.rulesIndex is not None:
+            return {token: self.rulesIndex.search(token) for token in tokens}
+
+        return self.storage.rulesForMany(tokens)
+
+    @timing.measured("staticMany")
+    def getStaticMany(self, tokens):
+        """Look for static rules for each of the tokens with one DB request.
+
+        Args:
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}, like getStatic returns for each
+                token.
+
+        """
+
+        return self.getWordRulesMany("static", tokens)
+
+    @timing.measured("exceptionsMany")
+    def getExceptionsMany(self, tokens):
+        """Look for exceptions for each of the tokens with one DB request.
+
+        Args:
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}, like getExceptions returns for each
+                token.
+
+        """
+
+        return self.getWordRulesMany("exceptions", tokens)
+
+    @timing.measured("lexicon")
+    def getFromLexicon(self, token):
+        """Look for exceptions and static rules for the token with one lookup
+        in the lexicon. It must be loaded.
+
+        Args:
+            token (str)
+
+        Returns:
+            list: Exceptions if there are ones, static rules otherwise.
+
+        """
+
+        return self.lexicon.lookup(token)
+
+    @timing.measured("lexiconMany")
+    def getFromLexiconMany(self, tokens):
+        """Apply getFromLexicon to each of the tokens.
+
+        Args:
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}.
+
+        """
+
+        return self.lexicon.lookupMany(tokens)
+
+    def getWordRulesMany(self, type, tokens):
+        """Find rules of the given type which lists any of the tokens and
+        group them by tokens.
+
+        Args:
+            type (str): "static" or "exceptions".
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}.
+
+        """
+
+        if self.lexicon is not None:
+            return {token: self.lexicon.get(type, token) for token in tokens}
+
+        return self.storage.wordRulesMany(type, tokens)
 
     def recognize(
         self, token, withApplier=True, showDB=False
@@ -177,21 +323,149 @@ class MorphologyRecognizer:
 
         token = token.lower()
 
+        if self.cache is None:
+            return self.recognizeToken(token, withApplier, showDB)
+
+        key = (token, withApplier, showDB)
+        result = self.cache.get(key)
+
+        if result is LRUCache.MISSING:
+            result = self.recognizeToken(token, withApplier, showDB)
+            self.cache.put(key, result)
+
+        # Callers modify results, so the cached one is never given away
+        return self.copyResult(result)
+
+    def recognizeToken(self, token, withApplier=True, showDB=False):
+        """Recognize the token without using cache.
+
+        Args:
+            token (str): Lowercased token.
+            withApplier, showDB (bool): See MorphologyRecognizer.recognize.
+
+        Returns:
+            See MorphologyRecognizer.recognize.
+
+        """
+
         if self.applySpecial:
             special = self.recognizeSpecial(token)
             if special:
                 return special if withApplier else [special]
             del special
 
-        funcs = [self.getExceptions, self.getStatic, self.getRulesFor]
-        query = None  # Response from DB
-        result = None  # Result rule
+        if self.lexicon is not None:
+            # Exceptions and static rules are settled with one lookup
+            funcs = [self.getFromLexicon, self.getRulesFor]
+        else:
+            funcs = [self.getExceptions, self.getStatic, self.getRulesFor]
+        query = list()  # Response from DB
         for func in funcs:
             query = func(token)
             if len(query) != 0:
-                result = self.applier(query, token) if withApplier else query
                 break
 
+        return self.resolve(token, query, withApplier, showDB)
+
+    def recognizeMany(self, tokens, withApplier=True, showDB=False):
+        """Recognize a bundle of tokens (e.g. a sentence) at once. Every
+        distinct token is looked up only once and each of the searching stages
+        is done with one DB request for all the tokens.
+
+        Args:
+            tokens (list of str)
+            withApplier, showDB (bool): See MorphologyRecognizer.recognize.
+
+        Returns:
+            list: Results of MorphologyRecognizer.recognize for each token in
+                the order tokens were given.
+
+        """
+
+        tokens = [token.lower() for token in tokens]
+        results = dict()
+        pending = list()
+        cached = set()
+
+        # dict.fromkeys removes duplicates, but keeps the order
+        for token in dict.fromkeys(tokens):
+            if self.cache is not None:
+                result = self.cache.get((token, withApplier, showDB))
+                if result is not LRUCache.MISSING:
+                    results[token] = self.copyResult(result)
+                    cached.add(token)
+                    continue
+            if self.applySpecial:
+                special = self.recognizeSpecial(token)
+                if special:
+                    results[token] = special if withApplier else [special]
+                    continue
+            pending.append(token)
+
+        if self.lexicon is not None:
+            stages = [self.getFromLexiconMany, self.getRulesForMany]
+        else:
+            stages = [
+                self.getExceptionsMany, self.getStaticMany,
+                self.getRulesForMany
+            ]
+        queries = dict()
+        for stage in stages:
+            if not pending:
+                break
+            for token, query in stage(pending).items():
+                if len(query) != 0:
+                    queries[token] = query
+            pending = [token for token in pending if token not in queries]
+
+        for token, query in queries.items():
+            results[token] = self.resolve(token, query, withApplier, showDB)
+
+        for token in pending:
+            results[token] = None
+
+        if self.cache is not None:
+            for token, result in results.items():
+                if token not in cached:
+                    self.cache.put(
+                        (token, withApplier, showDB), self.copyResult(result)
+                    )
+
+        # Repeated tokens must not share the same object, since callers
+        # modify results.
+        seen = set()
+        bundle = list()
+        for token in tokens:
+            bundle.append(
+                self.copyResult(results[token]) if token in seen
+                else results[token]
+            )
+            seen.add(token)
+
+        return bundle
+
+    def resolve(self, token, query, withApplier=True, showDB=False):
+        """Make a result of recognizing from the DB response: apply applier,
+        priority list and parse XPOS.
+
+        Args:
+            token (str): Lowercased token.
+            query (list): Rules found for the token.
+            withApplier, showDB (bool): See MorphologyRecognizer.recognize.
+
+        Returns:
+            See MorphologyRecognizer.recognize.
+
+        """
+
+        result = None  # Result rule
+        if len(query) != 0:
+            if withApplier:
+                with timing.stage("applier"):
+                    result = self.applier(query, token)
+            else:
+                result = query
+
         if not result:
             return None
 
@@ -211,6 +485,49 @@ class MorphologyRecognizer:
 
         return result if not showDB else (result, query)
 
+    @staticmethod
+    def copyResult(result):
+        """Copy the result of recognize, so it can be modified without
+        touching the cached one. Rules are copied by copyRule, which is
+        enough, since their values are strings besides "data" list.
+
+        Args:
+            result: See MorphologyRecognizer.recognize.
+
+        Returns:
+            The copy.
+
+        """
+
+        if isinstance(result, tuple):
+            return (
+                MorphologyRecognizer.copyResult(result[0]),
+                MorphologyRecognizer.copyResult(result[1])
+            )
+
+        if isinstance(result, list):
+            return [copyRule(rule) for rule in result]
+
+        return copyRule(result) if result is not None else None
+
+    def cacheInfo(self):
+        """Returns statistics of the recognizing cache.
+
+        Returns:
+            dict: See LRUCache.info. None if caching is disabled.
+
+        """
+
+        return self.cache.info() if self.cache is not None else None
+
+    def clearCache(self):
+        """Forget all the cached results, e.g. after rules in DB were changed.
+        """
+
+        if self.cache is not None:
+            self.cache.clear()
+
+    @timing.measured("recognizeSpecial")
     def recognizeSpecial(self, token):
         """Recognize tokens where not db querying are needed (sym, punct etc.)
 
@@ -226,70 +543,57 @@ class MorphologyRecognizer:
 
         """
 
-        if strproc.isPunct(token):
-            if strproc.isComma(token):
-                return {
-                    "upos": "PUNCT",
-                    "xpos": self.tagparser.stringify({"upos": "PUNCT",
-                                                      "PunctType": "Comm"}),
-                    "name": "Punctuation"
-                }
-            elif strproc.isDash(token):
-                return {
-                    "upos": "PUNCT",
-                    "xpos": self.tagparser.stringify({"upos": "PUNCT",
-                                                      "PunctType": "Dash"}),
-                    "name": "Punctuation"
-                }
-            elif strproc.isColon(token):
-                return {
-                    "upos": "PUNCT",
-                    "xpos": self.tagparser.stringify({"upos": "PUNCT",
-                                                      "PunctType": "Colo"}),
-                    "name": "Punctuation"
-                }
-            elif strproc.isSemicolon(token):
-                return {
-                    "upos": "PUNCT",
-                    "xpos": self.tagparser.stringify({"upos": "PUNCT",
-                                                      "PunctType": "Semi"}),
-                    "name": "Punctuation"
-                }
-            elif strproc.isLeftBracket(token):
-                return {
-                    "upos": "PUNCT",
-                    "xpos": self.tagparser.stringify({"upos": "PUNCT",
-                                                      "PunctType": "LBra"}),
-                    "name": "Punctuation"
-                }
-            elif strproc.isRightBracket(token):
-                return {
-                    "upos": "PUNCT",
-                    "xpos": self.tagparser.stringify({"upos": "PUNCT",
-                                                      "PunctType": "RBra"}),
-                    "name": "Punctuation"
-                }
-            else:
-                return {
-                    "upos": "PUNCT",
-                    "xpos": self.tagparser.stringify({"upos": "PUNCT"}),
-                    "name": "Punctuation"
-                }
+        special = strproc.specialClass(token)
 
-        if strproc.isSym(token):
-            return {
-                "upos": "SYM",
-                "xpos": self.tagparser.stringify({"upos": "SYM"}),
-                "name": "Residual"
-            }
+        if special is None:
+            return None
 
-        if strproc.hasNonUkrainian(token):
-            return {
-                "xpos": "X",
-                "upos": self.tagparser.stringify({"upos": "X"}),
-                "name": "Residual"
+        if self.specials is None:
+            self.specials = self.compileSpecials()
+
+        # Callers add properties to the rule, so the template is copied
+        return dict(self.specials[special])
+
+    def compileSpecials(self):
+        """Prepare rules for each class of strproc.specialClass, so XPOSes
+        are stringified only once.
+
+        Returns:
+            dict: {class: rule}.
+
+        """
+
+        specials = dict()
+
+        for punctType in ["Comm", "Dash", "Colo", "Semi", "LBra", "RBra"]:
+            specials[punctType] = {
+                "upos": "PUNCT",
+                "xpos": self.tagparser.stringify({"upos": "PUNCT",
+                                                  "PunctType": punctType}),
+                "name": "Punctuation"
             }
 
+        specials["PUNCT"] = {
+            "upos": "PUNCT",
+            "xpos": self.tagparser.stringify({"upos": "PUNCT"}),
+            "name": "Punctuation"
+        }
+
+        specials["SYM"] = {
+            "upos": "SYM",
+            "xpos": self.tagparser.stringify({"upos": "SYM"}),
+            "name": "Residual"
+        }
+
+        specials["X"] = {
+            "xpos": "X",
+            "upos": self.tagparser.stringify({"upos": "X"}),
+            "name": "Residual"
+        }
+
+        return specials
+
+    @timing.measured("unwrapXPOS")
     def unwrapXPOS(self, rule):
         """Append properties of XPOS to the rule.
 
@@ -301,6 +605,14 @@ class MorphologyRecognizer:
 
         """
 
+        if self.snapshot is not None:
+            features = self.snapshot.features(rule["xpos"])
+            if features is not None:
+                return {
+                    **rule,
+                    **features
+                }
+
         if self.tagparser:
             return {
                 **rule,
@@ -341,7 +653,7 @@ class MorphologyRecognizer:
             of the word.
             """
             # Longest rules first
-            li.sort(key=len, reverse=True)
+            li = sorted(li, key=len, reverse=True)
 
             for item in li:
                 # Do not allow strings with len=1 recognize as the beginnings
@@ -353,10 +665,12 @@ class MorphologyRecognizer:
 
             return None
 
-        for rule in bundle:
-            # Replace list of rules with one-element list. Element will be
-            # chosen by getBiggestEdge
-            rule["data"] = [getBiggestEdge(rule["data"], token)]
+        # Replace list of rules with one-element list. Element will be chosen
+        # by getBiggestEdge. Rules are copied, since they may be cached.
+        bundle = [
+            {**rule, "data": [getBiggestEdge(rule["data"], token)]}
+            for rule in bundle
+        ]
 
         bundle.sort(
             # Move down empty rules
@@ -366,13 +680,41 @@ class MorphologyRecognizer:
 
         return bundle[0] if bundle else None
 
+    @staticmethod
+    def selectByEdge(bundle, token):
+        """Make the same choice as selectByEnding without modifying the
+        bundle. When it's given as applierFunc of the recognizer with
+        snapshot or indexRules, the recognizer builds EdgeTrie over all its
+        rules once and uses it instead, so affixes are found in one walk over
+        the token. Called by itself, it checks affixes of each rule one by
+        one.
+
+        Args:
+            (See MorphologyRecognizer.recognize)
+
+        Returns:
+            dict: A copy of the chosen document.
+
+        """
+
+        return EdgeTrie().select(bundle, token)
+
 
 class Prioritizer:
     """This class provides interface to apply priority lists to morphology
     recognizing. For description see MorphologyRecognizer.recognize method.
+
+    Properties:
+        li (list): Priority list.
+        codec (FeatureCodec): Codec which tokens are compared with. None if
+            they're compared as dicts.
+        codes (list): (code of "__what", code of "__replace") for each item
+            of the list. Code is None if the dict has keys which are not
+            fields of the codec, then it's compared as dict.
+
     """
 
-    def __init__(self, li=None):
+    def __init__(self, li=None, codec=None):
         """Init the class and remember the list.
 
         Args:
@@ -390,11 +732,38 @@ class Prioritizer:
                     },
                     ...
                 ]
+            codec (libs.ud.featcodec.FeatureCodec): If given, properties are
+                compared as packed integers.
 
         """
 
         self.li = li
+        self.codec = codec
+        self.codes = None
+
+        if codec is not None and li:
+            self.codes = [
+                (self.encode(rule["__what"]), self.encode(rule["__replace"]))
+                for rule in li
+            ]
+
+    def encode(self, properties):
+        """Encode the properties with self.codec.
+
+        Args:
+            properties (dict)
 
+        Returns:
+            int: None if some of the properties are not fields of the codec.
+
+        """
+
+        if any(key not in self.codec.index for key in properties):
+            return None
+
+        return self.codec.encode(properties)
+
+    @timing.measured("prioritizer")
     def apply(self, token, response):
         """Apply the rules to the token.
 
@@ -410,6 +779,9 @@ class Prioritizer:
         if not self.li:
             return token
 
+        if self.codes is not None:
+            return self.applyCodes(token, response)
+
         # Unpack each {__what: .., __replace: ..} in self.li as (what, replace)
         for what, replace in [
             (rule["__what"], rule["__replace"]) for rule in self.li
@@ -425,6 +797,51 @@ class Prioritizer:
 
         return token
 
+    def applyCodes(self, token, response):
+        """Version of apply which compares properties as packed integers.
+        The token and the rules are encoded only once. Tokens which lack some
+        of properties are not supersets, instead of raising KeyError.
+
+        Args:
+            token (dict), response (list): See apply.
+
+        Returns:
+            dict: Resulting token.
+
+        """
+
+        tokenCode = None
+        responseCodes = None
+
+        for rule, (whatCode, replaceCode) in zip(self.li, self.codes):
+            if whatCode is None:
+                if not isSupsetTo(token, rule["__what"]):
+                    continue
+            else:
+                if tokenCode is None:
+                    tokenCode = self.codec.encode(token)
+                if not self.codec.contains(tokenCode, whatCode):
+                    continue
+
+            if replaceCode is None:
+                contains = self.responseContains(rule["__replace"], response)
+            else:
+                if responseCodes is None:
+                    responseCodes = [
+                        self.codec.encode(item) for item in response
+                    ]
+                contains = any(
+                    self.codec.contains(code, replaceCode)
+                    for code in responseCodes
+                )
+
+            if contains:
+                token.update(rule["__replace"])
+                # Do only first replacement
+                break
+
+        return token
+
     def responseContains(self, what, response):
         """Returns True if response contains rule with the properties defined
         in `what`.
@@ -94,13 +94,12 @@ class MorphologyRecognizeTrainer:
         # Collecting (UPOS, XPOS) tuples while iterating.
         self.poses = set()
 
+        if offset > 0:
+            gcreader.skipLines(offset)
+
         while counter < limit:
             line = gcreader.nextLine()
-            if counter < offset:
-                offset -= 1
-                continue
-            else:
-                counter += 1
+            counter += 1
             if line["type"] != gcreader.DATALINE:
                 continue
 
@@ -0,0 +1,219 @@
+"""Compact records of tokens. A record acts like a dict, but it has no dict
+inside: values are kept in a list, and the tuple of keys is shared by all the
+records with the same keys. Strings are interned, so equal forms, lemmas and
+tags are stored once. Records can be given anywhere a dict of token is
+expected: to ContextualProcessorTrainer, strproc.context, CYKAnalyzer, etc.
+
+Usage:
+    token = TokenRecord({"word": "мама", "upos": "NOUN"})
+    token["Case"] = "Nom"
+    line = compact(reader.nextLine())
+"""
+
+from collections.abc import Mapping, MutableMapping
+from sys import intern
+
+
+class Shape:
+    """Keys of records. Records with the same keys share one shape, so they
+    don't store their keys themselves. Only MAXSHAPES shapes are shared:
+    when there are that many, shapes of other keys are made for each record
+    and are not remembered, so odd keys can't grow the registry.
+
+    Properties:
+        MAXSHAPES (int): Maximum number of shared shapes.
+        SHAPES (dict): {tuple of keys: Shape}. Shared shapes.
+        keys (tuple of str): Keys in order of values of records.
+        index (dict): {key: number of its value}.
+        next (dict): {key: Shape}. Shared shapes with the key added, which
+            were already used.
+
+    """
+
+    __slots__ = ("keys", "index", "next")
+
+    MAXSHAPES = 4096
+
+    SHAPES = dict()
+
+    def __init__(self, keys):
+        """Init the shape. Use Shape.of instead.
+
+        Args:
+            keys (tuple of str)
+
+        """
+
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)}
+        self.next = dict()
+
+    @classmethod
+    def of(cls, keys):
+        """Returns the shared shape of the keys, or a new one if there are
+        MAXSHAPES shared shapes already.
+
+        Args:
+            keys (tuple of str)
+
+        Returns:
+            Shape
+
+        """
+
+        shape = cls.SHAPES.get(keys)
+
+        if shape is None:
+            shape = cls(keys)
+            if len(cls.SHAPES) < cls.MAXSHAPES:
+                cls.SHAPES[keys] = shape
+
+        return shape
+
+    def added(self, key):
+        """Returns the shape with the key at the end.
+
+        Args:
+            key (str): Key which is not in the shape.
+
+        Returns:
+            Shape
+
+        """
+
+        shape = self.next.get(key)
+
+        if shape is None:
+            keys = self.keys + (key,)
+            shape = Shape.of(keys)
+            # Shapes which are not shared must not be kept alive by others
+            if Shape.SHAPES.get(keys) is shape:
+                self.next[key] = shape
+
+        return shape
+
+    def removed(self, key):
+        """Returns the shape without the key.
+
+        Args:
+            key (str): Key which is in the shape.
+
+        Returns:
+            Shape
+
+        """
+
+        i = self.index[key]
+
+        return Shape.of(self.keys[:i] + self.keys[i + 1:])
+
+    def __reduce__(self):
+        # Unpickled shapes are shared too
+        return (Shape.of, (self.keys,))
+
+
+def interned(value):
+    """Returns the value itself, or the interned copy if it's a string.
+    """
+
+    return intern(value) if type(value) is str else value
+
+
+class TokenRecord(MutableMapping):
+    """Token which acts like a dict, but costs much less memory. Keys are
+    kept in the order they were added, as in dict.
+
+    Properties:
+        shape (Shape): Keys of the record.
+        values (list): Values in order of the keys.
+
+    """
+
+    __slots__ = ("shape", "values")
+
+    def __init__(self, items=None):
+        """Init the record.
+
+        Args:
+            items (dict, Mapping): Initial content. Values which are strings
+                are interned.
+
+        """
+
+        if items:
+            keys = tuple(interned(key) for key in items)
+            self.shape = Shape.of(keys)
+            self.values = [interned(items[key]) for key in keys]
+        else:
+            self.shape = EMPTY
+            self.values = list()
+
+    def __getitem__(self, key):
+        return self.values[self.shape.index[key]]
+
+    def __setitem__(self, key, value):
+        i = self.shape.index.get(key)
+
+        if i is None:
+            self.shape = self.shape.added(interned(key))
+            self.values.append(interned(value))
+        else:
+            self.values[i] = interned(value)
+
+    def __delitem__(self, key):
+        i = self.shape.index[key]
+
+        self.shape = self.shape.removed(key)
+        del self.values[i]
+
+    def __contains__(self, key):
+        return key in self.shape.index
+
+    def __iter__(self):
+        return iter(self.shape.keys)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def get(self, key, default=None):
+        i = self.shape.index.get(key)
+
+        return default if i is None else self.values[i]
+
+    def copy(self):
+        """Returns the record with the same content.
+        """
+
+        record = TokenRecord()
+        record.shape = self.shape
+        record.values = list(self.values)
+
+        return record
+
+
+EMPTY = Shape.of(())
+
+
+def compact(value):
+    """Convert value to records. Mappings (like lines of readers and their
+    fields) become TokenRecords with their nested mappings converted too,
+    and strings are interned.
+
+    Args:
+        value (*)
+
+    Returns:
+        *: TokenRecord if the value is a mapping, the value otherwise.
+
+    """
+
+    if isinstance(value, Mapping):
+        record = TokenRecord()
+        record.shape = Shape.of(tuple(interned(key) for key in value))
+        record.values = [compact(value[key]) for key in record.shape.keys]
+        return record
+
+    return interned(value)
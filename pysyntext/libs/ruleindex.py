@@ -0,0 +1,466 @@
+"""In-memory indexes over recognition rules. They're being built once from the
+documents stored in DB, so MorphologyRecognizer can answer the lookups without
+querying the collection for each token.
+"""
+
+
+def copyRule(rule):
+    """Returns a copy of the rule which can be safely modified by appliers and
+    Prioritizer, so the indexed document stays untouched.
+
+    Args:
+        rule (dict): A rule as it stored in DB.
+
+    Returns:
+        dict: Copy of the rule with copied "data" list.
+
+    """
+
+    rule = dict(rule)
+
+    if isinstance(rule.get("data"), list):
+        rule["data"] = list(rule["data"])
+
+    return rule
+
+
+class AffixAutomaton:
+    """Aho-Corasick automaton built over affixes of "rules" documents. Finds
+    all the rules which have at least one affix occuring in the token in one
+    walk over the token's characters.
+
+    Properties:
+        documents (list): Indexed rules in the order they were given.
+        goto (list of dict): Transitions of the automaton: goto[state][char].
+        fail (list of int): Failure links of each state.
+        out (list of tuple): Indexes of documents that are matched when the
+            automaton reaches the state. Outputs of failure links are already
+            merged in.
+
+    """
+
+    def __init__(self, documents):
+        """Build the automaton.
+
+        Args:
+            documents (iterable): Rules as they are stored in DB. Each of them
+                must have a list of affixes in "data" field; documents without
+                it will be skipped, as DB query does.
+
+        """
+
+        self.documents = list()
+        self.goto = [dict()]
+        self.fail = [0]
+        out = [set()]
+
+        for document in documents:
+            if not isinstance(document.get("data"), list):
+                continue
+
+            index = len(self.documents)
+            self.documents.append(document)
+
+            for affix in document["data"]:
+                if not isinstance(affix, str):
+                    continue
+
+                state = 0
+                for char in affix:
+                    if char not in self.goto[state]:
+                        self.goto.append(dict())
+                        self.fail.append(0)
+                        out.append(set())
+                        self.goto[state][char] = len(self.goto) - 1
+                    state = self.goto[state][char]
+
+                out[state].add(index)
+
+        # Breadth-first traversal sets failure links, so the parent's link is
+        # always completed before its children.
+        queue = list(self.goto[0].values())
+        i = 0
+        while i < len(queue):
+            state = queue[i]
+            i += 1
+
+            for char, child in self.goto[state].items():
+                queue.append(child)
+
+                link = self.fail[state]
+                while link and char not in self.goto[link]:
+                    link = self.fail[link]
+
+                self.fail[child] = self.goto[link].get(char, 0)
+                out[child] |= out[self.fail[child]]
+
+        self.out = [tuple(sorted(indexes)) for indexes in out]
+
+    def search(self, token):
+        """Guess all the rules that can be applied to this token. Result is
+        the same as MorphologyRecognizer.getRulesFor returns from DB.
+
+        Args:
+            token (str)
+
+        Returns:
+            list: Copies of matched rules in the order they were indexed. An
+                empty list if nothing works.
+
+        """
+
+        goto = self.goto
+        fail = self.fail
+        out = self.out
+
+        matched = set(out[0])
+        state = 0
+
+        for char in token:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            matched.update(out[state])
+
+        return [copyRule(self.documents[i]) for i in sorted(matched)]
+
+
+class Lexicon:
+    """Hash index over "exceptions" and "static" documents. These rules are
+    just lists of words, so each word is mapped to the documents containing
+    it.
+
+    Properties:
+        TYPES (tuple): Types of indexed documents in order they are applied
+            by MorphologyRecognizer.recognize.
+        words (dict): Indexed words: {word: {type: [documents]}}.
+
+    """
+
+    TYPES = ("exceptions", "static")
+
+    def __init__(self, documents):
+        """Build the index.
+
+        Args:
+            documents (iterable): Rules as they are stored in DB. Documents of
+                types other than listed in TYPES will be skipped.
+
+        """
+
+        self.words = dict()
+
+        for document in documents:
+            if document.get("type") not in self.TYPES:
+                continue
+            if not isinstance(document.get("data"), list):
+                continue
+
+            for word in document["data"]:
+                bundle = self.words.setdefault(word, dict()).setdefault(
+                    document["type"], list()
+                )
+                # The same word may be listed twice in one document, but DB
+                # returns such document only once.
+                if not bundle or bundle[-1] is not document:
+                    bundle.append(document)
+
+    def get(self, type, token):
+        """Returns rules of the given type which contains the token.
+
+        Args:
+            type (str): One of TYPES.
+            token (str)
+
+        Returns:
+            list: Copies of the rules. An empty list if nothing works.
+
+        """
+
+        entry = self.words.get(token)
+
+        if not entry or type not in entry:
+            return []
+
+        return [copyRule(rule) for rule in entry[type]]
+
+    def lookup(self, token):
+        """Returns rules for the token from the first type in TYPES which
+        contains it. That's the same as applying getExceptions and getStatic
+        of MorphologyRecognizer one after another.
+
+        Args:
+            token (str)
+
+        Returns:
+            list: Copies of the rules. An empty list if nothing works.
+
+        """
+
+        entry = self.words.get(token)
+
+        if not entry:
+            return []
+
+        for type in self.TYPES:
+            if type in entry:
+                return [copyRule(rule) for rule in entry[type]]
+
+        return []
+
+    def lookupMany(self, tokens):
+        """Apply lookup method to each of the tokens.
+
+        Args:
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}.
+
+        """
+
+        return {token: self.lookup(token) for token in tokens}
+
+
+class EdgeTrie:
+    """Prefix and suffix tries over affixes of rules. For the given token they
+    find the longest affix of each rule which is the beginning or the ending
+    of the token in one walk over its characters from both sides. Can be used
+    as applierFunc: it makes the same choice as
+    MorphologyRecognizer.selectByEnding, but does not modify the bundle.
+
+    The tries are built once over all the rules. Rules of a bundle are found
+    in them by "_id", so changes of rules made after building are not seen.
+    Affixes of rules which were not added are checked one by one.
+
+    Properties:
+        numbers (dict): Numbers of added rules by their keys (see key method).
+        singles (list): First affix of length 1 of each rule (or None).
+        empties (list of bool): Whether the rule contains an empty affix.
+        prefixes, suffixes (dict): Roots of the tries. Each node is a dict
+            {"children": {char: node}, "ends": {number: position}}, where
+            "ends" maps numbers of rules which contain the affix ending at
+            this node to the position of the affix in the rule's data.
+
+    """
+
+    def __init__(self, documents=()):
+        """Init the tries.
+
+        Args:
+            documents (iterable): Rules to be added. Documents without "_id"
+                or without list of affixes are skipped.
+
+        """
+
+        self.numbers = dict()
+        self.singles = list()
+        self.empties = list()
+        self.prefixes = {"children": dict(), "ends": dict()}
+        self.suffixes = {"children": dict(), "ends": dict()}
+
+        for document in documents:
+            if isinstance(document.get("data"), list):
+                self.add(document)
+
+    @staticmethod
+    def key(rule):
+        """Returns the key which identify the rule among added ones.
+
+        Args:
+            rule (dict)
+
+        Returns:
+            str: None if the rule has no "_id".
+
+        """
+
+        return str(rule["_id"]) if "_id" in rule else None
+
+    def add(self, rule):
+        """Add affixes of the rule to the tries.
+
+        Args:
+            rule (dict): A rule as it stored in DB.
+
+        Returns:
+            int: Number of the rule. None if it has no "_id", so it can't be
+                added.
+
+        """
+
+        key = self.key(rule)
+        if key is None:
+            return None
+        if key in self.numbers:
+            return self.numbers[key]
+
+        number = len(self.singles)
+        self.numbers[key] = number
+        self.singles.append(None)
+        self.empties.append(False)
+
+        for position, affix in enumerate(rule["data"]):
+            if not isinstance(affix, str):
+                continue
+            if len(affix) == 0:
+                self.empties[number] = True
+                continue
+            if len(affix) == 1:
+                if self.singles[number] is None:
+                    self.singles[number] = affix
+                continue
+
+            for root, chars in [
+                (self.prefixes, affix), (self.suffixes, reversed(affix))
+            ]:
+                node = root
+                for char in chars:
+                    node = node["children"].setdefault(
+                        char, {"children": dict(), "ends": dict()}
+                    )
+                node["ends"].setdefault(number, position)
+
+        return number
+
+    def edges(self, root, chars):
+        """Walk the trie by the characters and collect the longest matches.
+
+        Args:
+            root (dict): self.prefixes or self.suffixes.
+            chars (iterable): Characters of the token in order of walking.
+
+        Returns:
+            dict: {number: (length, position)} of the longest affix of each
+                rule.
+
+        """
+
+        found = dict()
+        node = root
+
+        for length, char in enumerate(chars, start=1):
+            node = node["children"].get(char)
+            if node is None:
+                break
+            for number, position in node["ends"].items():
+                found[number] = (length, position)
+
+        return found
+
+    @staticmethod
+    def edge(rule, token):
+        """Find the edge of the token for the rule which is not in the tries,
+        checking its affixes one by one.
+
+        Args:
+            rule (dict)
+            token (str)
+
+        Returns:
+            str: The longest affix (earlier listed of the equal ones) which is
+                the beginning or the ending of the token. Then the first affix
+                of length 1 or "" if there are such ones. None otherwise.
+
+        """
+
+        best = None
+        bestKey = None
+        single = None
+        empty = False
+
+        for position, affix in enumerate(rule["data"]):
+            if not isinstance(affix, str):
+                continue
+            if len(affix) == 0:
+                empty = True
+            elif len(affix) == 1:
+                if single is None:
+                    single = affix
+            elif token.startswith(affix) or token.endswith(affix):
+                if bestKey is None or (len(affix), -position) > bestKey:
+                    best = affix
+                    bestKey = (len(affix), -position)
+
+        if best is not None:
+            return best
+        if single is not None and token:
+            return single
+        if empty:
+            return ""
+
+        return None
+
+    def select(self, bundle, token):
+        """Returns copy of the rule from bundle with the longest affix which is
+        the beginning or the ending of the token. Its "data" contains only this
+        affix.
+
+        Args:
+            (See MorphologyRecognizer.recognize)
+
+        Returns:
+            dict: The chosen rule. None if the bundle is empty.
+
+        """
+
+        if not bundle:
+            return None
+
+        prefixes = self.edges(self.prefixes, token)
+        suffixes = self.edges(self.suffixes, reversed(token))
+
+        best = None
+        bestLength = -1
+
+        for rule in bundle:
+            number = self.numbers.get(self.key(rule))
+
+            if number is None:
+                edge = self.edge(rule, token)
+            else:
+                edge = self.edgeOf(number, token, prefixes, suffixes)
+
+            length = len(edge) if edge else 0
+            if length > bestLength:
+                best = (rule, edge)
+                bestLength = length
+
+        rule = copyRule(best[0])
+        rule["data"] = [best[1]]
+
+        return rule
+
+    def edgeOf(self, number, token, prefixes, suffixes):
+        """Find the edge of the token for the added rule.
+
+        Args:
+            number (int): Number of the rule.
+            token (str)
+            prefixes, suffixes (dict): Results of edges for the token.
+
+        Returns:
+            str: See edge.
+
+        """
+
+        prefix = prefixes.get(number)
+        suffix = suffixes.get(number)
+
+        # The longer affix wins, then the one which is listed earlier.
+        if prefix and (
+            not suffix or
+            (prefix[0], -prefix[1]) >= (suffix[0], -suffix[1])
+        ):
+            return token[:prefix[0]]
+        if suffix:
+            return token[-suffix[0]:]
+        if self.singles[number] is not None and token:
+            return self.singles[number]
+        if self.empties[number]:
+            return ""
+
+        return None
+
+    def __call__(self, bundle, token):
+        return self.select(bundle, token)
@@ -0,0 +1,489 @@
+"""Compiled snapshot of recognition rules. Rules, static words, exceptions and
+parsed XPOSes of a collection are exported into a single binary file, which
+can be memory-mapped and queried by MorphologyRecognizer without DB and
+without deserializing the whole file. Pages of the file are shared between
+all the processes which have it opened.
+
+Structure of the file:
+    8 bytes     MAGIC
+    4 bytes     Version, unsigned int in little-endian.
+    4 bytes     Length of the header, unsigned int in little-endian.
+    ...         Header: JSON with byte order, sizes of items and table of
+                contents {name: [offset, length, typecode]} of the arrays.
+    ...         Arrays, aligned to 8 bytes.
+
+Arrays (all of them are indexed from 0):
+    docs.*          Pickled documents in the order they were stored in DB.
+    xpos.*          Sorted XPOSes and their pickled parsed features.
+    words.*         Sorted words from "exceptions" and "static" documents and
+                    ranges of their postings.
+    postings        Document numbers for words: exceptions go first, then
+                    static ones.
+    ac.*            Flattened AffixAutomaton over "rules" documents.
+"""
+
+from libs.ruleindex import AffixAutomaton, Lexicon
+from libs.storage import asStorage
+from array import array
+from bisect import bisect_left
+import json
+import mmap
+import pickle
+import struct
+import sys
+
+
+class RuleSnapshot:
+    """Read-only memory-mapped snapshot of rules. It can be used as both
+    rulesIndex and lexicon of MorphologyRecognizer.
+
+    Properties:
+        MAGIC (bytes): Signature of snapshot files.
+        VERSION (int): Version of the format.
+        TYPES (tuple): Types of documents which are exported.
+        path (str): Path to the snapshot file.
+        header (dict): Decoded header of the file.
+        arrays (dict): Memoryviews of all the arrays from the file.
+
+    """
+
+    MAGIC = b"SYNTXRUL"
+    VERSION = 1
+    TYPES = ("rules",) + Lexicon.TYPES
+
+    def __init__(self, path):
+        """Map the file into memory and check its header.
+
+        Args:
+            path (str): Path to the file created by RuleSnapshot.compile.
+
+        Raises:
+            SnapshotError: The file is not a snapshot, has unsupported
+                version or was compiled on the machine with another byte
+                order.
+
+        """
+
+        self.path = path
+
+        with open(path, "rb") as fp:
+            self.mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.mmap[:len(self.MAGIC)] != self.MAGIC:
+            self.close()
+            raise SnapshotError(f"{path} is not a rules snapshot.")
+
+        version, length = struct.unpack_from(
+            "<II", self.mmap, len(self.MAGIC)
+        )
+        if version != self.VERSION:
+            self.close()
+            raise SnapshotError(
+                f"Version {version} of {path} is not supported. Compile the "
+                f"snapshot again."
+            )
+
+        start = len(self.MAGIC) + 8
+        self.header = json.loads(
+            self.mmap[start:start + length].decode("utf-8")
+        )
+
+        if (
+            self.header["byteorder"] != sys.byteorder or
+            self.header["itemsize"] != array("I").itemsize
+        ):
+            self.close()
+            raise SnapshotError(
+                f"{path} was compiled on the platform with another byte "
+                f"order or sizes of integers."
+            )
+
+        self.view = memoryview(self.mmap)
+        self.arrays = dict()
+
+        for name, (offset, size, typecode) in self.header["toc"].items():
+            chunk = self.view[offset:offset + size]
+            self.arrays[name] = chunk.cast(typecode) if typecode else chunk
+
+    @staticmethod
+    def compile(collection, path, tagparser=None):
+        """Export rules from the collection into snapshot file.
+
+        Args:
+            collection (Collection, RuleStorage): Collection with rules.
+            path (str): Where to write the snapshot.
+            tagparser (Class): Class with "parse" method. If given, parsed
+                XPOSes will be stored too, so MorphologyRecognizer won't parse
+                them again.
+
+        Returns:
+            dict: Header of the written file.
+
+        """
+
+        documents = list(asStorage(collection).documents(RuleSnapshot.TYPES))
+        numbers = {id(document): i for i, document in enumerate(documents)}
+
+        arrays = dict()
+
+        arrays["docs.offsets"], arrays["docs.blob"] = packBlobs(
+            pickle.dumps(document, protocol=4) for document in documents
+        )
+
+        # Parsed XPOSes
+        features = dict()
+        if tagparser:
+            for document in documents:
+                if "xpos" not in document or document["xpos"] in features:
+                    continue
+                try:
+                    features[document["xpos"]] = tagparser.parse(
+                        document["xpos"]
+                    )
+                except Exception:
+                    # Such XPOS will be parsed in runtime and fail there
+                    continue
+        keys = sorted(features, key=lambda xpos: xpos.encode("utf-8"))
+        arrays["xpos.keys.offsets"], arrays["xpos.keys.blob"] = packBlobs(
+            xpos.encode("utf-8") for xpos in keys
+        )
+        arrays["xpos.values.offsets"], arrays["xpos.values.blob"] = packBlobs(
+            pickle.dumps(features[xpos], protocol=4) for xpos in keys
+        )
+
+        # Words of exceptions and static rules
+        lexicon = Lexicon(documents)
+        words = sorted(lexicon.words, key=lambda word: word.encode("utf-8"))
+        arrays["words.keys.offsets"], arrays["words.keys.blob"] = packBlobs(
+            word.encode("utf-8") for word in words
+        )
+        arrays["words.start"] = array("I", [0])
+        arrays["words.exceptions"] = array("I")
+        arrays["postings"] = array("I")
+        for word in words:
+            entry = lexicon.words[word]
+            exceptions = entry.get("exceptions", [])
+            arrays["words.exceptions"].append(len(exceptions))
+            for document in exceptions + entry.get("static", []):
+                arrays["postings"].append(numbers[id(document)])
+            arrays["words.start"].append(len(arrays["postings"]))
+
+        # Automaton over affixes
+        automaton = AffixAutomaton(
+            document for document in documents
+            if document["type"] == "rules"
+        )
+        arrays["ac.trans.start"] = array("I", [0])
+        arrays["ac.trans.chars"] = array("I")
+        arrays["ac.trans.targets"] = array("I")
+        arrays["ac.out.start"] = array("I", [0])
+        arrays["ac.out"] = array("I")
+        for state, transitions in enumerate(automaton.goto):
+            for char in sorted(transitions):
+                arrays["ac.trans.chars"].append(ord(char))
+                arrays["ac.trans.targets"].append(transitions[char])
+            arrays["ac.trans.start"].append(len(arrays["ac.trans.chars"]))
+            for i in automaton.out[state]:
+                arrays["ac.out"].append(
+                    numbers[id(automaton.documents[i])]
+                )
+            arrays["ac.out.start"].append(len(arrays["ac.out"]))
+        arrays["ac.fail"] = array("I", automaton.fail)
+
+        # Lay out the arrays, offsets are relative to the end of the header.
+        toc = dict()
+        position = 0
+        for name, data in arrays.items():
+            position += -position % 8
+            size = len(data) * data.itemsize if isinstance(data, array) \
+                else len(data)
+            typecode = data.typecode if isinstance(data, array) else None
+            toc[name] = [position, size, typecode]
+            position += size
+
+        header = {
+            "byteorder": sys.byteorder,
+            "itemsize": array("I").itemsize,
+            "documents": len(documents),
+            "toc": toc
+        }
+
+        # Offsets of arrays depend on the length of the header, which in turn
+        # depends on the offsets, so grow the place for it until they fit.
+        relative = {name: entry[0] for name, entry in toc.items()}
+        base = 0
+        while True:
+            for name in toc:
+                toc[name][0] = relative[name] + base
+            encoded = json.dumps(header).encode("utf-8")
+            needed = len(RuleSnapshot.MAGIC) + 8 + len(encoded)
+            needed += -needed % 8
+            if needed <= base:
+                break
+            base = needed
+        encoded += b" " * (base - len(RuleSnapshot.MAGIC) - 8 - len(encoded))
+
+        with open(path, "wb") as fp:
+            fp.write(RuleSnapshot.MAGIC)
+            fp.write(struct.pack("<II", RuleSnapshot.VERSION, len(encoded)))
+            fp.write(encoded)
+            for name, data in arrays.items():
+                fp.write(b"\0" * (toc[name][0] - fp.tell()))
+                fp.write(
+                    data.tobytes() if isinstance(data, array) else data
+                )
+
+        return header
+
+    def document(self, number):
+        """Returns the document by its number.
+
+        Args:
+            number (int)
+
+        Returns:
+            dict: A new copy of the document as it stored in DB.
+
+        """
+
+        return pickle.loads(
+            blobAt(
+                self.arrays["docs.offsets"], self.arrays["docs.blob"], number
+            )
+        )
+
+    def documents(self, types=None):
+        """Returns the documents in the order they were stored in DB, like
+        RuleStorage.documents does.
+
+        Args:
+            types (list): Return only documents with these "type" fields. All
+                documents will be returned if not given.
+
+        Yields:
+            dict: New copies of the documents.
+
+        """
+
+        for number in range(len(self.arrays["docs.offsets"]) - 1):
+            document = self.document(number)
+            if types is None or document.get("type") in types:
+                yield document
+
+    def search(self, token):
+        """Guess all the rules that can be applied to this token. Works like
+        AffixAutomaton.search.
+
+        Args:
+            token (str)
+
+        Returns:
+            list: Matched rules in the order they were stored in DB.
+
+        """
+
+        start = self.arrays["ac.trans.start"]
+        chars = self.arrays["ac.trans.chars"]
+        targets = self.arrays["ac.trans.targets"]
+        fail = self.arrays["ac.fail"]
+        outStart = self.arrays["ac.out.start"]
+        out = self.arrays["ac.out"]
+
+        matched = set(out[outStart[0]:outStart[1]])
+        state = 0
+
+        for char in token:
+            code = ord(char)
+            while True:
+                lo, hi = start[state], start[state + 1]
+                i = bisect_left(chars, code, lo, hi)
+                if i < hi and chars[i] == code:
+                    state = targets[i]
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            matched.update(out[outStart[state]:outStart[state + 1]])
+
+        return [self.document(number) for number in sorted(matched)]
+
+    def get(self, type, token):
+        """Returns rules of the given type which contains the token. Works
+        like Lexicon.get.
+
+        Args:
+            type (str): "exceptions" or "static".
+            token (str)
+
+        Returns:
+            list: Rules. An empty list if nothing works.
+
+        """
+
+        i = self.findWord(token)
+        if i is None:
+            return []
+
+        start = self.arrays["words.start"][i]
+        end = self.arrays["words.start"][i + 1]
+        middle = start + self.arrays["words.exceptions"][i]
+
+        if type == "exceptions":
+            end = middle
+        else:
+            start = middle
+
+        return [
+            self.document(number)
+            for number in self.arrays["postings"][start:end]
+        ]
+
+    def lookup(self, token):
+        """Works like Lexicon.lookup.
+
+        Args:
+            token (str)
+
+        Returns:
+            list: Rules. An empty list if nothing works.
+
+        """
+
+        return self.get("exceptions", token) or self.get("static", token)
+
+    def lookupMany(self, tokens):
+        """Works like Lexicon.lookupMany.
+
+        Args:
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}.
+
+        """
+
+        return {token: self.lookup(token) for token in tokens}
+
+    def features(self, xpos):
+        """Returns parsed features of XPOS, if they were compiled.
+
+        Args:
+            xpos (str)
+
+        Returns:
+            dict: Result of tagparser.parse. None if XPOS is unknown.
+
+        """
+
+        i = findKey(
+            self.arrays["xpos.keys.offsets"], self.arrays["xpos.keys.blob"],
+            xpos.encode("utf-8")
+        )
+        if i is None:
+            return None
+
+        return pickle.loads(
+            blobAt(
+                self.arrays["xpos.values.offsets"],
+                self.arrays["xpos.values.blob"], i
+            )
+        )
+
+    def findWord(self, word):
+        """Returns number of the word in words table.
+
+        Args:
+            word (str)
+
+        Returns:
+            int: Number of the word. None if there's no such word.
+
+        """
+
+        return findKey(
+            self.arrays["words.keys.offsets"], self.arrays["words.keys.blob"],
+            word.encode("utf-8")
+        )
+
+    def close(self):
+        """Release the mapped file.
+        """
+
+        if hasattr(self, "view"):
+            for view in self.arrays.values():
+                view.release()
+            self.view.release()
+            del self.arrays, self.view
+        self.mmap.close()
+
+
+def packBlobs(blobs):
+    """Concatenate blobs and returns them with the table of offsets.
+
+    Args:
+        blobs (iterable of bytes)
+
+    Returns:
+        tuple:
+            [0] array: Offsets. i-th blob is at [offsets[i]:offsets[i + 1]].
+            [1] bytes: Concatenated blobs.
+
+    """
+
+    offsets = array("Q", [0])
+    data = bytearray()
+
+    for blob in blobs:
+        data += blob
+        offsets.append(len(data))
+
+    return offsets, bytes(data)
+
+
+def blobAt(offsets, blob, i):
+    """Returns i-th blob packed by packBlobs.
+
+    Args:
+        offsets (memoryview): Offsets.
+        blob (memoryview): Concatenated blobs.
+        i (int)
+
+    Returns:
+        memoryview
+
+    """
+
+    return blob[offsets[i]:offsets[i + 1]]
+
+
+def findKey(offsets, blob, key):
+    """Binary search of the key among sorted blobs packed by packBlobs.
+
+    Args:
+        offsets (memoryview): Offsets.
+        blob (memoryview): Concatenated keys in ascending order.
+        key (bytes)
+
+    Returns:
+        int: Number of the key. None if not found.
+
+    """
+
+    lo, hi = 0, len(offsets) - 1
+
+    while lo < hi:
+        middle = (lo + hi) // 2
+        if blob[offsets[middle]:offsets[middle + 1]].tobytes() < key:
+            lo = middle + 1
+        else:
+            hi = middle
+
+    if lo < len(offsets) - 1 and \
+            blob[offsets[lo]:offsets[lo + 1]].tobytes() == key:
+        return lo
+
+    return None
+
+
+class SnapshotError(Exception):
+    pass
@@ -0,0 +1,539 @@
+"""Storages of rules. MorphologyRecognizer, ContextualProcessor and CYKAnalyzer
+make only a few kinds of queries, which are listed in RuleStorage. MongoStorage
+makes them to pymongo Collection, SQLiteStorage keeps rules in a local file
+and doesn't need any DB server. asStorage resolves addresses like
+"sqlite:rules.db#rules", so a SQLite collection can be set in config.json.
+"""
+
+from libs.ruleindex import copyRule
+from abc import ABC, abstractmethod
+from threading import Lock
+import json
+import sqlite3
+
+
+class RuleStorage(ABC):
+    """Base class for all storages of rules. Subclasses must implement
+    documents, rulesForMany and wordRulesMany; the methods for single tokens
+    call the latter two.
+
+    Properties:
+        name (str): Name of the collection of rules.
+
+    """
+
+    name = None
+
+    @abstractmethod
+    def documents(self, types=None):
+        """Returns all the documents in the order they were stored.
+
+        Args:
+            types (list): Return only documents with these "type" fields. All
+                documents will be returned if not given.
+
+        Returns:
+            iterator of dict
+
+        """
+
+    def rulesFor(self, token):
+        """Find "rules" documents which have any of their affixes ("data"
+        list) occuring in the token.
+
+        Args:
+            token (str)
+
+        Returns:
+            list: Rules in the order they were stored.
+
+        """
+
+        return self.rulesForMany([token])[token]
+
+    @abstractmethod
+    def rulesForMany(self, tokens):
+        """Apply rulesFor to each of the tokens.
+
+        Args:
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}.
+
+        """
+
+    def wordRules(self, type, token):
+        """Find documents of the given type which list the token in "data".
+
+        Args:
+            type (str): "static" or "exceptions".
+            token (str)
+
+        Returns:
+            list: Rules in the order they were stored.
+
+        """
+
+        return self.wordRulesMany(type, [token])[token]
+
+    @abstractmethod
+    def wordRulesMany(self, type, tokens):
+        """Apply wordRules to each of the tokens.
+
+        Args:
+            type (str): "static" or "exceptions".
+            tokens (list of str)
+
+        Returns:
+            dict: {token: list of rules}.
+
+        """
+
+    def close(self):
+        """Release resources of the storage.
+        """
+
+        pass
+
+
+class MongoStorage(RuleStorage):
+    """Storage which makes queries to MongoDB collection.
+
+    Properties:
+        collection (Collection): A Collection from pymongo.
+
+    """
+
+    def __init__(self, collection):
+        """Init the storage.
+
+        Args:
+            collection (Collection)
+
+        """
+
+        self.collection = collection
+        self.name = getattr(collection, "name", None)
+
+    def documents(self, types=None):
+        """See RuleStorage.documents.
+        """
+
+        if types is None:
+            return iter(self.collection.find({}))
+
+        return iter(self.collection.find({
+            "type": {
+                "$in": list(types)
+            }
+        }))
+
+    def rulesFor(self, token):
+        """See RuleStorage.rulesFor.
+        """
+
+        query = self.collection.aggregate([
+            {
+                "$match": {
+                    "$expr": {
+                        "$anyElementTrue": {
+                            "$map": {
+                                "input": "$data",
+                                "as": "s",
+                                "in": {
+                                    "$ne": [
+                                        -1,
+                                        {
+                                            "$indexOfBytes": [
+                                                token, "$$s"
+                                            ]
+                                        }
+                                    ]
+                                }
+                            }
+                        }
+                    },
+                    "data": {
+                        "$type": "array"
+                    },
+                    "type": "rules"
+                }
+            }
+        ])
+
+        return list(query)
+
+    def rulesForMany(self, tokens):
+        """See RuleStorage.rulesForMany.
+        """
+
+        query = self.collection.aggregate([
+            {
+                "$match": {
+                    "$expr": {
+                        "$anyElementTrue": {
+                            "$map": {
+                                "input": "$data",
+                                "as": "s",
+                                "in": {
+                                    "$anyElementTrue": {
+                                        "$map": {
+                                            "input": list(tokens),
+                                            "as": "t",
+                                            "in": {
+                                                "$ne": [
+                                                    -1,
+                                                    {
+                                                        "$indexOfBytes": [
+                                                            "$$t", "$$s"
+                                                        ]
+                                                    }
+                                                ]
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    },
+                    "data": {
+                        "$type": "array"
+                    },
+                    "type": "rules"
+                }
+            }
+        ])
+
+        rules = list(query)
+
+        # Response contains rules for all the tokens, so distribute them
+        return {
+            token: [
+                copyRule(rule)
+                for rule in rules
+                if any(affix in token for affix in rule["data"])
+            ]
+            for token in tokens
+        }
+
+    def wordRules(self, type, token):
+        """See RuleStorage.wordRules.
+        """
+
+        return list(
+            self.collection.find({
+                "type": type,
+                "data": {
+                    "$in": [token]
+                }
+            })
+        )
+
+    def wordRulesMany(self, type, tokens):
+        """See RuleStorage.wordRulesMany.
+        """
+
+        found = {token: list() for token in tokens}
+
+        for rule in self.collection.find({
+            "type": type,
+            "data": {
+                "$in": list(tokens)
+            }
+        }):
+            for word in set(rule["data"]):
+                if word in found:
+                    found[word].append(copyRule(rule))
+
+        return found
+
+
+class SQLiteStorage(RuleStorage):
+    """Storage which keeps documents in SQLite database. Words of "static"
+    and "exceptions" documents and affixes of "rules" are stored in separate
+    indexed tables, so all the queries are index lookups.
+
+    Documents are stored as JSON, so values which are not JSON-serializable
+    (like ObjectId in "_id") become strings.
+
+    The storage can be used from several threads (AsyncMorphologyRecognizer
+    makes lookups in a pool of threads), queries are made one at a time.
+
+    Properties:
+        LIMIT (int): Maximum number of parameters in one SQL query.
+        connection (sqlite3.Connection)
+        lock (Lock): Lock which is held while the connection is used.
+        tables (dict): Quoted names of tables of this collection.
+
+    """
+
+    LIMIT = 900
+
+    def __init__(self, path, name="rules"):
+        """Open the database and create tables if they don't exist.
+
+        Args:
+            path (str): Path to the database file.
+            name (str): Name of the collection. One file can hold several
+                collections.
+
+        """
+
+        self.name = name
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = Lock()
+
+        self.tables = {
+            table: '"' + f"{name}_{table}".replace('"', '""') + '"'
+            for table in ["documents", "words", "affixes"]
+        }
+
+        documents = self.tables["documents"]
+        words = self.tables["words"]
+        affixes = self.tables["affixes"]
+        index = name.replace('"', '""')
+
+        self.connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {documents} (
+                id INTEGER PRIMARY KEY,
+                type TEXT,
+                body TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS "{index}_documents_type"
+                ON {documents} (type, id);
+            CREATE TABLE IF NOT EXISTS {words} (
+                type TEXT NOT NULL,
+                word TEXT NOT NULL,
+                document INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS "{index}_words_word"
+                ON {words} (type, word, document);
+            CREATE TABLE IF NOT EXISTS {affixes} (
+                affix TEXT NOT NULL,
+                document INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS "{index}_affixes_affix"
+                ON {affixes} (affix, document);
+        """)
+
+    def insertMany(self, documents, replace=False):
+        """Append the documents to the storage.
+
+        Args:
+            documents (iterable of dict)
+            replace (bool): Remove all the documents of the collection first,
+                in the same transaction, so the collection will contain only
+                the given documents.
+
+        Returns:
+            int: Number of inserted documents.
+
+        """
+
+        counter = 0
+
+        with self.lock, self.connection:
+            if replace:
+                for table in self.tables.values():
+                    self.connection.execute(f"DELETE FROM {table}")
+
+            for document in documents:
+                cursor = self.connection.execute(
+                    f"INSERT INTO {self.tables['documents']} (type, body) "
+                    f"VALUES (?, ?)",
+                    (
+                        document.get("type"),
+                        json.dumps(
+                            document, default=str, ensure_ascii=False
+                        )
+                    )
+                )
+                counter += 1
+
+                data = document.get("data")
+                if not isinstance(data, list):
+                    continue
+
+                strings = set(item for item in data if isinstance(item, str))
+
+                if document.get("type") == "rules":
+                    self.connection.executemany(
+                        f"INSERT INTO {self.tables['affixes']} "
+                        f"(affix, document) VALUES (?, ?)",
+                        [(affix, cursor.lastrowid) for affix in strings]
+                    )
+                elif document.get("type") is not None:
+                    self.connection.executemany(
+                        f"INSERT INTO {self.tables['words']} "
+                        f"(type, word, document) VALUES (?, ?, ?)",
+                        [
+                            (document["type"], word, cursor.lastrowid)
+                            for word in strings
+                        ]
+                    )
+
+        return counter
+
+    def documents(self, types=None):
+        """See RuleStorage.documents.
+        """
+
+        if types is None:
+            query = f"SELECT body FROM {self.tables['documents']} ORDER BY id"
+            types = list()
+        else:
+            types = list(types)
+            query = (
+                f"SELECT body FROM {self.tables['documents']} "
+                f"WHERE type IN ({', '.join('?' * len(types))}) ORDER BY id"
+            )
+
+        # Rows are fetched at once, so the lock isn't held while the caller
+        # iterates over them
+        with self.lock:
+            rows = self.connection.execute(query, types).fetchall()
+
+        return (json.loads(body) for (body,) in rows)
+
+    def select(self, query, values, prefix=()):
+        """Execute the query for each chunk of values and collect the rows.
+
+        Args:
+            query (str): Query with "{}" in place of the list of parameters.
+            values (list): Values for IN operator.
+            prefix (list): Parameters which precede IN operator in the query.
+
+        Returns:
+            list: Fetched rows.
+
+        """
+
+        rows = list()
+
+        with self.lock:
+            for start in range(0, len(values), self.LIMIT):
+                chunk = values[start:start + self.LIMIT]
+                rows += self.connection.execute(
+                    query.format(", ".join("?" * len(chunk))),
+                    list(prefix) + chunk
+                ).fetchall()
+
+        return rows
+
+    def load(self, ids):
+        """Returns documents by their ids.
+
+        Args:
+            ids (iterable of int)
+
+        Returns:
+            dict: {id: document}.
+
+        """
+
+        return {
+            id: json.loads(body)
+            for id, body in self.select(
+                f"SELECT id, body FROM {self.tables['documents']} "
+                f"WHERE id IN ({{}})",
+                sorted(set(ids))
+            )
+        }
+
+    def rulesForMany(self, tokens):
+        """See RuleStorage.rulesForMany.
+        """
+
+        # An affix occurs in the token if it's one of the token's substrings
+        substrings = dict()
+        for token in tokens:
+            substrings[token] = set(
+                token[i:j]
+                for i in range(len(token) + 1)
+                for j in range(i, len(token) + 1)
+            )
+
+        matches = dict()
+        for affix, id in self.select(
+            f"SELECT affix, document FROM {self.tables['affixes']} "
+            f"WHERE affix IN ({{}})",
+            list(set().union(*substrings.values()))
+        ):
+            matches.setdefault(affix, set()).add(id)
+
+        found = dict()
+        for token in tokens:
+            found[token] = set()
+            for substring in substrings[token]:
+                found[token] |= matches.get(substring, set())
+
+        documents = self.load(set().union(*found.values()))
+
+        return {
+            token: [copyRule(documents[id]) for id in sorted(found[token])]
+            for token in tokens
+        }
+
+    def wordRulesMany(self, type, tokens):
+        """See RuleStorage.wordRulesMany.
+        """
+
+        found = {token: set() for token in tokens}
+        rows = self.select(
+            f"SELECT word, document FROM {self.tables['words']} "
+            f"WHERE type = ? AND word IN ({{}})",
+            list(found), prefix=[type]
+        )
+
+        for word, id in rows:
+            found[word].add(id)
+
+        documents = self.load(
+            id for ids in found.values() for id in ids
+        )
+
+        return {
+            token: [copyRule(documents[id]) for id in sorted(ids)]
+            for token, ids in found.items()
+        }
+
+    def close(self):
+        """See RuleStorage.close.
+        """
+
+        with self.lock:
+            self.connection.close()
+
+
+def asStorage(collection):
+    """Wrap pymongo Collection into MongoStorage. Storages are returned as
+    they are, and addresses of SQLite collections are opened as
+    SQLiteStorage.
+
+    Args:
+        collection (Collection, RuleStorage, str): Address has the form
+            "sqlite:path/to/file.db" or "sqlite:path/to/file.db#name",
+            where name is the name of the collection in the file ("rules" by
+            default).
+
+    Returns:
+        RuleStorage
+
+    Raises:
+        ValueError: Address isn't of SQLite collection.
+
+    """
+
+    if isinstance(collection, RuleStorage):
+        return collection
+
+    if isinstance(collection, str):
+        if not collection.startswith("sqlite:"):
+            raise ValueError(f"Unknown address of storage: {collection}")
+
+        path, _, name = collection[len("sqlite:"):].partition("#")
+
+        return SQLiteStorage(path, name=name or "rules")
+
+    return MongoStorage(collection)
@@ -0,0 +1,232 @@
+"""Transparent reading of compressed files. Files compressed with gzip, bzip2
+or xz are detected by their magic bytes and decompressed on the fly in a
+separate thread, which reads ahead while the text is being parsed. Other
+files are read as they are.
+
+Usage:
+    fp = openText("uk.conllu.gz")
+    reader = ConlluReader(fp)
+
+GCReader does the same with the file it's given, so files opened with plain
+open() are decompressed too.
+"""
+
+from queue import Queue, Empty
+from threading import Thread
+import atexit
+import bz2
+import gzip
+import io
+import lzma
+import weakref
+
+
+# {magic bytes: module which opens such files}
+MAGICS = {
+    b"\x1f\x8b": gzip,
+    b"BZh": bz2,
+    b"\xfd7zXZ\x00": lzma
+}
+MAGICSIZE = max(len(magic) for magic in MAGICS)
+
+# Opened ReadAheadStreams. Their threads are stopped at exit, since daemon
+# threads can't be left while they're reading files.
+STREAMS = weakref.WeakSet()
+
+
+def detect(head):
+    """Find the compression of the file by its first bytes.
+
+    Args:
+        head (bytes): The first bytes of the file.
+
+    Returns:
+        module: gzip, bz2 or lzma. None if the file is not compressed.
+
+    """
+
+    for magic, module in MAGICS.items():
+        if head.startswith(magic):
+            return module
+
+    return None
+
+
+class ReadAheadStream(io.RawIOBase):
+    """Binary stream which reads another stream by chunks in a separate
+    thread, so the next chunks are being read (and decompressed) while the
+    previous ones are being parsed.
+
+    Properties:
+        file (file): Stream to read from.
+        name (str): Name of the file.
+        size (int): Number of bytes read at once.
+        queue (Queue): Read chunks. Empty bytes mean end of the stream, an
+            exception means it was raised during reading.
+        rest (memoryview): Unread part of the current chunk.
+        finished (bool): Whether the end of the stream was reached.
+        stopped (bool): Whether the stream was closed.
+        thread (Thread): Thread which reads the file.
+        source (file): File which the stream was made of. It's kept, so it's
+            not closed by garbage collector.
+
+    """
+
+    def __init__(self, fp, name, size=1 << 20, ahead=4, source=None):
+        """Init the stream and start reading.
+
+        Args:
+            fp (file), name (str), size (int), source (file): See the
+                properties.
+            ahead (int): Maximum number of chunks read ahead.
+
+        """
+
+        super().__init__()
+
+        self.file = fp
+        self.source = source
+        self.name = name
+        self.size = size
+        self.queue = Queue(ahead)
+        self.rest = memoryview(b"")
+        self.finished = False
+        self.stopped = False
+
+        self.thread = Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+        STREAMS.add(self)
+
+    def fill(self):
+        """Read the file into the queue. It's being run in the thread.
+        """
+
+        try:
+            while not self.stopped:
+                chunk = self.file.read(self.size)
+                self.queue.put(chunk)
+                if not chunk:
+                    return
+        except EOFError as error:
+            # Readers take EOFError for the end of the file, but here the
+            # file is broken
+            self.queue.put(OSError(f"{self.name} is truncated: {error}"))
+        except Exception as error:
+            self.queue.put(error)
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        if not self.rest:
+            if self.finished:
+                return 0
+
+            chunk = self.queue.get()
+
+            if isinstance(chunk, Exception):
+                self.finished = True
+                raise chunk
+
+            if not chunk:
+                self.finished = True
+                return 0
+
+            self.rest = memoryview(chunk)
+
+        size = min(len(target), len(self.rest))
+        target[:size] = self.rest[:size]
+        self.rest = self.rest[size:]
+
+        return size
+
+    def close(self):
+        """Stop the thread and close the file.
+        """
+
+        if not self.closed:
+            self.stopped = True
+
+            # Free the queue, so the thread isn't blocked on it
+            while self.thread.is_alive():
+                try:
+                    while True:
+                        self.queue.get_nowait()
+                except Empty:
+                    pass
+                self.thread.join(0.1)
+
+            self.file.close()
+            if self.source is not None:
+                self.source.close()
+
+        super().close()
+
+
+@atexit.register
+def closeAll():
+    """Close all the opened ReadAheadStreams.
+    """
+
+    for stream in list(STREAMS):
+        stream.close()
+
+
+def decompressed(fp, encoding="utf-8"):
+    """Returns text stream of the file, which is decompressed if the file is
+    compressed. Nothing must be read from the file before.
+
+    Args:
+        fp (file): Opened file in text or binary mode.
+        encoding (str): Encoding of the text, if fp is binary or compressed.
+
+    Returns:
+        file: fp itself if it's a text file which is not compressed.
+
+    """
+
+    text = isinstance(fp, io.TextIOBase)
+    binary = getattr(fp, "buffer", None) if text else fp
+
+    if binary is None or not hasattr(binary, "peek"):
+        # Compression can be detected only in buffered streams
+        return fp
+
+    try:
+        if binary.seekable() and binary.tell() != 0:
+            return fp
+    except (OSError, ValueError):
+        pass
+
+    module = detect(binary.peek(MAGICSIZE)[:MAGICSIZE])
+
+    if module is None:
+        return fp if text else io.TextIOWrapper(binary, encoding=encoding)
+
+    name = getattr(fp, "name", None)
+
+    return io.TextIOWrapper(
+        io.BufferedReader(
+            ReadAheadStream(module.open(binary), name, source=fp)
+        ),
+        encoding=encoding
+    )
+
+
+def openText(path, encoding="utf-8"):
+    """Open the file for reading text. Compressed files are decompressed.
+
+    Args:
+        path (str): Path to the file.
+        encoding (str)
+
+    Returns:
+        file: Text stream.
+
+    Raises:
+        ...Errors from open
+
+    """
+
+    return decompressed(open(path, mode="rb"), encoding)
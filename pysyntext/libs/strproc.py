@@ -94,6 +94,23 @@ REEMAIL = r"^.*@.*$"
 # Set of special characters
 RESPECIAL = r"[!@#$%^&*(),.?\"':{}|<>]"
 
+# Classes of characters which are checked by specialClass(). Each class is a
+# bit in the mask of the character; masks are computed once per character and
+# collected in CHARMASKS.
+CHARCLASSES = [
+    ("PUNCT", REPUNCT),
+    ("MARK", REMARKS),
+    ("DASH", REDASHSET),
+    ("COLON", RECOLON),
+    ("SEMICOLON", RESEMICOLON),
+    ("LBRACKET", RELEFTTXTBRACKET),
+    ("RBRACKET", RERIGHTTXTBRACKET),
+    ("SYM", RESPECIAL),
+    ("UKR", RECYRRUA),
+]
+CHARBITS = {name: 1 << i for i, (name, _) in enumerate(CHARCLASSES)}
+CHARMASKS = dict()
+
 
 def tokenize(sentence):
     """Tokenize the given sentence.
@@ -364,6 +381,85 @@ def isSym(token) -> bool:
     return reCoversEntire(token, regex=getCompiled(RESPECIAL + "+"))
 
 
+def charMask(char) -> int:
+    """Returns bit mask of classes from CHARCLASSES the character belongs to.
+
+    Args:
+        char (str): One character.
+
+    Returns:
+        int
+
+    Globals:
+        CHARCLASSES, CHARMASKS: Classes and computed masks.
+
+    """
+
+    global CHARCLASSES
+    global CHARMASKS
+
+    if char not in CHARMASKS:
+        mask = 0
+        for i, (_, regex) in enumerate(CHARCLASSES):
+            if getCompiled(f"(?:{regex})").fullmatch(char):
+                mask |= 1 << i
+        CHARMASKS[char] = mask
+
+    return CHARMASKS[char]
+
+
+def specialClass(token):
+    """Determine class of the token which can be recognized without DB in one
+    scan. Result is equal to checking isPunct, isComma, isDash, isColon,
+    isSemicolon, isLeftBracket, isRightBracket, isSym and hasNonUkrainian one
+    after another.
+
+    Args:
+        token (str)
+
+    Returns:
+        str: "Comm", "Dash", "Colo", "Semi", "LBra", "RBra" for punctuation
+            with this PunctType, "PUNCT" for other punctuation, "SYM" for
+            symbols and "X" for non-Ukrainian tokens.
+        None: Token is a Ukrainian word.
+
+    Globals:
+        CHARBITS: Bits of character classes.
+
+    """
+
+    global CHARBITS
+
+    # Every regex must cover the entire token, i.e. contain all of its
+    # characters, so intersect the masks.
+    mask = -1 if token else 0
+    for char in token:
+        mask &= CHARMASKS[char] if char in CHARMASKS else charMask(char)
+
+    if mask & CHARBITS["PUNCT"]:
+        if mask & CHARBITS["MARK"]:
+            return "Comm"
+        if mask & CHARBITS["DASH"]:
+            return "Dash"
+        if mask & CHARBITS["COLON"]:
+            return "Colo"
+        if mask & CHARBITS["SEMICOLON"]:
+            return "Semi"
+        if mask & CHARBITS["LBRACKET"]:
+            return "LBra"
+        if mask & CHARBITS["RBRACKET"]:
+            return "RBra"
+        return "PUNCT"
+
+    if mask & CHARBITS["SYM"]:
+        return "SYM"
+
+    if not mask & CHARBITS["UKR"]:
+        return "X"
+
+    return None
+
+
 def isSmile(token) -> bool:
     """Check if token is smile or at least smile notation.
     (It's about :smiles_between_doublecolons:).
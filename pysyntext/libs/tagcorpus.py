@@ -0,0 +1,204 @@
+"""Tag a whole corpus and write the result in CoNLL-U format. Sentences are
+taken from plain text (paragraphs are split into sentences) or from CoNLL-U
+file, tagged by ContextualProcessor, corrected by its Ctx19 rules (unless
+correct=False is passed) and written with ConlluWriter. Corpus is processed
+by windows of sentences, so memory doesn't depend on its size.
+
+Usage:
+    with ConlluWriter(open("out.conllu", "w", encoding="utf-8")) as writer:
+        tagCorpus(
+            textSentences(open("corpus.txt", encoding="utf-8")),
+            processor, writer
+        )
+"""
+
+from libs.strproc import paragraphs, sentences as splitSentences
+from itertools import islice
+import asyncio
+
+
+def textSentences(fp):
+    """Split plain text into sentences. Each line of the text is a
+    paragraph.
+
+    Args:
+        fp (file): Opened text file.
+
+    Yields:
+        tuple: (metadata, text of the sentence). Metadata contains "sent_id",
+            "text" and "newpar" for the first sentence of a paragraph.
+
+    """
+
+    counter = 0
+
+    for line in fp:
+        # Blank lines are not paragraphs
+        if not line.strip():
+            continue
+
+        for paragraph in paragraphs(line.rstrip("\n")):
+            metadata = {"newpar": None}
+
+            for sentence in splitSentences(paragraph):
+                counter += 1
+                metadata["sent_id"] = str(counter)
+                metadata["text"] = sentence
+                yield (metadata, sentence)
+                metadata = dict()
+
+
+def conlluSentences(reader):
+    """Take sentences of CoNLL-U file to tag them again.
+
+    Args:
+        reader (ConlluReader)
+
+    Yields:
+        tuple: (metadata of the sentence, its text). Text is taken from
+            "# text" comment or made of forms of tokens.
+
+    """
+
+    for sentence in reader.sentences():
+        metadata = sentence.get("metadata", dict())
+        text = metadata.get("text") or " ".join(
+            line["data"]["form"] for line in sentence["sentence"]
+        )
+
+        yield (metadata, text)
+
+
+def tokenFields(token):
+    """Convert token returned by ContextualProcessor to CoNLL-U fields.
+
+    Args:
+        token (dict): Token with "word", "upos", "xpos" and features.
+
+    Returns:
+        dict: Fields for ConlluWriter. Features are the keys which start with
+            capital letter, as they do in Universal Dependencies.
+            Unrecognized tokens get "X" UPOS. HEAD and DEPREL are left
+            unspecified, so the result must be read with strict=False.
+
+    """
+
+    return {
+        "form": token["word"],
+        "lemma": token.get("lemma"),
+        # UPOS can't be left "_": readers take such lines for multiword
+        # tokens and skip them. "X" is the UD tag for words which can't be
+        # given a part of speech.
+        "upos": token.get("upos") or "X",
+        "xpos": token.get("xpos"),
+        "feats": {
+            key: value for key, value in token.items()
+            if key[:1].isupper() and isinstance(value, str)
+        }
+    }
+
+
+def writeTagged(batch, tagged, processor, writer, correct=True):
+    """Correct tagged sentences of the window and write them.
+
+    Args:
+        batch (list of tuple): (metadata, text) of the sentences.
+        tagged (list): Results of processor.tagged for each of the texts.
+        processor (ContextualProcessor)
+        writer (ConlluWriter)
+        correct (bool): Apply processor.corrected to the sentences.
+
+    """
+
+    for (metadata, _), tokens in zip(batch, tagged):
+        if correct:
+            tokens = processor.corrected(tokens)
+
+        writer.writeSentence(
+            [tokenFields(token) for token in tokens], metadata
+        )
+
+
+async def tagCorpusAsync(
+    sentences, processor, writer, window=100, correct=True
+):
+    """Coroutine version of tagCorpus for AsyncContextualProcessor.
+    Sentences of a window are tagged concurrently.
+
+    Args:
+        (See tagCorpus)
+
+    Returns:
+        int: Number of written sentences.
+
+    Raises:
+        ...Errors from AsyncContextualProcessor.tagged, corrected
+
+    """
+
+    sentences = iter(sentences)
+    counter = 0
+
+    while True:
+        batch = list(islice(sentences, window))
+        if not batch:
+            return counter
+
+        tagged = await asyncio.gather(
+            *(processor.tagged(text) for _, text in batch)
+        )
+        writeTagged(batch, tagged, processor, writer, correct)
+
+        counter += len(batch)
+
+
+def tagCorpus(sentences, processor, writer, window=100, correct=True):
+    """Tag sentences and write them.
+
+    Args:
+        sentences (iterator): Results of textSentences or conlluSentences.
+        processor (ContextualProcessor, AsyncContextualProcessor): If it's
+            asynchronous, the corpus is tagged by tagCorpusAsync in a new
+            event loop.
+        writer (ConlluWriter)
+        window (int): Number of sentences processed at once.
+        correct (bool): Correct tagged sentences with Ctx19 rules of the
+            processor.
+
+    Returns:
+        int: Number of written sentences.
+
+    Raises:
+        RuntimeError: Processor is asynchronous and an event loop is already
+            running in this thread.
+        ...Errors from ContextualProcessor.tagged, corrected
+
+    """
+
+    if asyncio.iscoroutinefunction(processor.tagged):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(tagCorpusAsync(
+                sentences, processor, writer, window, correct
+            ))
+
+        raise RuntimeError(
+            "tagCorpus can't run an asynchronous processor inside a running "
+            "event loop, use \"await tagCorpusAsync(...)\" instead."
+        )
+
+    sentences = iter(sentences)
+    counter = 0
+
+    while True:
+        batch = list(islice(sentences, window))
+        if not batch:
+            return counter
+
+        writeTagged(
+            batch, [processor.tagged(text) for _, text in batch], processor,
+            writer, correct
+        )
+
+        counter += len(batch)
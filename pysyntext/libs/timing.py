@@ -0,0 +1,311 @@
+"""Opt-in instrumentation of the tagging pipeline. Stages of the pipeline are
+marked with `measured` decorator or `stage` context manager; when timing is
+enabled, number of calls and latency histogram of every stage is collected.
+While it's disabled, measured functions are the original ones, so they cost
+nothing, and each stage costs one flag check.
+
+enable() replaces measured functions with measuring wrappers in the classes
+and modules where they are defined (found by __qualname__), and disable()
+puts the originals back. References taken before that (like functions
+imported with "from ... import") are not replaced, and functions defined
+inside other functions are never measured.
+
+Usage:
+    import libs.timing as timing
+    timing.enable()
+    ...tagging...
+    print(timing.report())
+"""
+
+from functools import wraps
+from threading import Lock
+import sys
+import time
+
+
+# Set to True by enable(). Do not change it directly.
+ENABLED = False
+
+# Collected statistics: {stage name: StageStats}.
+STAGES = dict()
+
+LOCK = Lock()
+
+# Functions decorated with measured: [(original, wrapper)].
+MEASURED = list()
+
+
+class StageStats:
+    """Statistics of one stage. Latencies are counted in histogram with
+    buckets of powers of two microseconds: bucket i contains calls which took
+    from 2^(i-1) to 2^i microseconds (the 0th contains calls under 1 us).
+
+    Properties:
+        count (int): Number of calls.
+        total (float): Total time of the calls in seconds.
+        histogram (list of int): Number of calls in each bucket.
+
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.histogram = list()
+
+    def add(self, seconds):
+        """Count one call of the stage.
+
+        Args:
+            seconds (float): Duration of the call.
+
+        """
+
+        bucket = int(seconds * 1e6).bit_length()
+
+        if bucket >= len(self.histogram):
+            self.histogram += [0] * (bucket + 1 - len(self.histogram))
+
+        self.histogram[bucket] += 1
+        self.count += 1
+        self.total += seconds
+
+    def percentile(self, share):
+        """Returns upper bound of the bucket where the percentile is.
+
+        Args:
+            share (float): Percentile from 0 to 1.
+
+        Returns:
+            int: Latency in microseconds.
+
+        """
+
+        threshold = share * self.count
+        passed = 0
+
+        for bucket, count in enumerate(self.histogram):
+            passed += count
+            if passed >= threshold:
+                return 2 ** bucket
+
+        return 0
+
+
+class NullStage:
+    """Context manager which does nothing. It's returned by stage() when
+    timing is disabled.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+class Stage:
+    """Context manager which measures time of its body.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+NULLSTAGE = NullStage()
+
+
+def owner(func):
+    """Returns the class or the module where the function is defined.
+
+    Args:
+        func (function)
+
+    Returns:
+        type, module: None if the function is defined inside another one.
+
+    """
+
+    obj = sys.modules.get(func.__module__)
+
+    for name in func.__qualname__.split(".")[:-1]:
+        if name == "<locals>":
+            return None
+        obj = getattr(obj, name, None)
+
+    return obj
+
+
+def install(measure):
+    """Put wrappers or original functions in place of each other.
+
+    Args:
+        measure (bool): Put wrappers if True, original functions otherwise.
+
+    """
+
+    for original, wrapper in MEASURED:
+        holder = owner(original)
+        name = original.__name__
+
+        if holder is None:
+            continue
+
+        # Functions which were replaced by somebody else are left as they are
+        if vars(holder).get(name) is (original if measure else wrapper):
+            setattr(holder, name, wrapper if measure else original)
+
+
+def enable():
+    """Start collecting statistics.
+    """
+
+    global ENABLED
+
+    ENABLED = True
+    install(True)
+
+
+def disable():
+    """Stop collecting statistics. Collected ones are kept.
+    """
+
+    global ENABLED
+
+    ENABLED = False
+    install(False)
+
+
+def record(name, seconds):
+    """Count one call of the stage.
+
+    Args:
+        name (str): Name of the stage.
+        seconds (float): Duration of the call.
+
+    """
+
+    with LOCK:
+        if name not in STAGES:
+            STAGES[name] = StageStats()
+        STAGES[name].add(seconds)
+
+
+def measured(name):
+    """Decorator which measures every call of the function as the stage
+    with the given name. While timing is disabled the function is returned
+    as it is, see the description of the module.
+
+    Args:
+        name (str): Name of the stage.
+
+    Returns:
+        function: Decorator.
+
+    """
+
+    def decorator(func):
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Wrapper may be referenced after disable()
+            if not ENABLED:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+
+        MEASURED.append((func, wrapper))
+
+        return wrapper if ENABLED else func
+
+    return decorator
+
+
+def stage(name):
+    """Returns context manager which measures its body as the stage with the
+    given name.
+
+    Args:
+        name (str): Name of the stage.
+
+    Returns:
+        Stage, NullStage
+
+    """
+
+    return Stage(name) if ENABLED else NULLSTAGE
+
+
+def snapshot():
+    """Returns copy of the collected statistics.
+
+    Returns:
+        dict: {
+            stage name: {
+                "count": int,
+                "total": float: Seconds,
+                "mean": float: Seconds,
+                "histogram": list: See StageStats
+            },
+            ...
+        }
+
+    """
+
+    with LOCK:
+        return {
+            name: {
+                "count": stats.count,
+                "total": stats.total,
+                "mean": stats.total / stats.count if stats.count else 0.0,
+                "histogram": list(stats.histogram)
+            }
+            for name, stats in STAGES.items()
+        }
+
+
+def reset():
+    """Forget all the collected statistics.
+    """
+
+    with LOCK:
+        STAGES.clear()
+
+
+def report():
+    """Returns a table with collected statistics, the slowest stages first.
+
+    Returns:
+        str
+
+    """
+
+    with LOCK:
+        stages = sorted(
+            STAGES.items(), key=lambda item: item[1].total, reverse=True
+        )
+
+        lines = [
+            f"{'Stage':<24}{'Calls':>10}{'Total, s':>12}{'Mean, us':>12}"
+            f"{'p50, us':>10}{'p99, us':>10}"
+        ]
+
+        for name, stats in stages:
+            lines.append(
+                f"{name:<24}{stats.count:>10}{stats.total:>12.3f}"
+                f"{stats.total / stats.count * 1e6:>12.1f}"
+                f"{stats.percentile(0.5):>10}{stats.percentile(0.99):>10}"
+            )
+
+    return "\n".join(lines)
@@ -6,8 +6,13 @@ be given access to nextLine() and nextSentence() methods.
 """
 
 from libs.gc import GCReader
+from libs.records import compact
+from libs.ud.conlluindex import SentenceIndex
 from libs.ud.mte import MTEParser
 from libs.ud.udt import UDTParser
+import io
+import os
+import random
 
 
 class ConlluReader(GCReader):
@@ -19,6 +24,14 @@ class ConlluReader(GCReader):
             encodeXPOS call.
         udt (UDTParser): Parser for encoding UDT tags. Initialize at the first
             nextLine call with replaceMTE=True
+        useIndex (bool): Whether SentenceIndex may be used.
+        saveIndex (bool): Whether built SentenceIndex is saved next to the
+            file.
+        index (SentenceIndex): Index of the file. Loaded at the first need.
+        header (dict): Attributes from comments at the beginning of the file.
+            Read at the first get call, or at init if the file can't be
+            seeked.
+        compact (bool): Whether lines of sentences are TokenRecords.
 
     """
 
@@ -27,13 +40,22 @@ class ConlluReader(GCReader):
 
     def __init__(
         self, fp, ignoreComments=False, strict=True,
-        replaceMTE=False
+        replaceMTE=False, useIndex=True, compact=False, saveIndex=False
     ):
         """Init the reader with arguments defined in base class.
 
         Args:
             replaceMTE (bool): If True, then MTE tags will be replaced with
                 UDT ones.
+            useIndex (bool): Skip lines, tokens and sentences at the
+                beginning of the file with SentenceIndex. It's built at the
+                first skip. Index is used only for files on disk.
+            compact (bool): If True, then lines returned by nextSentence and
+                their fields are TokenRecords (see libs.records) instead of
+                dicts. It saves memory when many sentences are kept.
+            saveIndex (bool): If True, then the built index is saved next to
+                the file as <path>.idx, so it's not built again by other
+                readers. An up-to-date sidecar is used anyway.
 
         """
 
@@ -43,8 +65,18 @@ class ConlluReader(GCReader):
             self.udt = UDTParser()
 
         self.mte = None
+        self.useIndex = useIndex
+        self.saveIndex = saveIndex
+        self.index = None
+        self.header = None
+        self.compact = compact
 
-    def parseFeats(self, line):
+        if not self.file.seekable():
+            # Header can be read only before the reading starts
+            self.getHeader()
+
+    @staticmethod
+    def parseFeats(line):
         """Convert FEATS line to a dict object. The FEATS field contains a list
         of morphological features, with vertical bar (|) as list separator and
         with underscore to represent the empty list. All features should be
@@ -305,13 +337,17 @@ class ConlluReader(GCReader):
                 "comments": [
                     ...list of nextLine() outputs
                     which .data == self.COMMENTLINE
-                ]
+                ],
+                "metadata": {
+                    ...attributes of the comments, like "sent_id" or "text"
+                }
             }
 
         """
 
         sentence = []
         comments = []
+        metadata = {}
 
         line = self.nextLine()
 
@@ -320,13 +356,72 @@ class ConlluReader(GCReader):
                 sentence.append(line)
             else:
                 comments.append(line)
+                if isinstance(line["data"], dict):
+                    # The first definition of attribute wins, as in getAttr
+                    for key, value in line["data"].items():
+                        metadata.setdefault(key, value)
             line = self.nextLine()
 
+        if self.compact:
+            sentence = [compact(line) for line in sentence]
+            comments = [compact(line) for line in comments]
+
         return {
             "sentence": sentence,
-            "comments": comments
+            "comments": comments,
+            "metadata": metadata
         }
 
+    def readHeader(self):
+        """Read comments at the current position of the file.
+
+        Returns:
+            tuple: (dict of attributes from the comments, str of all the read
+                text).
+
+        """
+
+        header = dict()
+        text = list()
+
+        line = self.file.readline()
+
+        while line[:1] == "#":
+            text.append(line)
+            # (See nextLine for the format of comments)
+            data = line[2:-1]
+            if " = " in data:
+                data = data.split(" = ", maxsplit=1)
+                header[data[0]] = data[1]
+            line = self.file.readline()
+
+        text.append(line)
+
+        return (header, "".join(text))
+
+    def getHeader(self):
+        """Returns attributes defined in comments at the beginning of the
+        file. They're read once. Seekable files are read from the beginning
+        and then returned to the current position. Other streams are read
+        ahead, and the read text is given to the reader again.
+
+        Returns:
+            dict
+
+        """
+
+        if self.header is None:
+            if self.file.seekable():
+                position = self.file.tell()
+                self.file.seek(0)
+                self.header = self.readHeader()[0]
+                self.file.seek(position)
+            else:
+                self.header, text = self.readHeader()
+                self.file = PrependedFile(text, self.file)
+
+        return self.header
+
     def get(self, attribute, default=None):
         """Look for some property, defined in the comment, at the beginning of
         the file. (E.g., "newdoc id" or "doc_tittle").
@@ -342,22 +437,7 @@ class ConlluReader(GCReader):
 
         """
 
-        # Remember current position.
-        cursor = self.file.tell()
-
-        # Go to the beginning of the file.
-        self.rewind()
-
-        respond = None
-        line = self.nextLine()
-
-        while line["type"] == self.COMMENTLINE:
-            if attribute in line["data"]:
-                respond = line["data"][attribute]
-            line = self.nextLine()
-
-        # Return to previous position.
-        self.file.seek(cursor)
+        respond = self.getHeader().get(attribute)
 
         return respond if respond else default
 
@@ -372,7 +452,7 @@ class ConlluReader(GCReader):
 
         Return:
             str: Parameter you'd requested. If no such parameter specified,
-                None will be returned.
+                default will be returned.
 
         Raise:
             KeyError, IndexError: These error will be raised if parameter is
@@ -380,11 +460,14 @@ class ConlluReader(GCReader):
 
         """
 
+        if "metadata" in sentence:
+            return sentence["metadata"].get(attribute, default)
+
         for comment in sentence["comments"]:
             if attribute in comment["data"]:
                 return comment["data"][attribute]
 
-        return None
+        return default
 
     def encodeXPOS(self, tag):
         """Convert XPOSes used in CoNLL-U to dict of properties.
@@ -409,3 +492,267 @@ class ConlluReader(GCReader):
             self.mte = MTEParser()
 
         return self.mte.parse(tag)
+
+    def getIndex(self):
+        """Returns index of the file.
+
+        Returns:
+            SentenceIndex: None if the file is not on disk or index is
+                disabled.
+
+        """
+
+        if self.index is None and self.useIndex:
+            path = getattr(self.file, "name", None)
+            if (
+                isinstance(path, str) and os.path.isfile(path) and
+                self.file.seekable()
+            ):
+                self.index = SentenceIndex.load(path, self.saveIndex)
+
+        return self.index
+
+    def skipLines(self, n):
+        """See GCReader.skipLines. Index is used if the reading has not
+        started yet and comments are not ignored.
+        """
+
+        if n == 0:
+            return
+
+        if self.cursor != 0 or self.ignoreComments or not self.getIndex():
+            return super().skipLines(n)
+
+        offset, lines = self.index.line(n)
+        self.seek(offset, lines)
+        super().skipLines(n - lines)
+
+    def skipTokens(self, n):
+        """See GCReader.skipTokens. Index is used if the reading has not
+        started yet.
+        """
+
+        if n == 0:
+            return
+
+        if self.cursor != 0 or not self.getIndex():
+            return super().skipTokens(n)
+
+        offset, lines, tokens = self.index.token(n)
+        self.seek(offset, lines)
+        super().skipTokens(n - tokens)
+
+    def skipSentences(self, n):
+        """See GCReader.skipSentences. Index is used if the reading has not
+        started yet.
+        """
+
+        if n == 0:
+            return 0
+
+        if self.cursor != 0 or not self.getIndex():
+            return super().skipSentences(n)
+
+        i = min(n, len(self.index))
+        self.seek(*self.index.sentence(i))
+
+        return (
+            self.index.tokens[i] + super().skipSentences(n - i)
+        )
+
+    def lineType(self, line):
+        """See GCReader.lineType. Data lines with unspecified UPOS are blank,
+        as nextLine returns them.
+        """
+
+        kind = super().lineType(line)
+
+        if kind == self.DATALINE and SentenceIndex.unspecifiedUPOS(line):
+            return self.BLANKLINE
+
+        return kind
+
+    def skip(self, n):
+        """See GCReader.skip. Index is used if the reading has not started
+        yet.
+        """
+
+        if n == 0:
+            return 0
+
+        if self.cursor == 0 and self.getIndex():
+            return self.skipSentences(n)
+
+        return super().skip(n)
+
+    def sentenceAt(self, n):
+        """Read the sentence by its number. Reading continues from the next
+        sentence then.
+
+        Args:
+            n (int): Number of the sentence from 0.
+
+        Returns:
+            dict: See ConlluReader.nextSentence.
+
+        Raises:
+            ValueError: Index can't be used for this file.
+            IndexError: There's no such sentence.
+
+        """
+
+        if not self.getIndex():
+            raise ValueError(
+                "Sentences can be accessed only in indexed files."
+            )
+
+        if n >= len(self.index):
+            raise IndexError(f"There's no sentence #{n} in {self.file.name}.")
+
+        self.seek(*self.index.sentence(n))
+
+        return self.nextSentence()
+
+    def sentenceRange(self, start, stop):
+        """Read sentences from start to stop, like sentences[start:stop].
+
+        Args:
+            start, stop (int): Numbers of sentences from 0.
+
+        Yields:
+            dict: See ConlluReader.nextSentence.
+
+        Raises:
+            ValueError: Index can't be used for this file.
+
+        """
+
+        if not self.getIndex():
+            raise ValueError(
+                "Sentences can be accessed only in indexed files."
+            )
+
+        stop = min(stop, len(self.index))
+        if start >= stop:
+            return
+
+        self.seek(*self.index.sentence(start))
+
+        for _ in range(stop - start):
+            yield self.nextSentence()
+
+    def randomSentences(self, k, rand=random):
+        """Read k different random sentences.
+
+        Args:
+            k (int): Number of sentences.
+            rand (random.Random): Source of randomness.
+
+        Yields:
+            dict: See ConlluReader.nextSentence.
+
+        Raises:
+            ValueError: Index can't be used for this file or there's less
+                than k sentences in it.
+
+        """
+
+        if not self.getIndex():
+            raise ValueError(
+                "Sentences can be accessed only in indexed files."
+            )
+
+        for n in rand.sample(range(len(self.index)), k):
+            yield self.sentenceAt(n)
+
+
+class PrependedFile(io.TextIOBase):
+    """Text stream which returns the given text before the content of the
+    file. It lets to read ahead streams which can't be seeked. Closing the
+    stream doesn't close the file.
+
+    Properties:
+        text (str): Text which is left to be returned before the file.
+        file (file): The file.
+        position (int): Number of characters read from the stream, including
+            the prepended text.
+
+    """
+
+    def __init__(self, text, fp):
+        """Init the stream.
+
+        Args:
+            text (str), fp (file): See the properties. The text must be read
+                from the beginning of the file.
+
+        """
+
+        self.text = text
+        self.file = fp
+        self.position = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            text = self.text + self.file.read()
+            self.text = ""
+        elif len(self.text) >= size:
+            text = self.text[:size]
+            self.text = self.text[size:]
+        else:
+            text = self.text + self.file.read(size - len(self.text))
+            self.text = ""
+
+        self.position += len(text)
+
+        return text
+
+    def readline(self, size=-1):
+        if size is None or size < 0:
+            size = -1
+        end = self.text.find("\n") + 1
+
+        if end and (size < 0 or end <= size):
+            line = self.text[:end]
+            self.text = self.text[end:]
+        elif 0 <= size <= len(self.text):
+            line = self.text[:size]
+            self.text = self.text[size:]
+        else:
+            line = self.text + self.file.readline(
+                size - len(self.text) if size >= 0 else -1
+            )
+            self.text = ""
+
+        self.position += len(line)
+
+        return line
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+
+        return line
+
+    def tell(self):
+        return self.position
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def fileno(self):
+        return self.file.fileno()
+
+    @property
+    def encoding(self):
+        return getattr(self.file, "encoding", None)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
@@ -0,0 +1,451 @@
+"""Columnar binary cache of a CoNLL-U file. The file is parsed once and
+stored next to it as <path>.cache, so later runs read the cache instead of
+parsing the text again. The cache is memory-mapped, and strings are decoded
+once per distinct value, so equal forms, lemmas and tags of all the tokens
+share the same objects.
+
+Cache is rebuilt when size or modification time of the file changes.
+Layout of the cache file (all the sections are aligned to 8 bytes):
+    HEADER: magic, version, size and mtime of the parsed file, whether it
+        was checked strictly, number of lines (L), number of sentences (N),
+        number of distinct strings (S).
+    types: L bytes, type of each line (GCReader.COMMENTLINE, ...).
+    columns: 10 arrays of L unsigned 32-bit codes of strings, one for each
+        CoNLL-U field. Comment lines keep their text in the first column.
+    sentences: N + 1 unsigned 64-bit numbers of lines before each sentence.
+    tokens: N + 1 numbers of data lines before each sentence.
+    pool: S + 1 unsigned 64-bit offsets of strings in the following bytes,
+        then UTF-8 bytes of all the strings.
+
+Usage:
+    reader = CachedConlluReader(open("uk.conllu", encoding="utf-8"))
+    sentence = reader.nextSentence()
+"""
+
+from libs.ud.conllu import ConlluReader
+from libs.ud.conlluindex import SentenceIndex
+from libs.ud.fastconllu import FastConlluReader, LazyFields, FIELDS
+from libs.streams import openText
+from array import array
+import mmap
+import os
+import struct
+
+
+class TreebankCache:
+    """Parsed CoNLL-U file in columnar form.
+
+    Properties:
+        MAGIC (bytes): Signature of the cache file.
+        VERSION (int): Version of the layout.
+        HEADER (struct.Struct): Header of the cache file.
+        path (str): Path to the parsed file.
+        size (int), mtime (int): Size and st_mtime_ns of the parsed file.
+        strict (bool): Whether the file was checked strictly.
+        types (memoryview): Types of lines.
+        columns (list of memoryview): Codes of strings for each field.
+        sentences, tokens (memoryview): See the description of the module.
+        offsets (memoryview): Offsets of strings in the pool.
+        pool (memoryview): Bytes of strings.
+        strings (dict): {code: str} of decoded strings.
+
+    """
+
+    MAGIC = b"SYNTXCCH"
+    VERSION = 1
+    HEADER = struct.Struct("<8sHQq?xxxQQQ")
+
+    def __init__(self, path, data):
+        """Init the cache from its bytes. Use TreebankCache.load or
+        TreebankCache.build to get one.
+
+        Args:
+            path (str): Path to the parsed file.
+            data (bytes-like): Content of the cache file.
+
+        Raises:
+            ValueError: The data is not a cache of the current version.
+
+        """
+
+        (
+            magic, version, self.size, self.mtime, self.strict, lines,
+            sentences, strings
+        ) = TreebankCache.HEADER.unpack_from(data)
+
+        if magic != TreebankCache.MAGIC or version != TreebankCache.VERSION:
+            raise ValueError(f"{path} is not a cache of CoNLL-U file.")
+
+        self.path = path
+        self.strings = dict()
+
+        view = memoryview(data)
+        position = TreebankCache.aligned(TreebankCache.HEADER.size)
+
+        def section(length, code):
+            nonlocal position
+            start = position
+            position += TreebankCache.aligned(
+                length * struct.calcsize(code)
+            )
+            return view[start:start + length * struct.calcsize(code)].cast(
+                code
+            )
+
+        self.types = section(lines, "B")
+        self.columns = [section(lines, "I") for _ in FIELDS]
+        self.sentences = section(sentences + 1, "Q")
+        self.tokens = section(sentences + 1, "Q")
+        self.offsets = section(strings + 1, "Q")
+        self.pool = view[position:position + self.offsets[-1]]
+
+    def __len__(self):
+        """Returns number of lines.
+        """
+
+        return len(self.types)
+
+    @staticmethod
+    def aligned(length):
+        """Returns length rounded up to 8 bytes.
+        """
+
+        return (length + 7) & ~7
+
+    @staticmethod
+    def sidecar(path):
+        """Returns path to the cache of the file.
+        """
+
+        return path + ".cache"
+
+    @staticmethod
+    def dump(path, strict=False):
+        """Parse the file and make content of its cache.
+
+        Args:
+            path (str): Path to CoNLL-U file.
+            strict (bool): Check format of data lines strictly.
+
+        Returns:
+            bytes
+
+        Raises:
+            ...Errors from FastConlluReader.nextLine
+
+        """
+
+        stat = os.stat(path)
+        types = array("B")
+        columns = [array("I") for _ in FIELDS]
+        sentences = array("Q", [0])
+        tokens = array("Q", [0])
+        codes = dict()
+        strings = list()
+
+        def code(string):
+            result = codes.get(string)
+            if result is None:
+                result = codes[string] = len(strings)
+                strings.append(string.encode("utf-8"))
+            return result
+
+        empty = [code("")] * len(FIELDS)
+        tokenCounter = 0
+
+        with openText(path) as fp:
+            reader = FastConlluReader(fp, strict=strict, useIndex=False)
+
+            while True:
+                try:
+                    line = reader.nextLine()
+                except EOFError:
+                    break
+
+                values = empty
+                if line["type"] == reader.DATALINE:
+                    # FEATS are not parsed yet, so values are raw fields
+                    values = [code(value) for value in line["data"].values]
+                    tokenCounter += 1
+                elif line["type"] == reader.COMMENTLINE:
+                    data = line["data"]
+                    if isinstance(data, dict):
+                        data = "{} = {}".format(*next(iter(data.items())))
+                    values = [code(data)] + empty[1:]
+
+                types.append(line["type"])
+                for column, value in zip(columns, values):
+                    column.append(value)
+
+                if line["type"] == reader.BLANKLINE:
+                    sentences.append(len(types))
+                    tokens.append(tokenCounter)
+
+        offsets = array("Q", [0])
+        for string in strings:
+            offsets.append(offsets[-1] + len(string))
+
+        sections = [
+            TreebankCache.HEADER.pack(
+                TreebankCache.MAGIC, TreebankCache.VERSION, stat.st_size,
+                stat.st_mtime_ns, strict, len(types), len(sentences) - 1,
+                len(strings)
+            ),
+            types.tobytes(),
+            *(column.tobytes() for column in columns),
+            sentences.tobytes(), tokens.tobytes(), offsets.tobytes(),
+            b"".join(strings)
+        ]
+
+        return b"".join(
+            section + bytes(TreebankCache.aligned(len(section)) - len(section))
+            for section in sections
+        )
+
+    @staticmethod
+    def build(path, strict=False):
+        """Parse the file and make its cache in memory.
+
+        Args:
+            (See TreebankCache.dump)
+
+        Returns:
+            TreebankCache
+
+        """
+
+        return TreebankCache(path, TreebankCache.dump(path, strict))
+
+    @staticmethod
+    def read(path, strict=False):
+        """Map the cache file.
+
+        Args:
+            path (str): Path to the parsed file.
+            strict (bool): Whether the cache must be checked strictly.
+
+        Returns:
+            TreebankCache: None if the cache is absent, broken or stale.
+
+        """
+
+        try:
+            stat = os.stat(path)
+            with open(TreebankCache.sidecar(path), "rb") as fp:
+                cache = TreebankCache(
+                    path, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+                )
+        except (OSError, ValueError, TypeError, struct.error):
+            return None
+
+        if (
+            cache.size != stat.st_size or cache.mtime != stat.st_mtime_ns or
+            (strict and not cache.strict)
+        ):
+            return None
+
+        return cache
+
+    @staticmethod
+    def load(path, strict=False):
+        """Returns up-to-date cache of the file. It's mapped from the cache
+        file or built and saved there if possible.
+
+        Args:
+            (See TreebankCache.dump)
+
+        Returns:
+            TreebankCache
+
+        Raises:
+            ...Errors from TreebankCache.dump
+
+        """
+
+        cache = TreebankCache.read(path, strict)
+
+        if cache is None:
+            data = TreebankCache.dump(path, strict)
+            try:
+                with open(TreebankCache.sidecar(path), "wb") as fp:
+                    fp.write(data)
+            except OSError:
+                # Directory is read-only, so keep the cache in memory only
+                pass
+            cache = TreebankCache(path, data)
+
+        return cache
+
+    def string(self, code):
+        """Returns string by its code.
+
+        Args:
+            code (int)
+
+        Returns:
+            str
+
+        """
+
+        string = self.strings.get(code)
+
+        if string is None:
+            string = self.strings[code] = str(
+                self.pool[self.offsets[code]:self.offsets[code + 1]],
+                "utf-8"
+            )
+
+        return string
+
+    def index(self):
+        """Returns index of sentences where offsets are numbers of lines.
+
+        Returns:
+            SentenceIndex
+
+        """
+
+        return SentenceIndex(
+            self.path, self.size, self.mtime, self.sentences, self.sentences,
+            self.tokens
+        )
+
+
+class CachedConlluReader(ConlluReader):
+    """ConlluReader which reads TreebankCache of the file instead of the file
+    itself. Results are the same as ConlluReader returns, but "data" of data
+    lines is LazyFields. Format is checked when the cache is built.
+
+    Properties:
+        cache (TreebankCache): Cache of the file.
+        position (int): Number of the next line.
+
+    """
+
+    def __init__(
+        self, fp, ignoreComments=False, strict=True, replaceMTE=False,
+        useIndex=True, compact=False, saveIndex=False
+    ):
+        """Init the reader and load the cache.
+
+        Args:
+            (See ConlluReader.__init__). The file must be on disk.
+
+        Raises:
+            ...Errors from TreebankCache.load
+
+        """
+
+        super().__init__(
+            fp, ignoreComments, strict, replaceMTE, useIndex, compact,
+            saveIndex
+        )
+
+        self.cache = TreebankCache.load(fp.name, strict)
+        self.position = 0
+
+    def getIndex(self):
+        """See ConlluReader.getIndex. Offsets of the index are numbers of
+        lines.
+        """
+
+        if self.index is None and self.useIndex:
+            self.index = self.cache.index()
+
+        return self.index
+
+    def seek(self, position, cursor=0):
+        """See GCReader.seek. Position is a number of line.
+        """
+
+        self.position = position
+        self.cursor = cursor
+
+    def nextLine(self, replaceMTE=False):
+        """Returns the next line of the file and increase cursor.
+
+        Returns:
+            dict: (See ConlluReader.nextLine). "data" of data lines is
+                LazyFields.
+
+        Raises:
+            EOFError: End of the file was reached.
+
+        """
+
+        cache = self.cache
+
+        while True:
+            i = self.position
+
+            # Increase cursor to remember current reading line.
+            self.cursor += 1
+
+            if i >= len(cache):
+                raise EOFError("End of the file was reached.")
+
+            self.position += 1
+            kind = cache.types[i]
+
+            if kind == self.DATALINE:
+                break
+
+            if kind == self.BLANKLINE:
+                return {
+                    "type": self.BLANKLINE
+                }
+
+            if self.ignoreComments:
+                continue
+
+            # (See ConlluReader.nextLine for the format of comments)
+            data = cache.string(cache.columns[0][i])
+            if " = " in data:
+                data = data.split(" = ", maxsplit=1)
+                data = {data[0]: data[1]}
+            return {
+                "type": self.COMMENTLINE,
+                "data": data
+            }
+
+        data = LazyFields(
+            [cache.string(column[i]) for column in cache.columns]
+        )
+
+        if hasattr(self, "udt"):
+            data["xpos"] = self.encodeUDT(data["upos"], data["feats"])
+
+        return {
+            "type": self.DATALINE,
+            "data": data
+        }
+
+    def skip(self, n):
+        """See GCReader.skip. Only types of lines are read from the cache.
+        """
+
+        if n == 0:
+            return 0
+
+        if self.cursor == 0 and self.getIndex():
+            return self.skipSentences(n)
+
+        tokens = 0
+        types = self.cache.types
+
+        while n > 0:
+            # Increase cursor to remember current reading line.
+            self.cursor += 1
+
+            if self.position >= len(types):
+                raise EOFError("End of the file was reached.")
+
+            kind = types[self.position]
+            self.position += 1
+
+            if kind == self.BLANKLINE:
+                n -= 1
+            elif kind == self.DATALINE:
+                tokens += 1
+
+        return tokens
@@ -0,0 +1,274 @@
+"""Index of sentences of CoNLL-U file. It keeps byte offset of each sentence
+and the number of lines and tokens before it, so the reader can jump to any
+sentence, line or token without parsing everything before.
+
+Sentences are bounded the same way ConlluReader.nextSentence does it: by
+blank lines and by data lines with unspecified UPOS.
+
+Index can be stored next to the file as <path>.idx. It's rebuilt when size or
+modification time of the file changes. Layout of the sidecar file:
+    HEADER: magic, version, size and mtime of the indexed file, number of
+        sentences (N).
+    offsets: N + 1 unsigned 64-bit integers. The last one points to the end
+        of the last complete sentence.
+    lines: N + 1 numbers of lines before each sentence.
+    tokens: N + 1 numbers of data lines before each sentence.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+import os
+import struct
+
+
+class SentenceIndex:
+    """Offsets of sentences of a CoNLL-U file.
+
+    Properties:
+        MAGIC (bytes): Signature of the sidecar file.
+        VERSION (int): Version of the layout.
+        HEADER (struct.Struct): Header of the sidecar file.
+        path (str): Path to the indexed file.
+        size (int), mtime (int): Size and st_mtime_ns of the indexed file.
+        offsets, lines, tokens (array): See the description of the module.
+
+    """
+
+    MAGIC = b"SYNTXIDX"
+    VERSION = 1
+    HEADER = struct.Struct("<8sHQqQ")
+
+    def __init__(self, path, size, mtime, offsets, lines, tokens):
+        """Init the index. Use SentenceIndex.load or SentenceIndex.build to
+        get one.
+        """
+
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.offsets = offsets
+        self.lines = lines
+        self.tokens = tokens
+
+    def __len__(self):
+        """Returns number of complete sentences.
+        """
+
+        return len(self.offsets) - 1
+
+    @staticmethod
+    def sidecar(path):
+        """Returns path to the index of the file.
+        """
+
+        return path + ".idx"
+
+    @staticmethod
+    def unspecifiedUPOS(line):
+        """Check whether the data line has exactly 10 fields and "_" in UPOS,
+        so ConlluReader.nextLine takes it for a blank line.
+
+        Args:
+            line (str, bytes): Data line without "\\n".
+
+        Returns:
+            bool
+
+        """
+
+        tab, blank = ("\t", "_") if isinstance(line, str) else (b"\t", b"_")
+
+        # Splitting is rarely needed
+        if tab + blank + tab not in line:
+            return False
+
+        fields = line.split(tab)
+
+        return len(fields) == 10 and fields[3] == blank
+
+    @staticmethod
+    def build(path):
+        """Scan the file and make its index.
+
+        Args:
+            path (str): Path to CoNLL-U file.
+
+        Returns:
+            SentenceIndex
+
+        """
+
+        stat = os.stat(path)
+        offsets = array("Q", [0])
+        lines = array("Q", [0])
+        tokens = array("Q", [0])
+
+        offset = 0
+        lineCounter = 0
+        tokenCounter = 0
+
+        with open(path, "rb") as fp:
+            for line in fp:
+                offset += len(line)
+                lineCounter += 1
+
+                if line[-1:] == b"\n":
+                    line = line[:-1]
+                    if line[-1:] == b"\r":
+                        line = line[:-1]
+                else:
+                    # ConlluReader cuts the last character of the last line
+                    # even if it's not "\n"
+                    line = line[:-1]
+
+                if line and line[:1] != b"#":
+                    # Lines with unspecified UPOS are blank for the reader
+                    if not SentenceIndex.unspecifiedUPOS(line):
+                        tokenCounter += 1
+                        continue
+
+                elif line:
+                    continue
+
+                offsets.append(offset)
+                lines.append(lineCounter)
+                tokens.append(tokenCounter)
+
+        return SentenceIndex(
+            path, stat.st_size, stat.st_mtime_ns, offsets, lines, tokens
+        )
+
+    @staticmethod
+    def read(path):
+        """Read the index from the sidecar file.
+
+        Args:
+            path (str): Path to the indexed file.
+
+        Returns:
+            SentenceIndex: None if the sidecar is absent, broken or stale.
+
+        """
+
+        try:
+            stat = os.stat(path)
+            with open(SentenceIndex.sidecar(path), "rb") as fp:
+                magic, version, size, mtime, count = (
+                    SentenceIndex.HEADER.unpack(
+                        fp.read(SentenceIndex.HEADER.size)
+                    )
+                )
+
+                if (
+                    magic != SentenceIndex.MAGIC or
+                    version != SentenceIndex.VERSION or
+                    size != stat.st_size or
+                    mtime != stat.st_mtime_ns
+                ):
+                    return None
+
+                arrays = list()
+                for _ in range(3):
+                    values = array("Q")
+                    values.fromfile(fp, count + 1)
+                    arrays.append(values)
+
+        except (OSError, EOFError, struct.error):
+            return None
+
+        return SentenceIndex(path, size, mtime, *arrays)
+
+    def write(self):
+        """Save the index to the sidecar file.
+
+        Raises:
+            OSError: The sidecar can't be written.
+
+        """
+
+        with open(SentenceIndex.sidecar(self.path), "wb") as fp:
+            fp.write(SentenceIndex.HEADER.pack(
+                SentenceIndex.MAGIC, SentenceIndex.VERSION, self.size,
+                self.mtime, len(self)
+            ))
+            self.offsets.tofile(fp)
+            self.lines.tofile(fp)
+            self.tokens.tofile(fp)
+
+    @staticmethod
+    def load(path, save=False):
+        """Returns up-to-date index of the file. It's read from the sidecar
+        or built.
+
+        Args:
+            path (str): Path to CoNLL-U file.
+            save (bool): Save the built index to the sidecar if possible.
+
+        Returns:
+            SentenceIndex
+
+        """
+
+        index = SentenceIndex.read(path)
+
+        if index is None:
+            index = SentenceIndex.build(path)
+            if not save:
+                return index
+            try:
+                index.write()
+            except OSError:
+                # Directory is read-only, so keep the index in memory only
+                pass
+
+        return index
+
+    def sentence(self, n):
+        """Returns position of the sentence.
+
+        Args:
+            n (int): Number of the sentence from 0.
+
+        Returns:
+            tuple: (byte offset, number of lines before it).
+
+        Raises:
+            IndexError: There's no such sentence.
+
+        """
+
+        if not 0 <= n <= len(self):
+            raise IndexError(f"There's no sentence #{n} in {self.path}.")
+
+        return (self.offsets[n], self.lines[n])
+
+    def line(self, n):
+        """Find the nearest sentence which starts at the line or before.
+
+        Args:
+            n (int): Number of the line from 0.
+
+        Returns:
+            tuple: (byte offset, number of lines before it).
+
+        """
+
+        i = bisect_right(self.lines, n) - 1
+
+        return (self.offsets[i], self.lines[i])
+
+    def token(self, n):
+        """Find the last sentence which starts before the token.
+
+        Args:
+            n (int): Number of the token (data line) from 1.
+
+        Returns:
+            tuple: (byte offset, number of lines before it, number of tokens
+                before it).
+
+        """
+
+        i = max(bisect_left(self.tokens, n) - 1, 0)
+
+        return (self.offsets[i], self.lines[i], self.tokens[i])
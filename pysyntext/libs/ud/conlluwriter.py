@@ -0,0 +1,172 @@
+"""This library can be used to write sentences in CoNLL-U format. Lines are
+collected in a buffer and written to the file by big chunks, so the writer
+can be used for corpora of any size.
+
+Usage:
+    with ConlluWriter(open("out.conllu", "w", encoding="utf-8")) as writer:
+        writer.writeComment("newdoc id", "doc1")
+        writer.writeSentence(
+            [{"form": "Привіт", "upos": "INTJ"}],
+            {"sent_id": "1", "text": "Привіт"}
+        )
+"""
+
+from libs.ud.fastconllu import FIELDS
+
+
+class ConlluWriter:
+    """Buffered writer of CoNLL-U files.
+
+    Properties:
+        BUFFERSIZE (int): Number of characters collected before writing.
+        file (file): Opened file to write in.
+        buffer (list of str): Lines which are not written yet.
+        buffered (int): Number of characters in the buffer.
+        sentences (int): Number of written sentences.
+
+    """
+
+    BUFFERSIZE = 1 << 20
+
+    def __init__(self, fp, bufferSize=None):
+        """Init the writer.
+
+        Args:
+            fp (file): File opened for writing text.
+            bufferSize (int): See BUFFERSIZE.
+
+        """
+
+        self.file = fp
+        self.buffer = list()
+        self.buffered = 0
+        self.sentences = 0
+
+        if bufferSize:
+            self.BUFFERSIZE = bufferSize
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def stringifyFeats(feats):
+        """Convert dict of features to FEATS field. Reverse of
+        ConlluReader.parseFeats.
+
+        Args:
+            feats (dict): Features. None or empty dict for no features.
+
+        Returns:
+            str: Example: "Case=Nom|Number=Sing".
+
+        """
+
+        if not feats:
+            return "_"
+
+        return "|".join(
+            f"{key}={feats[key]}"
+            for key in sorted(feats, key=str.lower)
+        )
+
+    @staticmethod
+    def formatLine(token, i):
+        """Make data line of the token.
+
+        Args:
+            token (dict): Fields of the token like ConlluReader returns them.
+                Missing fields are written as "_".
+            i (int): Number of the token in the sentence from 1. It's used if
+                the token has no "id".
+
+        Returns:
+            str: The line with "\\n".
+
+        """
+
+        values = list()
+
+        for field in FIELDS:
+            value = token.get(field)
+
+            if field == "feats":
+                value = ConlluWriter.stringifyFeats(value)
+            elif field == "id" and value is None:
+                value = i
+            elif value is None or value == "":
+                value = "_"
+
+            values.append(str(value))
+
+        return "\t".join(values) + "\n"
+
+    def write(self, text):
+        """Add the text to the buffer and write it out if it's full.
+
+        Args:
+            text (str)
+
+        """
+
+        self.buffer.append(text)
+        self.buffered += len(text)
+
+        if self.buffered >= self.BUFFERSIZE:
+            self.flush()
+
+    def writeComment(self, key, value=None):
+        """Write the comment line.
+
+        Args:
+            key (str): Name of the attribute or the text of the comment.
+            value (str): Value of the attribute. If None, the comment is
+                written without " = ".
+
+        """
+
+        if value is None:
+            self.write(f"# {key}\n")
+        else:
+            self.write(f"# {key} = {value}\n")
+
+    def writeSentence(self, tokens, metadata=None):
+        """Write the sentence and the blank line after it.
+
+        Args:
+            tokens (list of dict): Fields of tokens (see formatLine).
+            metadata (dict): Attributes written as comments before the
+                sentence, like "metadata" of ConlluReader.nextSentence.
+
+        """
+
+        if metadata:
+            for key, value in metadata.items():
+                self.writeComment(key, value)
+
+        self.write("".join(
+            self.formatLine(token, i)
+            for i, token in enumerate(tokens, start=1)
+        ) + "\n")
+
+        self.sentences += 1
+
+    def flush(self):
+        """Write the buffer to the file.
+        """
+
+        if self.buffer:
+            self.file.write("".join(self.buffer))
+            self.buffer = list()
+            self.buffered = 0
+
+        self.file.flush()
+
+    def close(self):
+        """Write the buffer and close the file.
+        """
+
+        self.flush()
+        self.file.close()
@@ -0,0 +1,363 @@
+"""Faster version of ConlluReader. It reads the file by big chunks instead of
+line by line, doesn't check format unless strict=True is given, and parses
+fields of data lines only when they are accessed. Results are the same as
+ConlluReader returns, but "data" of data lines is LazyFields instead of dict.
+
+Usage:
+    reader = FastConlluReader(open("uk.conllu", encoding="utf-8"))
+    for line in reader:
+        ...
+    reader.rewind()
+    for sentence in reader.sentences():
+        ...
+"""
+
+from libs.ud.conllu import ConlluReader
+from collections.abc import MutableMapping
+
+
+# Names of the fields of CoNLL-U data line in their order.
+FIELDS = (
+    "id", "form", "lemma", "upos", "xpos", "feats", "head", "deprel", "deps",
+    "misc"
+)
+INDEX = {field: i for i, field in enumerate(FIELDS)}
+FEATS = INDEX["feats"]
+
+# Marker of a deleted field.
+DELETED = object()
+
+
+class LazyFields(MutableMapping):
+    """Fields of a data line. It acts like a dict with the same content as
+    ConlluReader makes, but FEATS are parsed at the first access. Keys which
+    are not CoNLL-U fields can be added too.
+
+    Properties:
+        values (list): Values of the fields in order of FIELDS.
+        parsed (bool): Whether FEATS were parsed already.
+        extra (dict): Keys added besides CoNLL-U fields. None if there's no
+            such keys.
+
+    """
+
+    __slots__ = ("values", "parsed", "extra")
+
+    def __init__(self, values):
+        """Init the fields.
+
+        Args:
+            values (list of str): Values split from the line.
+
+        """
+
+        self.values = values
+        self.parsed = False
+        self.extra = None
+
+    def __getitem__(self, key):
+        i = INDEX.get(key)
+
+        if i is None:
+            if self.extra is None:
+                raise KeyError(key)
+            return self.extra[key]
+
+        if i == FEATS and not self.parsed:
+            self.parsed = True
+            if self.values[i] is not DELETED:
+                self.values[i] = ConlluReader.parseFeats(self.values[i])
+
+        if self.values[i] is DELETED:
+            raise KeyError(key)
+
+        return self.values[i]
+
+    def __setitem__(self, key, value):
+        i = INDEX.get(key)
+
+        if i is None:
+            if self.extra is None:
+                self.extra = dict()
+            self.extra[key] = value
+            return
+
+        if i == FEATS:
+            self.parsed = True
+
+        self.values[i] = value
+
+    def __delitem__(self, key):
+        i = INDEX.get(key)
+
+        if i is None:
+            if self.extra is None:
+                raise KeyError(key)
+            del self.extra[key]
+            return
+
+        if self.values[i] is DELETED:
+            raise KeyError(key)
+
+        self.values[i] = DELETED
+
+    def __contains__(self, key):
+        i = INDEX.get(key)
+
+        if i is None:
+            return self.extra is not None and key in self.extra
+
+        return self.values[i] is not DELETED
+
+    def __iter__(self):
+        for field, value in zip(FIELDS, self.values):
+            if value is not DELETED:
+                yield field
+
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self):
+        return (
+            sum(1 for value in self.values if value is not DELETED) +
+            (len(self.extra) if self.extra is not None else 0)
+        )
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def copy(self):
+        """Returns dict with the same content.
+        """
+
+        return dict(self)
+
+
+class FastConlluReader(ConlluReader):
+    """ConlluReader which reads the file by chunks and parses data lines
+    lazily. Format is checked only if strict=True is given.
+
+    Properties:
+        BUFFERSIZE (int): Number of characters read from file at once.
+        buffer (list of str): Lines of the last read chunk without "\\n".
+        position (int): Index of the next line in the buffer.
+        tail (str): Incomplete line at the end of the last chunk.
+
+    """
+
+    BUFFERSIZE = 1 << 20
+
+    def __init__(
+        self, fp, ignoreComments=False, strict=False, replaceMTE=False,
+        useIndex=True, compact=False, saveIndex=False
+    ):
+        """Init the reader.
+
+        Args:
+            (See ConlluReader.__init__)
+
+        """
+
+        super().__init__(
+            fp, ignoreComments, strict, replaceMTE, useIndex, compact,
+            saveIndex
+        )
+
+        self.buffer = list()
+        self.position = 0
+        self.tail = ""
+
+    def readLine(self):
+        """Returns the next line of the file without "\\n".
+
+        Returns:
+            str: The line. None if end of the file was reached.
+
+        """
+
+        if self.position >= len(self.buffer):
+            self.fill()
+            if not self.buffer:
+                return None
+
+        line = self.buffer[self.position]
+        self.position += 1
+
+        return line
+
+    def fill(self):
+        """Read the next chunk of the file into the buffer.
+        """
+
+        self.position = 0
+        chunk = self.file.read(self.BUFFERSIZE)
+
+        if not chunk:
+            # ConlluReader cuts the last character of every line, even if the
+            # last line of file has no "\n".
+            self.buffer = [self.tail[:-1]] if self.tail else []
+            self.tail = ""
+            return
+
+        self.buffer = (self.tail + chunk).split("\n")
+        self.tail = self.buffer.pop()
+
+        if not self.buffer:
+            # The chunk contains no line endings
+            self.fill()
+
+    def seek(self, position, cursor=0):
+        """See GCReader.seek. Buffered lines are dropped.
+        """
+
+        super().seek(position, cursor)
+
+        self.buffer = list()
+        self.position = 0
+        self.tail = ""
+
+    def validate(self, values):
+        """Check fields of the data line as ConlluReader does with
+        strict=True.
+
+        Args:
+            values (list of str): Fields of the line.
+
+        Raises:
+            (See ConlluReader.nextLine)
+
+        """
+
+        for field, value in zip(FIELDS, values):
+
+            if not value or value == ' ':
+                raise TypeError(
+                    f"The '{field}' field field is missing at "
+                    f"{self.cursor} line in {self.file.name}."
+                )
+
+            if ' ' in value and field in ['form', 'lemma']:
+                raise TypeError(
+                    f"Fields other than 'form' and 'lemma' must not "
+                    f"contain space characters. Error at {self.cursor} "
+                    f"line in {self.file.name}."
+                )
+
+            if value == '_' and field in ['id', 'upos', 'head', 'deprel']:
+                raise TypeError(
+                    f"Fields 'id', 'upos', 'head', 'deprel' cannot be "
+                    f"unspecified. Error at {self.cursor} line in "
+                    f"{self.file.name}."
+                )
+
+    def nextLine(self, replaceMTE=False):
+        """Parse the next line of the file, return it and increase cursor.
+
+        Returns:
+            dict: (See ConlluReader.nextLine). "data" of data lines is
+                LazyFields.
+
+        Raises:
+            (See ConlluReader.nextLine)
+
+        """
+
+        while True:
+            line = self.readLine()
+
+            # Increase cursor to remember current reading line.
+            self.cursor += 1
+
+            if line is None:
+                raise EOFError("End of the file was reached.")
+
+            parsed = self.parseLine(line)
+            if parsed is not None:
+                return parsed
+
+    def parseLine(self, line):
+        """Parse the line as nextLine does.
+
+        Args:
+            line (str): Line without "\\n".
+
+        Returns:
+            dict: See ConlluReader.nextLine. None if the line is a comment
+                and comments are ignored.
+
+        Raises:
+            (See ConlluReader.nextLine)
+
+        """
+
+        if not line:
+            return {
+                "type": self.BLANKLINE
+            }
+
+        if line[0] == '#':
+            if self.ignoreComments:
+                return None
+
+            # (See ConlluReader.nextLine for the format of comments)
+            data = line[2:]
+            if " = " in data:
+                data = data.split(" = ", maxsplit=1)
+                data = {data[0]: data[1]}
+            return {
+                "type": self.COMMENTLINE,
+                "data": data
+            }
+
+        values = line.split('\t', maxsplit=10)
+        if len(values) != 10:
+            self.missingField()
+
+        if self.strict:
+            self.validate(values)
+
+        if values[3] == "_":
+            return {
+                "type": self.BLANKLINE
+            }
+
+        return self.dataLine(LazyFields(values))
+
+    def missingField(self):
+        """Raise the error about wrong number of fields in the current line.
+
+        Raises:
+            TypeError
+
+        """
+
+        raise TypeError(
+            f"Some of the field is missing. When you want to make field "
+            f"blank, just leave it with '_'. Error at {self.cursor} line "
+            f"in {self.file.name}."
+        )
+
+    def dataLine(self, data):
+        """Make result of nextLine for data line.
+
+        Args:
+            data (LazyFields): Fields of the line.
+
+        Returns:
+            dict: See ConlluReader.nextLine.
+
+        """
+
+        if hasattr(self, "udt"):
+            data["xpos"] = self.encodeUDT(data["upos"], data["feats"])
+
+        return {
+            "type": self.DATALINE,
+            "data": data
+        }
+
+    def rawLine(self):
+        """See GCReader.rawLine.
+        """
+
+        return self.readLine()
@@ -0,0 +1,267 @@
+"""Compact representation of morphological features. FeatureCodec packs UPOS
+and features of a token into one integer, where each of the fields listed in
+udtxposdata.json takes a fixed number of bits. Then comparisons of tokens
+become operations over integers:
+
+    codec = FeatureCodec()
+    a = codec.encode({"upos": "NOUN", "Case": "Nom", "Number": "Sing"})
+    b = codec.encode({"upos": "NOUN", "Case": "Gen"})
+    codec.names(codec.common(a, b))   # ["upos"]
+    codec.names(codec.differs(a, b))  # ["Case"]
+    codec.contains(a, b)              # False
+
+Value 0 of a field means the feature is absent. Values from udtxposdata.json
+have fixed codes, others are given codes at the first occurrence, so codes
+are comparable only if they were made by the same codec. Keys which are not
+UDT fields (like "xpos") can be added as extra fields, their values are all
+given codes at the first occurrence.
+"""
+
+from libs.ud import tables
+
+
+class FeatureCodec:
+    """Encoder of features into integers.
+
+    Properties:
+        fields (list): Names of fields: "upos", properties of UDT and extra
+            fields.
+        index (dict): {field name: number of the field}.
+        width (int): Number of bits of each field.
+        values (list of list): Values of each field by their codes. The 0th
+            value is None, since 0 denotes absence of the feature.
+        codes (list of dict): {value: code} for each field.
+        FIELD (int): Bit mask of one field.
+        LOWS (int): Mask with the lowest bit of each field set.
+
+    """
+
+    def __init__(self, width=None, extra=()):
+        """Init the codec with fields and values from udtxposdata.json.
+
+        Args:
+            width (int): Bits per field. By default it's twice enough for the
+                longest list of known values, so there's space for unknown
+                ones.
+            extra (list of str): Names of extra fields.
+
+        """
+
+        data = tables.get("udtxposdata")["data"]
+
+        self.fields = ["upos"] + list(data["properties"]) + list(extra)
+        self.index = {name: i for i, name in enumerate(self.fields)}
+
+        known = [list(data["poses"])] + [
+            list(block.get("props", dict()))
+            for block in data["properties"].values()
+        ] + [list() for _ in extra]
+
+        self.width = width or (
+            max(len(values) for values in known).bit_length() + 1
+        )
+        self.values = [[None] + values for values in known]
+        self.codes = [
+            {value: code for code, value in enumerate(values) if code}
+            for values in self.values
+        ]
+
+        self.FIELD = (1 << self.width) - 1
+        self.LOWS = sum(
+            1 << (i * self.width) for i in range(len(self.fields))
+        )
+
+    def register(self, field, value):
+        """Give a code to the unknown value of the field.
+
+        Args:
+            field (int): Number of the field.
+            value (str)
+
+        Returns:
+            int: Code of the value.
+
+        Raises:
+            CodecOverflow: There's no free codes in the field.
+
+        """
+
+        if len(self.values[field]) > self.FIELD:
+            raise CodecOverflow(
+                f"Too many values of {self.fields[field]} for the width of "
+                f"{self.width} bits."
+            )
+
+        code = len(self.values[field])
+        self.values[field].append(value)
+        self.codes[field][value] = code
+
+        return code
+
+    def encode(self, token):
+        """Pack features of the token. Keys which are not fields of the codec
+        (like "word") are ignored.
+
+        Args:
+            token (dict): {"upos": ..., feature: value, ...}.
+
+        Returns:
+            int
+
+        """
+
+        packed = 0
+
+        for key, value in token.items():
+            field = self.index.get(key)
+            if field is None:
+                continue
+
+            code = self.codes[field].get(value)
+            if code is None:
+                code = self.register(field, value)
+
+            packed |= code << (field * self.width)
+
+        return packed
+
+    def decode(self, packed):
+        """Unpack features.
+
+        Args:
+            packed (int): Result of encode.
+
+        Returns:
+            dict: Features in the order of self.fields.
+
+        """
+
+        token = dict()
+
+        for field, name in enumerate(self.fields):
+            code = (packed >> (field * self.width)) & self.FIELD
+            if code:
+                token[name] = self.values[field][code]
+
+        return token
+
+    def present(self, packed):
+        """Returns mask of fields which are set.
+
+        Args:
+            packed (int)
+
+        Returns:
+            int: All the bits of non-zero fields are set.
+
+        """
+
+        # Fold all the bits of each field into its lowest bit, then spread
+        # the lowest bits over the whole fields.
+        folded = packed
+        for shift in range(1, self.width):
+            folded |= packed >> shift
+
+        return (folded & self.LOWS) * self.FIELD
+
+    def contains(self, packed, sub):
+        """Check if the token has all the features of sub with the same
+        values, like libs.arrproc.isSupsetTo does for dicts.
+
+        Args:
+            packed, sub (int)
+
+        Returns:
+            bool
+
+        """
+
+        return (packed ^ sub) & self.present(sub) == 0
+
+    def common(self, a, b):
+        """Returns mask of fields which are set in both tokens to the same
+        values.
+
+        Args:
+            a, b (int)
+
+        Returns:
+            int
+
+        """
+
+        return self.present(a & ~self.present(a ^ b))
+
+    def differs(self, a, b):
+        """Returns mask of fields which are set in both tokens, but to
+        different values.
+
+        Args:
+            a, b (int)
+
+        Returns:
+            int
+
+        """
+
+        return self.present(a ^ b) & self.present(a) & self.present(b)
+
+    def mask(self, names):
+        """Returns mask of the fields.
+
+        Args:
+            names (iterable of str): Names of fields. Names which are not
+                fields of the codec are ignored.
+
+        Returns:
+            int: All the bits of the fields are set.
+
+        """
+
+        mask = 0
+
+        for name in names:
+            field = self.index.get(name)
+            if field is not None:
+                mask |= self.FIELD << (field * self.width)
+
+        return mask
+
+    def has(self, mask, name):
+        """Check if the field is set in the mask.
+
+        Args:
+            mask (int): Result of present, common or differs.
+            name (str): Name of the field.
+
+        Returns:
+            bool
+
+        """
+
+        return bool((mask >> (self.index[name] * self.width)) & self.FIELD)
+
+    def names(self, mask):
+        """Returns names of fields which are set in the mask.
+
+        Args:
+            mask (int)
+
+        Returns:
+            list of str
+
+        """
+
+        names = list()
+
+        # Jump from one set bit to another instead of checking every field
+        while mask:
+            field = ((mask & -mask).bit_length() - 1) // self.width
+            names.append(self.fields[field])
+            mask &= ~(self.FIELD << (field * self.width))
+
+        return names
+
+
+class CodecOverflow(Exception):
+    pass
@@ -0,0 +1,252 @@
+"""ConlluReader for big files. The file is memory-mapped, and boundaries of
+lines and fields are found with find over the mapped bytes, so neither lines
+nor their fields are copied out of the map. A data line keeps only offsets of
+its fields, and a column is decoded from a memoryview of the map when it's
+accessed for the first time. Results are the same as ConlluReader returns,
+but "data" of data lines is MappedFields.
+
+Lines must be separated with "\\n" or "\\r\\n".
+
+Usage:
+    with open("uk.conllu", encoding="utf-8") as fp:
+        with MmapConlluReader(fp) as reader:
+            sentence = reader.nextSentence()
+"""
+
+from libs.ud.fastconllu import FastConlluReader, LazyFields, FIELDS, INDEX
+import mmap
+
+
+# Marker of a column which was not decoded yet.
+UNREAD = object()
+
+
+class MappedFields(LazyFields):
+    """LazyFields which decodes values on demand. Columns must be accessed
+    or copied before the reader is closed.
+
+    Properties:
+        view (memoryview): The mapped file.
+        bounds (list of int): Offset of each field in the view, and the
+            offset after the "\\n" of the line. Field i takes bytes from
+            bounds[i] to bounds[i + 1] - 1.
+        encoding (str): Encoding of the file.
+
+    """
+
+    __slots__ = ("view", "bounds", "encoding")
+
+    def __init__(self, view, bounds, encoding):
+        """Init the fields.
+
+        Args:
+            view (memoryview), bounds (list of int), encoding (str): See the
+                properties.
+
+        """
+
+        super().__init__([UNREAD] * len(FIELDS))
+
+        self.view = view
+        self.bounds = bounds
+        self.encoding = encoding
+
+    def column(self, i):
+        """Decode the column.
+
+        Args:
+            i (int): Number of the column.
+
+        Returns:
+            str
+
+        """
+
+        return str(
+            self.view[self.bounds[i]:self.bounds[i + 1] - 1], self.encoding
+        )
+
+    def __getitem__(self, key):
+        i = INDEX.get(key)
+
+        if i is not None and self.values[i] is UNREAD:
+            self.values[i] = self.column(i)
+
+        return super().__getitem__(key)
+
+
+class MmapConlluReader(FastConlluReader):
+    """FastConlluReader which reads memory-mapped file. Close the reader (or
+    use it as a context manager) to unmap the file; the file itself is left
+    open.
+
+    Properties:
+        mapped (mmap.mmap): The mapped file. None for an empty file, since it
+            can't be mapped.
+        data (mmap.mmap, bytes): The mapped file, or empty bytes.
+        view (memoryview): View of data which fields are decoded from.
+        size (int): Size of the file in bytes.
+        offset (int): Offset of the next line.
+        encoding (str): Encoding of the file.
+
+    """
+
+    def __init__(
+        self, fp, ignoreComments=False, strict=False, replaceMTE=False,
+        useIndex=True, compact=False, saveIndex=False
+    ):
+        """Init the reader and map the file.
+
+        Args:
+            (See ConlluReader.__init__). The file must be on disk and not
+                compressed.
+
+        Raises:
+            io.UnsupportedOperation: The file can't be mapped.
+
+        """
+
+        super().__init__(
+            fp, ignoreComments, strict, replaceMTE, useIndex, compact,
+            saveIndex
+        )
+
+        fileno = self.file.fileno()
+
+        try:
+            self.mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+            self.data = self.mapped
+        except ValueError:
+            self.mapped = None
+            self.data = b""
+
+        self.view = memoryview(self.data)
+        self.size = len(self.data)
+        self.offset = 0
+        self.encoding = getattr(fp, "encoding", None) or "utf-8"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Unmap the file. Fields of returned lines can't be decoded after
+        that.
+        """
+
+        self.view.release()
+        if self.mapped is not None:
+            self.mapped.close()
+
+    def seek(self, position, cursor=0):
+        """See GCReader.seek. Position is a byte offset.
+        """
+
+        self.offset = position
+        self.cursor = cursor
+
+    def nextBounds(self):
+        """Find the next line and move past it.
+
+        Returns:
+            tuple: (start, end) offsets of the line without "\\n" and
+                "\\r". None if end of the file was reached.
+
+        """
+
+        start = self.offset
+
+        if start >= self.size:
+            return None
+
+        end = self.data.find(b"\n", start)
+        if end == -1:
+            # ConlluReader cuts the last character of every line, even if
+            # the last line of file has no "\\n".
+            end = self.size - 1
+            self.offset = self.size
+        else:
+            self.offset = end + 1
+
+        if end > start and self.data[end - 1] == 13:
+            end -= 1
+
+        return start, end
+
+    def rawLine(self):
+        """See GCReader.rawLine.
+        """
+
+        bounds = self.nextBounds()
+
+        if bounds is None:
+            return None
+
+        return str(self.view[bounds[0]:bounds[1]], self.encoding)
+
+    def nextLine(self, replaceMTE=False):
+        """Parse the next line of the file, return it and increase cursor.
+
+        Returns:
+            dict: (See ConlluReader.nextLine). "data" of data lines is
+                MappedFields.
+
+        Raises:
+            (See ConlluReader.nextLine)
+
+        """
+
+        data = self.data
+        find = data.find
+
+        while True:
+            line = self.nextBounds()
+
+            # Increase cursor to remember current reading line.
+            self.cursor += 1
+
+            if line is None:
+                raise EOFError("End of the file was reached.")
+
+            start, end = line
+
+            if start == end:
+                return {
+                    "type": self.BLANKLINE
+                }
+
+            if data[start] != 35:
+                break
+
+            # Comments are rare, so they're parsed as strings
+            parsed = self.parseLine(str(self.view[start:end], self.encoding))
+            if parsed is not None:
+                return parsed
+
+        # Line must have exactly 9 tabs, as split(maxsplit=10) in
+        # FastConlluReader must return 10 fields.
+        bounds = [start]
+        tab = start - 1
+        for _ in range(9):
+            tab = find(b"\t", tab + 1, end)
+            if tab == -1:
+                self.missingField()
+            bounds.append(tab + 1)
+        if find(b"\t", tab + 1, end) != -1:
+            self.missingField()
+        bounds.append(end + 1)
+
+        fields = MappedFields(self.view, bounds, self.encoding)
+
+        if self.strict:
+            self.validate([fields.column(i) for i in range(len(FIELDS))])
+
+        # UPOS is "_"
+        if bounds[4] - bounds[3] == 2 and data[bounds[3]] == 95:
+            return {
+                "type": self.BLANKLINE
+            }
+
+        return self.dataLine(fields)
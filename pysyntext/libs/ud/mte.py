@@ -4,14 +4,34 @@ It will use mtexposdata.json file in this directory in order to encode XPOS
 tag.
 """
 
-import os
-import json
+from libs.lrucache import LRUCache
+from libs.ud import tables
 
 
 class MTEParser:
+    """Parser of MULTEXT-East tags. Its data, letters and codes are shared
+    with all the other parsers (see libs.ud.tables), so they must not be
+    modified.
 
-    def __init__(self):
-        """Open and parse mtexposdata.json file.
+    Properties:
+        data (dict): Content of mtexposdata.json.
+        letters (dict): {upos name: POS letter}.
+        codes (dict): {POS letter: {attribute: {value: value letter}}}.
+        memo (dict): Results of the most recent calls of parse and
+            stringify: {"parse": LRUCache of {tag: features}, "stringify":
+            LRUCache of {frozen features: tag}}. None if memoizing is
+            disabled.
+
+    """
+
+    def __init__(self, memoize=1024):
+        """Take tables of mtexposdata.json file, shared by all the parsers.
+
+        Args:
+            memoize (int): Remember results of this number of the most recent
+                calls of parse and of stringify each, so frequent tags and
+                sets of features are converted only once. Set to 0 to disable
+                memoizing.
 
         Raises:
             FileNotFoundError: The file mtexposdata.json data is not exists.
@@ -20,16 +40,15 @@ class MTEParser:
 
         """
 
-        try:
-            with open(
-                os.path.join(
-                    os.path.dirname(__file__),
-                    "mtexposdata.json"
-                )
-            ) as fp:
-                self.data = json.load(fp)
-        except FileNotFoundError:
-            raise FileNotFoundError("File mtexposdata.json was not found!")
+        table = tables.get("mtexposdata")
+
+        self.data = table["data"]
+        self.letters = table["letters"]
+        self.codes = table["codes"]
+
+        self.memo = {
+            "parse": LRUCache(memoize), "stringify": LRUCache(memoize)
+        } if memoize else None
 
     def parse(self, tag: str):
         """Returns features of the given XPOS.
@@ -52,6 +71,12 @@ class MTEParser:
 
         """
 
+        if self.memo is not None:
+            feats = self.memo["parse"].get(tag)
+            if feats is not LRUCache.MISSING:
+                # Callers modify features, so the remembered ones are copied
+                return dict(feats)
+
         feats = dict()
 
         try:
@@ -72,6 +97,9 @@ class MTEParser:
                 " MULTEXT-East Morphosyntactic Specifications, Version 4."
             )
 
+        if self.memo is not None:
+            self.memo["parse"].put(tag, dict(feats))
+
         return feats
 
     def stringify(self, props):
@@ -91,35 +119,41 @@ class MTEParser:
 
         """
 
-        letter = str()
-        tag = str()
-
-        # Iterate data to find letter for UPOS specified in props
-        for posname, nested in self.data.items():
-            if nested["upos"] == props["name"]:
-                # Remember the letter
-                letter = posname
-                # Add it to the tag
-                tag += letter
-                break
-
-        if len(tag) == 0:
+        key = None
+        if self.memo is not None:
+            try:
+                key = frozenset(props.items())
+            except TypeError:
+                # Some of values are unhashable
+                pass
+            else:
+                tag = self.memo["stringify"].get(key)
+                if tag is not LRUCache.MISSING:
+                    return tag
+
+        if props["name"] not in self.letters:
             raise IncorrectTag(
                 "No POS name found for properties you specified."
             )
 
-        for attr in self.data[letter]["attrs"]:
+        letter = self.letters[props["name"]]
+        tag = letter
+
+        for attr, values in self.codes[letter].items():
             # Undefined properties must be denoted with a dash
             if attr not in props:
                 tag += "-"
                 continue
-            for value in self.data[letter][attr]:
-                if self.data[letter][attr][value] == props[attr]:
-                    tag += value
-                    break
+            # Unknown values are omitted
+            tag += values.get(props[attr], "")
 
         # Dashes for undefined properties are not necessary at the end
-        return tag.rstrip("-")
+        tag = tag.rstrip("-")
+
+        if key is not None:
+            self.memo["stringify"].put(key, tag)
+
+        return tag
 
 
 class IncorrectTag(Exception):
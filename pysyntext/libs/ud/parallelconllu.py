@@ -0,0 +1,164 @@
+"""Parse big CoNLL-U file in several processes. The file is split into shards
+of whole sentences with SentenceIndex, so each shard starts right after a
+sentence boundary. Shards are parsed by MmapConlluReader in a pool of
+processes. Sentences come back in order of the file, or in order of
+readiness if ordered=False. The number of shards in flight is limited, so
+memory doesn't depend on the size of the file.
+
+Usage:
+    for sentence in parallelSentences("uk.conllu", processes=4):
+        ...
+"""
+
+from libs.ud.conlluindex import SentenceIndex
+from libs.ud.mmapconllu import MmapConlluReader
+from collections import deque
+from multiprocessing import Pool
+from queue import Queue
+import os
+
+
+def shards(index, size):
+    """Split the indexed file into shards.
+
+    Args:
+        index (SentenceIndex)
+        size (int): Number of sentences in shard.
+
+    Yields:
+        tuple: (byte offset, number of lines before it, number of sentences).
+
+    """
+
+    for start in range(0, len(index), size):
+        offset, lines = index.sentence(start)
+        yield (offset, lines, min(size, len(index) - start))
+
+
+def parseShard(path, shard, options):
+    """Parse sentences of the shard. It's being called in worker processes.
+
+    Args:
+        path (str): Path to CoNLL-U file.
+        shard (tuple): Result of shards.
+        options (dict): Arguments for MmapConlluReader.
+
+    Returns:
+        list of dict: Results of ConlluReader.nextSentence. Fields of data
+            lines are dicts.
+
+    Raises:
+        ...Errors from ConlluReader.nextSentence
+
+    """
+
+    offset, lines, count = shard
+    result = list()
+
+    with open(path, encoding="utf-8") as fp, MmapConlluReader(
+        fp, useIndex=False, **options
+    ) as reader:
+        reader.seek(offset, lines)
+
+        for _ in range(count):
+            sentence = reader.nextSentence()
+            for line in sentence["sentence"]:
+                line["data"] = line["data"].copy()
+            result.append(sentence)
+
+    return result
+
+
+def takeReady(ready):
+    """Wait for the next parsed shard.
+
+    Args:
+        ready (Queue): Results and errors of parseShard.
+
+    Returns:
+        list of dict: Result of parseShard.
+
+    Raises:
+        ...Errors from parseShard
+
+    """
+
+    result = ready.get()
+
+    if isinstance(result, BaseException):
+        raise result
+
+    return result
+
+
+def parallelSentences(
+    path, processes=None, size=1000, pending=None, ordered=True,
+    ignoreComments=False, strict=False, replaceMTE=False, saveIndex=False
+):
+    """Parse sentences of the file in a pool of processes. Like
+    FastConlluReader.sentences, it stops at the last complete sentence.
+
+    Args:
+        path (str): Path to CoNLL-U file.
+        processes (int): Number of worker processes. Number of CPUs by
+            default.
+        size (int): Number of sentences sent to worker at once.
+        pending (int): Maximum number of shards being parsed or waiting to
+            be yielded. Twice the number of processes by default.
+        ordered (bool): Yield sentences in order of the file. Otherwise
+            shards are yielded as soon as they're parsed.
+        ignoreComments, strict, replaceMTE, saveIndex (bool): See
+            ConlluReader.__init__.
+
+    Yields:
+        dict: See ConlluReader.nextSentence. Fields of data lines are dicts.
+
+    Raises:
+        ...Errors from ConlluReader.nextSentence
+
+    """
+
+    processes = processes or os.cpu_count() or 1
+    pending = pending or 2 * processes
+    options = {
+        "ignoreComments": ignoreComments,
+        "strict": strict,
+        "replaceMTE": replaceMTE
+    }
+    index = SentenceIndex.load(path, saveIndex)
+
+    with Pool(processes) as pool:
+        if ordered:
+            queue = deque()
+
+            for shard in shards(index, size):
+                # Wait for the oldest shard, so sentences are yielded in order
+                if len(queue) >= pending:
+                    yield from queue.popleft().get()
+
+                queue.append(
+                    pool.apply_async(parseShard, (path, shard, options))
+                )
+
+            while queue:
+                yield from queue.popleft().get()
+
+            return
+
+        ready = Queue()
+        running = 0
+
+        for shard in shards(index, size):
+            if running >= pending:
+                running -= 1
+                yield from takeReady(ready)
+
+            pool.apply_async(
+                parseShard, (path, shard, options),
+                callback=ready.put, error_callback=ready.put
+            )
+            running += 1
+
+        while running:
+            running -= 1
+            yield from takeReady(ready)
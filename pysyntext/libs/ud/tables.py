@@ -0,0 +1,188 @@
+"""Tag tables for UDTParser and MTEParser. Each table is loaded only once per
+process and shared between all the parsers, so parsers must not modify it.
+
+A table contains the content of its JSON file in this directory and reverse
+lookup dicts built from it. Tables are compiled into <name>.pickle at install
+time (see setup.py), so they're unpickled instead of being built again. JSON
+file is used if the pickle is absent or older than it.
+"""
+
+import json
+import os
+import pickle
+
+
+DIRECTORY = os.path.dirname(__file__)
+
+# Loaded tables: {name: table}.
+TABLES = dict()
+
+
+def compileUDT(data):
+    """Build the table for UDTParser.
+
+    Args:
+        data (dict): Content of udtxposdata.json.
+
+    Returns:
+        dict: {
+            "data": data,
+            "poses": {POS letter: upos},
+            "properties": {property code: (property name, {value code:
+                value})}
+        }
+
+    """
+
+    # When codes repeat, the first one wins, as it was with linear search.
+    poses = dict()
+    for upos, letter in data["poses"].items():
+        poses.setdefault(letter, upos)
+
+    properties = dict()
+    for name, block in data["properties"].items():
+        values = dict()
+        for value, code in block.get("props", dict()).items():
+            values.setdefault(code, value)
+        properties.setdefault(block["name"], (name, values))
+
+    return {
+        "data": data,
+        "poses": poses,
+        "properties": properties
+    }
+
+
+def compileMTE(data):
+    """Build the table for MTEParser.
+
+    Args:
+        data (dict): Content of mtexposdata.json.
+
+    Returns:
+        dict: {
+            "data": data,
+            "letters": {upos name: POS letter},
+            "codes": {POS letter: {attribute: {value: value letter}}}
+        }
+
+    """
+
+    # When names repeat, the first one wins, as it was with linear search.
+    letters = dict()
+    codes = dict()
+    for letter, block in data.items():
+        letters.setdefault(block["upos"], letter)
+        codes[letter] = dict()
+        for attr in block["attrs"]:
+            values = dict()
+            for code, value in block.get(attr, dict()).items():
+                values.setdefault(value, code)
+            codes[letter][attr] = values
+
+    return {
+        "data": data,
+        "letters": letters,
+        "codes": codes
+    }
+
+
+COMPILERS = {
+    "udtxposdata": compileUDT,
+    "mtexposdata": compileMTE
+}
+
+
+def fromJSON(name, directory=DIRECTORY):
+    """Read JSON file of the table and compile it.
+
+    Args:
+        name (str): Name of the table: "udtxposdata" or "mtexposdata".
+        directory (str): Directory with the file.
+
+    Returns:
+        dict: The table.
+
+    Raises:
+        FileNotFoundError: JSON file of the table is not exists.
+
+    """
+
+    try:
+        with open(
+            os.path.join(directory, f"{name}.json"), encoding="utf-8"
+        ) as fp:
+            data = json.load(fp)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File {name}.json was not found!")
+
+    return COMPILERS[name](data)
+
+
+def load(name):
+    """Load the table from the pickle if it's up to date or from JSON
+    otherwise.
+
+    Args:
+        name (str): Name of the table.
+
+    Returns:
+        dict: The table.
+
+    """
+
+    path = os.path.join(DIRECTORY, f"{name}.pickle")
+    source = os.path.join(DIRECTORY, f"{name}.json")
+
+    try:
+        if os.path.getmtime(path) >= os.path.getmtime(source):
+            with open(path, "rb") as fp:
+                return pickle.load(fp)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        # Pickle is absent or broken
+        pass
+
+    return fromJSON(name)
+
+
+def get(name):
+    """Returns the shared table, loading it at the first call.
+
+    Args:
+        name (str): Name of the table.
+
+    Returns:
+        dict: The table. Do not modify it.
+
+    """
+
+    if name not in TABLES:
+        TABLES[name] = load(name)
+
+    return TABLES[name]
+
+
+def dump(directory=DIRECTORY):
+    """Compile all the tables from JSON files in the directory into pickles
+    next to them.
+
+    Args:
+        directory (str)
+
+    Returns:
+        list: Paths to written files.
+
+    """
+
+    paths = list()
+
+    for name in COMPILERS:
+        path = os.path.join(directory, f"{name}.pickle")
+        with open(path, "wb") as fp:
+            pickle.dump(
+                fromJSON(name, directory), fp,
+                protocol=pickle.HIGHEST_PROTOCOL
+            )
+        paths.append(path)
+
+    return paths
@@ -0,0 +1,169 @@
+"""Convert XPOS tags of CoNLL-U files from MULTEXT-East to UDT once, so
+readers don't need replaceMTE=True at each run. Sentences are transcoded in
+a pool of processes by batches, and the number of batches in flight is
+limited, so memory doesn't depend on the size of the corpus. Order of
+sentences is kept.
+
+Usage:
+    with open("out.conllu", "w", encoding="utf-8") as output:
+        transcode(["a.conllu", "b.conllu"], output, processes=4)
+"""
+
+from libs.ud.conllu import ConlluReader
+from libs.ud.udt import UDTParser
+from libs.streams import openText
+from collections import deque
+from multiprocessing import Pool
+import os
+
+
+# Parser of the worker process. Created at the first batch.
+PARSER = None
+
+
+def transcodeLine(line, udt):
+    """Replace XPOS in the line of CoNLL-U file with UDT tag made of its UPOS
+    and FEATS, as ConlluReader.encodeUDT does. Comments, blank lines and
+    lines with unspecified UPOS (like multiword tokens) are returned as they
+    are.
+
+    Args:
+        line (str): Line with or without "\\n" at the end.
+        udt (UDTParser)
+
+    Returns:
+        str
+
+    Raises:
+        TypeError: Some of the fields in line is missing.
+        ...Errors from UDTParser.stringify
+
+    """
+
+    if not line.strip() or line[0] == "#":
+        return line
+
+    ending = "\n" if line[-1] == "\n" else ""
+    fields = line[:len(line) - len(ending)].split("\t")
+
+    if len(fields) != 10:
+        raise TypeError(f"Some of the field is missing in line: {line}")
+
+    if fields[3] == "_":
+        return line
+
+    fields[4] = udt.stringify({
+        **(ConlluReader.parseFeats(fields[5]) or dict()),
+        **{"upos": fields[3]}
+    })
+
+    return "\t".join(fields) + ending
+
+
+def transcodeBatch(lines):
+    """Transcode lines of several sentences. It's being called in worker
+    processes.
+
+    Args:
+        lines (list of str)
+
+    Returns:
+        str: Transcoded lines joined together.
+
+    Globals:
+        PARSER (UDTParser): Parser of this process.
+
+    """
+
+    global PARSER
+
+    if PARSER is None:
+        PARSER = UDTParser()
+
+    return "".join(transcodeLine(line, PARSER) for line in lines)
+
+
+def batches(paths, size):
+    """Read files one by one and group their lines by sentences. Batches
+    don't span files: the pending batch is yielded at the end of each file.
+    If the last sentence of a file isn't followed by a blank line, the line
+    is added, so the sentence isn't merged with the first one of the next
+    file.
+
+    Args:
+        paths (list of str): Paths to CoNLL-U files. They may be
+            compressed.
+        size (int): Number of sentences in batch.
+
+    Yields:
+        list of str: Lines of the next batch. Each batch ends with the end of
+            a sentence.
+
+    """
+
+    for path in paths:
+        batch = list()
+        sentences = 0
+
+        with openText(path) as fp:
+            for line in fp:
+                batch.append(line)
+
+                if line.strip():
+                    continue
+
+                sentences += 1
+                if sentences >= size:
+                    yield batch
+                    batch = list()
+                    sentences = 0
+
+        if batch and batch[-1].strip():
+            if batch[-1][-1] != "\n":
+                batch[-1] += "\n"
+            batch.append("\n")
+
+        if batch:
+            yield batch
+
+
+def transcode(paths, output, processes=None, size=1000, pending=None):
+    """Transcode XPOS tags of the files and write them all into the output.
+
+    Args:
+        paths (list of str): Paths to CoNLL-U files with MTE tags.
+        output (file): Opened file to write results in.
+        processes (int): Number of worker processes. Number of CPUs by
+            default.
+        size (int): Number of sentences sent to worker at once.
+        pending (int): Maximum number of batches being transcoded or waiting
+            to be written. Twice the number of processes by default.
+
+    Returns:
+        int: Number of written lines, including blank lines added after
+            unterminated files.
+
+    Raises:
+        ...Errors from transcodeLine
+
+    """
+
+    processes = processes or os.cpu_count() or 1
+    pending = pending or 2 * processes
+    counter = 0
+
+    with Pool(processes) as pool:
+        queue = deque()
+
+        for batch in batches(paths, size):
+            # Wait for the oldest batch, so results are written in order
+            if len(queue) >= pending:
+                output.write(queue.popleft().get())
+
+            queue.append(pool.apply_async(transcodeBatch, (batch,)))
+            counter += len(batch)
+
+        while queue:
+            output.write(queue.popleft().get())
+
+    return counter
@@ -24,16 +24,31 @@ Example:
 
 """
 
-import os
-import json
-from textwrap import wrap
-from libs.arrproc import findIn
+from libs.lrucache import LRUCache
+from libs.ud import tables
 
 
 class UDTParser:
+    """Parser of UDT tags. Its data, poses and properties are shared with
+    all the other parsers (see libs.ud.tables), so they must not be modified.
 
-    def __init__(self):
-        """Open and parse udtxposdata.json file.
+    Properties:
+        data (dict): Content of udtxposdata.json.
+        poses (dict): {POS letter: upos}.
+        properties (dict): {property code: (property name, {value code:
+            value})}.
+        memo (LRUCache): Features of the most recently parsed tags. None if
+            memoizing is disabled.
+
+    """
+
+    def __init__(self, memoize=1024):
+        """Take tables of udtxposdata.json file, shared by all the parsers.
+
+        Args:
+            memoize (int): Remember features of this number of the most
+                recently parsed tags, so frequent tags are parsed only once.
+                Set to 0 to disable memoizing.
 
         Raises:
             FileNotFoundError: The file udtxposdata.json data is not exists.
@@ -42,16 +57,13 @@ class UDTParser:
 
         """
 
-        try:
-            with open(
-                os.path.join(
-                    os.path.dirname(__file__),
-                    "udtxposdata.json"
-                )
-            ) as fp:
-                self.data = json.load(fp)
-        except FileNotFoundError:
-            raise FileNotFoundError("File udtxposdata.json was not found!")
+        table = tables.get("udtxposdata")
+
+        self.data = table["data"]
+        self.poses = table["poses"]
+        self.properties = table["properties"]
+
+        self.memo = LRUCache(memoize) if memoize else None
 
     def parse(self, tag: str):
         """Returns features of the given tag.
@@ -73,6 +85,12 @@ class UDTParser:
 
         """
 
+        if self.memo is not None:
+            feats = self.memo.get(tag)
+            if feats is not LRUCache.MISSING:
+                # Callers modify features, so the remembered ones are copied
+                return dict(feats)
+
         #  ( (Length of tag - 1) mod 5 ) should be equal to 0:
         #  {pos letter} + {property: 3 len} + {value: 2 len} + ...
         if (len(tag) - 1) % 5 != 0:
@@ -83,32 +101,26 @@ class UDTParser:
         try:
 
             #  Find name of POS by the first letter of tag
-            feats["upos"] = findIn(self.data["poses"], tag[0])["key"]
+            feats["upos"] = self.poses[tag[0]]
 
             #  Unpack 'xaabbbccddd' as [aa, bbb], [cc, ddd]
-            #  Response of findIn is DictItem(key=..., item=...)
-            for prop, value in [
-                (rec[:2], rec[2:])
-                for rec
-                in wrap(tag[1:], 5)
-            ]:
-                block = findIn(self.data["properties"], {"name": prop})
+            for i in range(1, len(tag), 5):
+                name, values = self.properties[tag[i:i + 2]]
+                value = tag[i + 2:i + 5]
 
                 # There's no shorten for this value
-                if "props" not in block["item"]:
-                    feats[block["key"]] = value.capitalize()
+                if value not in values:
+                    feats[name] = value.capitalize()
                     continue
 
-                try:
-                    feats[block["key"]] = findIn(
-                        block["item"]["props"], value
-                    )["key"]
-                except KeyError:
-                    feats[block["key"]] = value.capitalize()
+                feats[name] = values[value]
 
         except (KeyError, IndexError):
             raise IncorrectTag(f"Unexisting property in your tag: {tag}")
 
+        if self.memo is not None:
+            self.memo.put(tag, dict(feats))
+
         return feats
 
     def stringify(self, props):
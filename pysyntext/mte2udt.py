@@ -0,0 +1,40 @@
+from libs.params import Params
+from libs.ud.transcode import transcode
+
+
+argv = Params()
+
+if argv.has("?") or not argv.has("--input"):
+    print(
+"""
+Use this script to replace MULTEXT-East XPOS tags in CoNLL-U files with UDT
+ones. Then ConlluReader can read the result without replaceMTE=True.
+
+Expected parameters:
+Name             Default     Description
+--input ...      *requiered  Paths to CoNLL-U files separated by commas. They
+                             will be written to the output one by one.
+--output ...     udt.conllu  File to write the result in.
+--processes ...  (optional)  Number of worker processes. Number of CPUs by
+                             default.
+--batch ...      1000        Number of sentences sent to a worker at once.
+""" # noqa E122
+        )
+    raise SystemExit
+
+
+if __name__ == "__main__":
+    output = argv.get("--output", default="udt.conllu")
+
+    with open(output, mode="w", encoding="utf-8") as fp:
+        counter = transcode(
+            paths=argv.get("--input").split(","),
+            output=fp,
+            processes=(
+                int(argv.get("--processes"))
+                if argv.has("--processes") else None
+            ),
+            size=int(argv.get("--batch", default=1000))
+        )
+
+    print(f"{counter} lines were written to {output}.")
@@ -12,6 +12,8 @@ sys.path.append(
         os.path.realpath(
             __file__)))
 
+from libs.streams import openText # noqa E402
+
 
 class Predefinator:
     """This class can initialize classes using configs from config.json in this
@@ -161,17 +163,17 @@ class Predefinator:
 
         if obj["object"] == "fp":
             if isinstance(obj["address"], dict):
-                return open(
-                    self.fpath + self.parseObject(obj["address"]),
-                    mode=obj["mode"] if "mode" in obj else "r",
-                    encoding="utf-8"
-                )
+                address = self.fpath + self.parseObject(obj["address"])
+            else:
+                address = self.fpath + obj["address"]
 
-            return open(
-                self.fpath + obj["address"],
-                mode=obj["mode"] if "mode" in obj else "r",
-                encoding="utf-8"
-            )
+            mode = obj["mode"] if "mode" in obj else "r"
+
+            # Files for reading may be compressed
+            if mode in ["r", "rt"]:
+                return openText(address)
+
+            return open(address, mode=mode, encoding="utf-8")
 
         if obj["object"] == "jsonfp":
             if isinstance(obj["address"], dict):
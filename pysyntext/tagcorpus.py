@@ -0,0 +1,103 @@
+from libs.params import Params
+from predefinator import Predefinator
+
+
+argv = Params()
+
+if argv.has("?") or not argv.has("--input"):
+    print(
+"""
+Use this script to tag a corpus with MorphologyRecognizer and contextual rules
+and write the result in CoNLL-U format. The corpus is read and written by
+parts, so it can be of any size.
+
+Expected parameters:
+Name             Default     Description
+--input ...      *requiered  Plain text or CoNLL-U file. It may be compressed
+                             with gzip, bzip2 or xz.
+--format ...     text        Format of the input: 'text' (each line is a
+                             paragraph) or 'conllu' (sentences are tagged
+                             again).
+--output ...     tagged.conllu
+                             File to write the result in.
+--window ...     100         Number of sentences processed at once.
+--dbhost ...     atlas       DB which will be used for MorphologyRecognizer.
+--confs ...      config.json Address to file with configurations.
+-async                       Tag sentences of a window concurrently with
+                             AsyncContextualProcessor. Its config entry is
+                             optional, the one of ContextualProcessor is used
+                             by default.
+--concurrency .. 8           Number of concurrent DB requests for -async.
+-nocorrect                   Don't correct sentences with Ctx19 rules.
+""" # noqa E122
+        )
+    raise SystemExit
+
+
+from libs.db import DB # noqa E402
+from libs.streams import openText # noqa E402
+from libs.tagcorpus import ( # noqa E402
+    tagCorpus, textSentences, conlluSentences
+)
+from libs.ud.conlluwriter import ConlluWriter # noqa E402
+from libs.ud.fastconllu import FastConlluReader # noqa E402
+
+
+if __name__ == "__main__":
+    predef = Predefinator(
+        fp=open(
+            argv.get("--confs", default="config.json"), encoding="utf-8"
+        )
+    )
+
+    db = DB(
+        host=argv.get("--dbhost", default="atlas"), dbname="syntextua"
+    )
+
+    recognizer = predef.inited(
+        "MorphologyRecognizer",
+        collection=db.cli.get_collection
+    )
+    processorName = "ContextualProcessor"
+
+    if argv.has("-async"):
+        from libs.asyncmorph import AsyncMorphologyRecognizer
+
+        recognizer = AsyncMorphologyRecognizer(
+            recognizer,
+            concurrency=int(argv.get("--concurrency", default=8))
+        )
+        processorName = "AsyncContextualProcessor"
+        # Without its own entry the processor is configured as the
+        # synchronous one
+        predef.config.setdefault(processorName, {
+            "$location": "libs.asyncmorph",
+            "$parent": "ContextualProcessor"
+        })
+
+    processor = predef.inited(
+        processorName,
+        recognizer=recognizer,
+        collection=db.cli.get_collection
+    )
+
+    if argv.get("--format", default="text") == "conllu":
+        sentences = conlluSentences(FastConlluReader(
+            open(argv.get("--input"), encoding="utf-8")
+        ))
+    else:
+        sentences = textSentences(openText(argv.get("--input")))
+
+    output = argv.get("--output", default="tagged.conllu")
+
+    with ConlluWriter(open(output, mode="w", encoding="utf-8")) as writer:
+        counter = tagCorpus(
+            sentences, processor, writer,
+            window=int(argv.get("--window", default=100)),
+            correct=not argv.has("-nocorrect")
+        )
+
+    if argv.has("-async"):
+        recognizer.close()
+
+    print(f"{counter} sentences were written to {output}.")
@@ -0,0 +1,137 @@
+"""Shared fixtures of the tests. Scripts of pysyntext import the library as
+`libs`, so the directory of scripts is added to sys.path.
+"""
+
+import os
+import sys
+
+sys.path.insert(
+    0, os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+from libs.ruleindex import copyRule  # noqa E402
+from libs.storage import RuleStorage  # noqa E402
+import pytest  # noqa E402
+
+
+DOCUMENTS = [
+    {"_id": 1, "type": "exceptions", "data": ["був"],
+     "upos": "AUX", "xpos": "Vapis-sm", "name": "Verb"},
+    {"_id": 2, "type": "static", "data": ["і", "й", "та"],
+     "upos": "CCONJ", "xpos": "Ccs", "name": "Conjunction"},
+    {"_id": 3, "type": "static", "data": ["у", "в"],
+     "upos": "ADP", "xpos": "Spsl", "name": "Adposition"},
+    {"_id": 4, "type": "rules", "data": ["ами", "ах"],
+     "upos": "NOUN", "xpos": "Ncfpi", "name": "Noun"},
+    {"_id": 5, "type": "rules", "data": ["ний", "ий"],
+     "upos": "ADJ", "xpos": "Afpmsnf", "name": "Adjective"},
+    {"_id": 6, "type": "rules", "data": ["ла", "в"],
+     "upos": "VERB", "xpos": "Vmpis-sf", "name": "Verb"},
+    {"_id": 7, "type": "rules", "data": ["а"],
+     "upos": "NOUN", "xpos": "Ncfsnn", "name": "Noun"},
+]
+
+
+class DictStorage(RuleStorage):
+    """Storage which keeps documents in a list and searches them by brute
+    force, like MongoDB would do. Calls of each method are counted.
+
+    Properties:
+        rules (list of dict): Stored documents.
+        calls (dict): {name of method: number of calls}.
+
+    """
+
+    name = "rules"
+
+    def __init__(self, documents):
+        self.rules = [copyRule(document) for document in documents]
+        self.calls = dict()
+
+    def count(self, method):
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    def documents(self, types=None):
+        self.count("documents")
+        return iter([
+            copyRule(document) for document in self.rules
+            if types is None or document.get("type") in types
+        ])
+
+    def rulesForMany(self, tokens):
+        self.count("rulesForMany")
+        return {
+            token: [
+                copyRule(rule) for rule in self.rules
+                if rule["type"] == "rules" and
+                any(affix in token for affix in rule["data"])
+            ]
+            for token in tokens
+        }
+
+    def wordRulesMany(self, type, tokens):
+        self.count("wordRulesMany")
+        return {
+            token: [
+                copyRule(rule) for rule in self.rules
+                if rule["type"] == type and token in rule["data"]
+            ]
+            for token in tokens
+        }
+
+
+@pytest.fixture
+def documents():
+    return [dict(document) for document in DOCUMENTS]
+
+
+@pytest.fixture
+def storage(documents):
+    return DictStorage(documents)
+
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data",
+                      "sample.conllu")
+
+
+def readLines(reader):
+    """Returns all the lines of the reader with fields converted to dicts.
+    """
+
+    lines = list()
+
+    while True:
+        try:
+            line = reader.nextLine()
+        except EOFError:
+            return lines
+        if line["type"] == reader.DATALINE:
+            line["data"] = dict(line["data"])
+        lines.append(line)
+
+
+def readSentences(reader, **kwargs):
+    """Returns all the sentences of the reader with fields converted to
+    dicts.
+    """
+
+    sentences = list(reader.sentences(**kwargs))
+
+    for sentence in sentences:
+        for line in sentence["sentence"]:
+            line["data"] = dict(line["data"])
+
+    return sentences
+
+
+@pytest.fixture
+def sample(tmp_path):
+    """Copy of the sample corpus in a temporary directory, so sidecar files
+    don't appear in the tree.
+    """
+
+    path = tmp_path / "sample.conllu"
+    with open(SAMPLE, "rb") as fp:
+        path.write_bytes(fp.read())
+
+    return str(path)
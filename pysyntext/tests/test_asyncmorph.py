@@ -0,0 +1,76 @@
+from conftest import DictStorage
+from libs.asyncmorph import AsyncMorphologyRecognizer
+from libs.morphology import MorphologyRecognizer
+from libs.storage import SQLiteStorage
+import asyncio
+import pytest
+
+
+TOKENS = [
+    "Мама", "була", "у", "місті", "з", "дітьми", "і", "мама", "був",
+    "новий", "в", "хатах", "і", "зелений", "мама"
+]
+
+
+def recognizer(collection, **kwargs):
+    return MorphologyRecognizer(
+        collection, applierFunc=MorphologyRecognizer.selectFirst,
+        applySpecial=False, **kwargs
+    )
+
+
+def recognizeAsync(recognizer, tokens):
+    wrapper = AsyncMorphologyRecognizer(recognizer)
+    try:
+        return asyncio.run(wrapper.recognizeMany(tokens))
+    finally:
+        wrapper.close()
+
+
+@pytest.mark.parametrize("kwargs", [
+    dict(), dict(indexLexicon=True), dict(cacheSize=4)
+])
+def test_async_equals_sync(documents, kwargs):
+    expected = recognizer(DictStorage(documents)).recognizeMany(TOKENS)
+    result = recognizeAsync(recognizer(DictStorage(documents), **kwargs),
+                            TOKENS)
+
+    assert result == expected
+    assert any(item is None for item in result)
+
+
+def test_repeated_tokens_are_copied(storage):
+    result = recognizeAsync(recognizer(storage), ["мама", "Мама"])
+
+    assert result[0] == result[1]
+    assert result[0] is not result[1]
+
+
+def test_rules_are_requested_after_word_misses(storage):
+    wrapper = AsyncMorphologyRecognizer(recognizer(storage))
+    try:
+        asyncio.run(wrapper.recognize("та"))
+        assert "rulesForMany" not in storage.calls
+        asyncio.run(wrapper.recognize("мама"))
+        assert storage.calls["rulesForMany"] == 1
+    finally:
+        wrapper.close()
+
+
+def test_sqlite_from_threads(documents):
+    sqlite = SQLiteStorage(":memory:")
+    sqlite.insertMany(documents)
+    try:
+        expected = recognizer(DictStorage(documents)).recognizeMany(TOKENS)
+        result = recognizeAsync(recognizer(sqlite), TOKENS)
+    finally:
+        sqlite.close()
+
+    # "_id" is stored as JSON, so it's compared without it
+    assert [
+        item and {key: item[key] for key in item if key != "_id"}
+        for item in result
+    ] == [
+        item and {key: item[key] for key in item if key != "_id"}
+        for item in expected
+    ]
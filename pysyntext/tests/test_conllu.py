@@ -0,0 +1,46 @@
+from conftest import SAMPLE, readLines
+from libs.ud.conllu import ConlluReader, PrependedFile
+import io
+
+
+def test_prepended_file_reads_text_first():
+    stream = PrependedFile("ab\ncd", io.StringIO("ef\ngh\n"))
+
+    assert isinstance(stream, io.TextIOBase)
+    assert stream.readline(1) == "a"
+    assert stream.readline() == "b\n"
+    assert stream.tell() == 3
+    assert stream.readline(4) == "cdef"
+    assert stream.readline() == "\n"
+    assert list(stream) == ["gh\n"]
+    assert stream.tell() == 11
+    assert stream.read() == ""
+
+
+def test_prepended_file_read_sizes():
+    stream = PrependedFile("abc", io.StringIO("def"))
+
+    assert stream.read(2) == "ab"
+    assert stream.read(2) == "cd"
+    assert stream.tell() == 4
+    assert stream.read() == "ef"
+    assert not stream.seekable()
+
+
+def test_header_of_unseekable_stream():
+    with open(SAMPLE, encoding="utf-8") as fp:
+        content = fp.read()
+        fp.seek(0)
+        expected = readLines(ConlluReader(fp, useIndex=False))
+
+    class Stream(io.StringIO):
+        name = "<stream>"
+
+        def seekable(self):
+            return False
+
+    reader = ConlluReader(Stream(content), useIndex=False)
+
+    assert reader.get("newdoc id") == "sample"
+    assert isinstance(reader.file, PrependedFile)
+    assert readLines(reader) == expected
@@ -0,0 +1,94 @@
+from libs.arrproc import isSupsetTo
+from libs.morphology import Prioritizer
+from libs.ud.featcodec import FeatureCodec, CodecOverflow
+import random
+import pytest
+
+
+VALUES = {
+    "upos": ["NOUN", "ADJ", "VERB", "PRON"],
+    "Case": ["Nom", "Gen", "Loc"],
+    "Gender": ["Masc", "Fem", "Neut"],
+    "Number": ["Sing", "Plur"],
+    "Animacy": ["Anim", "Inan", "Unknown"],
+    "xpos": ["Ncfsnn", "Ncmsnn", "Afpmsnf"],
+}
+
+
+def randomTokens(rand, n, p=0.6):
+    return [
+        {
+            key: rand.choice(values) for key, values in VALUES.items()
+            if rand.random() < p
+        }
+        for _ in range(n)
+    ]
+
+
+def test_encode_decode():
+    codec = FeatureCodec(extra=["xpos"])
+
+    for token in randomTokens(random.Random(1), 200):
+        decoded = codec.decode(codec.encode({**token, "word": "мама"}))
+        assert decoded == token
+
+
+def test_comparisons_equal_dicts():
+    codec = FeatureCodec(extra=["xpos"])
+    rand = random.Random(2)
+    tokens = randomTokens(rand, 100)
+
+    for a in tokens:
+        for b in rand.sample(tokens, 10):
+            ca, cb = codec.encode(a), codec.encode(b)
+            common = [key for key in codec.fields
+                      if key in a and key in b and a[key] == b[key]]
+            differs = [key for key in codec.fields
+                       if key in a and key in b and a[key] != b[key]]
+
+            assert codec.names(codec.common(ca, cb)) == common
+            assert codec.names(codec.differs(ca, cb)) == differs
+            assert codec.contains(ca, cb) == (
+                all(key in a for key in b) and
+                isSupsetTo(a, b)
+            )
+            for key in b:
+                assert codec.has(codec.present(cb), key)
+            assert codec.names(codec.mask(b)) == [
+                key for key in codec.fields if key in b
+            ]
+
+
+def test_overflow():
+    codec = FeatureCodec(width=2)
+
+    for value in ["a", "b", "c"]:
+        codec.encode({"Abbr": value})
+    with pytest.raises(CodecOverflow):
+        codec.encode({"Abbr": "d"})
+
+
+@pytest.mark.parametrize("extra", [(), ("xpos",)])
+def test_prioritizer_codes_equal_dicts(extra):
+    li = [
+        {"__what": {"upos": "NOUN", "Case": "Gen"},
+         "__replace": {"upos": "ADJ", "Case": "Nom"}},
+        {"__what": {"xpos": "Ncfsnn"},
+         "__replace": {"upos": "PRON", "xpos": "Pp"}},
+        {"__what": {"Number": "Plur"},
+         "__replace": {"Gender": "Masc"}},
+    ]
+    rand = random.Random(3)
+    plain = Prioritizer(li)
+    coded = Prioritizer(li, FeatureCodec(extra=extra))
+
+    for token in randomTokens(rand, 300, 0.95):
+        response = randomTokens(rand, 3) + [dict(li[rand.randrange(3)][
+            "__replace"
+        ])]
+        # Dicts raise KeyError for tokens without properties of "__what"
+        try:
+            expected = plain.apply(dict(token), response)
+        except KeyError:
+            continue
+        assert coded.apply(dict(token), response) == expected
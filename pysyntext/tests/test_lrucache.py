@@ -0,0 +1,40 @@
+from libs.lrucache import LRUCache
+import pytest
+
+
+def test_eviction_and_statistics():
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is LRUCache.MISSING
+    assert cache.get("b", None) is None
+    assert cache.get("c") == 3
+    assert cache.info() == {
+        "hits": 2, "misses": 2, "evictions": 1, "size": 2, "maxsize": 2
+    }
+
+    cache.clear()
+    assert len(cache) == 0 and cache.info()["hits"] == 0
+
+
+def test_values_are_not_copied():
+    cache = LRUCache()
+    value = {"upos": "NOUN"}
+    cache.put("мама", value)
+
+    assert cache.get("мама") is value
+
+
+def test_none_is_cached():
+    cache = LRUCache()
+    cache.put("x", None)
+
+    assert cache.get("x") is None
+
+
+def test_size_must_be_positive():
+    with pytest.raises(ValueError):
+        LRUCache(0)
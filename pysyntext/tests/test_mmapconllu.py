@@ -0,0 +1,90 @@
+from conftest import readLines
+from libs.ud.conllu import ConlluReader
+from libs.ud.mmapconllu import MmapConlluReader, UNREAD
+import pytest
+
+
+def expected(path):
+    with open(path, encoding="utf-8") as fp:
+        return readLines(ConlluReader(fp, strict=False, useIndex=False))
+
+
+@pytest.mark.parametrize("strict", [False, True])
+def test_lines_equal_baseline(sample, strict):
+    with open(sample, encoding="utf-8") as fp:
+        with MmapConlluReader(fp, strict=strict, useIndex=False) as reader:
+            assert readLines(reader) == expected(sample)
+
+
+def test_line_endings(tmp_path, sample):
+    with open(sample, "rb") as fp:
+        content = fp.read()
+
+    crlf = tmp_path / "crlf.conllu"
+    crlf.write_bytes(content.replace(b"\n", b"\r\n"))
+    unterminated = tmp_path / "unterminated.conllu"
+    unterminated.write_bytes(content.rstrip(b"\n"))
+
+    for path in [crlf, unterminated]:
+        with open(path, encoding="utf-8", newline="") as fp:
+            with MmapConlluReader(fp, useIndex=False) as reader:
+                lines = readLines(reader)
+        with open(path, encoding="utf-8") as fp:
+            assert lines == readLines(
+                ConlluReader(fp, strict=False, useIndex=False)
+            )
+
+
+def test_empty_file_and_missing_fields(tmp_path):
+    empty = tmp_path / "empty.conllu"
+    empty.write_bytes(b"")
+    with open(empty, encoding="utf-8") as fp:
+        with MmapConlluReader(fp, useIndex=False) as reader:
+            assert readLines(reader) == []
+
+    for line in [b"1\tw\tl\tNOUN\n", b"1\tw\tl\tNOUN\t_\t_\t0\tr\t_\t_\t_\n"]:
+        broken = tmp_path / "broken.conllu"
+        broken.write_bytes(line)
+        with open(broken, encoding="utf-8") as fp:
+            with MmapConlluReader(fp, useIndex=False) as reader:
+                with pytest.raises(TypeError):
+                    reader.nextLine()
+
+
+def test_unspecified_upos_is_blank(tmp_path):
+    path = tmp_path / "mwt.conllu"
+    path.write_bytes("1-2\tУ хаті\t_\t_\t_\t_\t_\t_\t_\t_\n".encode("utf-8"))
+
+    with open(path, encoding="utf-8") as fp:
+        with MmapConlluReader(fp, useIndex=False) as reader:
+            assert reader.nextLine() == {"type": reader.BLANKLINE}
+
+
+def test_columns_are_decoded_lazily(sample):
+    with open(sample, encoding="utf-8") as fp:
+        with MmapConlluReader(fp, useIndex=False) as reader:
+            reader.skipLines(3)
+            data = reader.nextLine()["data"]
+
+            assert data["form"] == "Мама"
+            assert [value is UNREAD for value in data.values].count(
+                False
+            ) == 1
+
+
+def test_close_unmaps_file(sample):
+    with open(sample, encoding="utf-8") as fp:
+        with MmapConlluReader(fp, useIndex=False) as reader:
+            sentence = reader.nextSentence()
+        assert reader.mapped.closed
+        assert not fp.closed
+
+    with pytest.raises(ValueError):
+        sentence["sentence"][0]["data"]["lemma"]
+
+
+def test_skip_with_index(sample):
+    with open(sample, encoding="utf-8") as fp:
+        with MmapConlluReader(fp, saveIndex=False) as reader:
+            reader.skip(2)
+            assert reader.nextSentence()["metadata"]["sent_id"] == "3"
@@ -0,0 +1,120 @@
+from conftest import DictStorage
+from libs.morphology import MorphologyRecognizer
+from libs.snapshot import RuleSnapshot
+from libs.ud.mte import MTEParser
+import pytest
+
+
+TOKENS = [
+    "Мама", "була", "у", "місті", "з", "дітьми", "і", "мама", "був",
+    "новий", "в", "хатах", "і", "зелений", "мама"
+]
+
+
+def recognizer(storage, **kwargs):
+    kwargs.setdefault("applierFunc", MorphologyRecognizer.selectFirst)
+    return MorphologyRecognizer(storage, applySpecial=False, **kwargs)
+
+
+@pytest.mark.parametrize("showDB", [False, True])
+def test_cached_results_are_not_shared(storage, showDB):
+    cached = recognizer(storage, cacheSize=8)
+    expected = recognizer(storage).recognize("мама", showDB=showDB)
+
+    first = cached.recognize("мама", showDB=showDB)
+    (first[0] if showDB else first)["word"] = "мама"
+    if showDB:
+        first[1][0]["data"].append("x")
+
+    assert cached.recognize("мама", showDB=showDB) == expected
+    assert cached.recognizeMany(["мама"], showDB=showDB) == [expected]
+    assert cached.cacheInfo()["hits"] == 2
+
+
+def test_cached_recognize_many(storage):
+    cached = recognizer(storage, cacheSize=4)
+    expected = recognizer(storage).recognizeMany(TOKENS)
+
+    assert cached.recognizeMany(TOKENS) == expected
+    result = cached.recognizeMany(TOKENS)
+    assert result == expected
+    assert result[0] is not result[7]
+
+    for item in result:
+        if item is not None:
+            item["word"] = "?"
+    assert cached.recognizeMany(TOKENS) == expected
+
+    cached.clearCache()
+    assert cached.cacheInfo()["size"] == 0
+
+
+FAST = [
+    dict(indexRules=True),
+    dict(indexLexicon=True),
+    dict(indexRules=True, indexLexicon=True),
+    dict(indexRules=True, indexLexicon=True, cacheSize=4),
+    dict(snapshot=True),
+    dict(snapshot=True, cacheSize=100),
+]
+
+
+@pytest.mark.parametrize("kwargs", FAST)
+@pytest.mark.parametrize("applierFunc", [
+    MorphologyRecognizer.selectFirst, MorphologyRecognizer.selectByEnding
+])
+def test_fast_paths_equal_baseline(tmp_path, documents, kwargs, applierFunc):
+    def make(**kwargs):
+        return MorphologyRecognizer(
+            DictStorage(documents), tagparser=MTEParser(),
+            applierFunc=applierFunc, applySpecial=False, **kwargs
+        )
+
+    baseline = make()
+    expected = {
+        options: [baseline.recognize(token, *options) for token in TOKENS]
+        for options in [(True, False), (False, False), (True, True)]
+    }
+
+    if kwargs.get("snapshot"):
+        path = str(tmp_path / "rules.snapshot")
+        RuleSnapshot.compile(DictStorage(documents), path, MTEParser())
+        kwargs = {**kwargs, "snapshot": path}
+
+    fast = make(**kwargs)
+    for options, results in expected.items():
+        for _ in range(2):
+            assert [
+                fast.recognize(token, *options) for token in TOKENS
+            ] == results
+            assert fast.recognizeMany(TOKENS, *options) == results
+
+    if fast.snapshot is not None:
+        fast.snapshot.close()
+
+
+def test_select_by_edge_equals_select_by_ending(storage):
+    expected = recognizer(
+        storage, applierFunc=MorphologyRecognizer.selectByEnding
+    ).recognizeMany(TOKENS)
+
+    for indexRules in [True, False]:
+        byEdge = MorphologyRecognizer(
+            storage, applierFunc=MorphologyRecognizer.selectByEdge,
+            applySpecial=False, indexRules=indexRules
+        )
+
+        # Rules are loaded only for the index
+        assert (byEdge.edgeTrie is not None) == indexRules
+        assert storage.calls.get("documents", 0) == 1
+        assert byEdge.recognizeMany(TOKENS) == expected
+        assert [byEdge.recognize(token) for token in TOKENS] == expected
+
+
+def test_stages_are_applied_in_order(storage):
+    result = recognizer(storage).recognize("був", withApplier=False)
+
+    # "exceptions" win over "rules" which contain "в"
+    assert [rule["_id"] for rule in result] == [1]
+    assert recognizer(storage).recognize("в")["_id"] == 3
+    assert recognizer(storage).recognize("хліб") is None
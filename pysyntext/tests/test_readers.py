@@ -0,0 +1,197 @@
+from conftest import readLines, readSentences
+from libs.streams import openText
+from libs.ud.conllu import ConlluReader
+from libs.ud.conllucache import CachedConlluReader, TreebankCache
+from libs.ud.conlluindex import SentenceIndex
+from libs.ud.fastconllu import FastConlluReader
+from libs.ud.mmapconllu import MmapConlluReader
+from libs.ud.parallelconllu import parallelSentences
+import bz2
+import gzip
+import lzma
+import os
+import pytest
+
+
+READERS = [FastConlluReader, MmapConlluReader, CachedConlluReader]
+
+
+def baseline(path, **kwargs):
+    with open(path, encoding="utf-8") as fp:
+        return readSentences(ConlluReader(fp, useIndex=False), **kwargs)
+
+
+@pytest.mark.parametrize("Reader", READERS)
+def test_readers_equal_baseline(sample, Reader):
+    with open(sample, encoding="utf-8") as fp:
+        assert readSentences(Reader(fp, useIndex=False)) == baseline(sample)
+
+    with open(sample, encoding="utf-8") as fp:
+        expected = readLines(ConlluReader(fp, ignoreComments=True))
+    with open(sample, encoding="utf-8") as fp:
+        assert readLines(Reader(fp, ignoreComments=True)) == expected
+
+
+@pytest.mark.parametrize("Reader", [ConlluReader] + READERS)
+@pytest.mark.parametrize("useIndex", [False, True])
+def test_skipping(sample, Reader, useIndex):
+    expected = baseline(sample)
+
+    for offset in range(len(expected) + 1):
+        with open(sample, encoding="utf-8") as fp:
+            reader = Reader(fp, useIndex=useIndex)
+            assert readSentences(reader, offset=offset) == expected[offset:]
+
+    with open(sample, encoding="utf-8") as fp:
+        reader = Reader(fp, useIndex=useIndex)
+        reader.skipTokens(5)
+        assert reader.nextLine()["data"]["form"] == "ліс"
+
+
+@pytest.mark.parametrize("Reader", [ConlluReader] + READERS)
+def test_random_access(sample, Reader):
+    expected = baseline(sample)
+
+    with open(sample, encoding="utf-8") as fp:
+        reader = Reader(fp)
+        assert readSentences(reader, limit=1) == expected[:1]
+
+        sentence = reader.sentenceAt(2)
+        for line in sentence["sentence"]:
+            line["data"] = dict(line["data"])
+        assert sentence == expected[2]
+
+        assert len(list(reader.sentenceRange(1, 10))) == 3
+        with pytest.raises(IndexError):
+            reader.sentenceAt(4)
+
+
+def test_index_sidecar(sample):
+    sidecar = SentenceIndex.sidecar(sample)
+
+    with open(sample, encoding="utf-8") as fp:
+        ConlluReader(fp).skip(1)
+    assert not os.path.exists(sidecar)
+
+    with open(sample, encoding="utf-8") as fp:
+        ConlluReader(fp, saveIndex=True).skip(1)
+    index = SentenceIndex.read(sample)
+    assert index is not None
+    assert len(index) == 4
+    assert list(index.tokens) == [0, 4, 7, 11, 13]
+
+    # Sidecar of the changed file is stale
+    with open(sample, "a", encoding="utf-8") as fp:
+        fp.write(
+            "# sent_id = 5\n"
+            "1\tліс\tліс\tNOUN\tNcmsnn\t_\t0\troot\t_\t_\n\n"
+        )
+    assert SentenceIndex.read(sample) is None
+
+    with open(sample, encoding="utf-8") as fp:
+        reader = ConlluReader(fp, saveIndex=True)
+        reader.skip(4)
+        assert reader.nextSentence()["metadata"]["sent_id"] == "5"
+    assert len(SentenceIndex.read(sample)) == 5
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("1-2\tДо\t_\t_\t_\t_\t_\t_\t_\t_", True),
+    ("1\t_\t_\tPUNCT\t_\t_\t0\troot\t_\t_", False),
+    # Line with missing fields isn't blank, reader fails on it
+    ("1\tДо\t_\t_\t_", False),
+])
+def test_unspecified_upos(tmp_path, line, expected):
+    assert SentenceIndex.unspecifiedUPOS(line) == expected
+    assert SentenceIndex.unspecifiedUPOS(line.encode()) == expected
+
+    path = str(tmp_path / "line.conllu")
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(line + "\n")
+    with open(path, encoding="utf-8") as fp:
+        reader = ConlluReader(fp, useIndex=False)
+        blank = reader.lineType(reader.rawLine()) == reader.BLANKLINE
+    assert blank == expected
+    assert len(SentenceIndex.build(path)) == int(expected)
+
+
+def test_index_of_unterminated_file(tmp_path, sample):
+    path = str(tmp_path / "unterminated.conllu")
+    with open(sample, "rb") as fp, open(path, "wb") as out:
+        out.write(fp.read().rstrip(b"\n") + b"\n")
+
+    # The last sentence isn't complete without a blank line
+    assert len(SentenceIndex.build(path)) == 3
+    with open(path, encoding="utf-8") as fp:
+        reader = ConlluReader(fp)
+        reader.skip(3)
+        assert reader.nextLine()["data"] == {"sent_id": "4"}
+
+
+@pytest.mark.parametrize("module", [gzip, bz2, lzma])
+def test_compressed(tmp_path, sample, module):
+    path = str(tmp_path / "sample.conllu.z")
+    with open(sample, "rb") as fp, module.open(path, "wb") as out:
+        out.write(fp.read())
+
+    expected = baseline(sample)
+
+    with open(path, "rb") as fp:
+        assert readSentences(ConlluReader(fp)) == expected
+    with openText(path) as fp:
+        assert readSentences(FastConlluReader(fp), offset=1) == expected[1:]
+    with open(path, "rb") as fp:
+        assert ConlluReader(fp).get("newdoc id") == "sample"
+
+
+def test_treebank_cache(sample):
+    sidecar = TreebankCache.sidecar(sample)
+    expected = baseline(sample)
+
+    with open(sample, encoding="utf-8") as fp:
+        assert readSentences(CachedConlluReader(fp)) == expected
+    assert os.path.exists(sidecar)
+    assert TreebankCache.read(sample) is not None
+
+    # Cache of non-strict parse can't be used strictly
+    os.remove(sidecar)
+    TreebankCache.load(sample, strict=False)
+    assert TreebankCache.read(sample, strict=True) is None
+    assert TreebankCache.read(sample, strict=False) is not None
+
+
+def test_treebank_cache_invalidation(sample):
+    with open(sample, encoding="utf-8") as fp:
+        readSentences(CachedConlluReader(fp))
+
+    with open(sample, "r+", encoding="utf-8") as fp:
+        content = fp.read().replace("Мама", "Тато")
+        fp.seek(0)
+        fp.write(content)
+    stat = os.stat(sample)
+    os.utime(sample, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert TreebankCache.read(sample) is None
+    with open(sample, encoding="utf-8") as fp:
+        sentences = readSentences(CachedConlluReader(fp))
+    assert sentences == baseline(sample)
+    assert sentences[0]["sentence"][0]["data"]["form"] == "Тато"
+
+    with open(TreebankCache.sidecar(sample), "wb") as fp:
+        fp.write(b"broken")
+    assert TreebankCache.read(sample) is None
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel(sample, ordered):
+    expected = baseline(sample)
+    sentences = list(parallelSentences(
+        sample, processes=2, size=1, pending=2, ordered=ordered
+    ))
+
+    if ordered:
+        assert sentences == expected
+    else:
+        key = lambda sentence: sentence["metadata"]["sent_id"]  # noqa E731
+        assert sorted(sentences, key=key) == expected
+    assert not os.path.exists(SentenceIndex.sidecar(sample))
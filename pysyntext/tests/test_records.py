@@ -0,0 +1,25 @@
+from libs.records import Shape, TokenRecord
+import pickle
+
+
+def test_shapes_are_capped(monkeypatch):
+    monkeypatch.setattr(Shape, "SHAPES", dict())
+    monkeypatch.setattr(Shape, "MAXSHAPES", 3)
+
+    word = TokenRecord({"word": "мама"})
+    records = [word.copy() for _ in range(2)]
+    for i, record in enumerate(records):
+        record[f"key{i}"] = i
+        record["upos"] = "NOUN"
+
+    # ("word",), ("word", "key0") and ("word", "key0", "upos") are shared
+    assert len(Shape.SHAPES) == 3
+    assert records[0].shape is Shape.of(("word", "key0", "upos"))
+    assert records[1].shape is not Shape.of(("word", "key1", "upos"))
+    assert list(word.shape.next) == ["key0"]
+
+    assert dict(records[1]) == {"word": "мама", "key1": 1, "upos": "NOUN"}
+    assert pickle.loads(pickle.dumps(records[1])) == records[1]
+    del records[1]["key1"]
+    del records[1]["upos"]
+    assert records[1].shape is word.shape
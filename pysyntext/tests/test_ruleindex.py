@@ -0,0 +1,77 @@
+from conftest import DictStorage
+from libs.morphology import MorphologyRecognizer
+from libs.ruleindex import AffixAutomaton, Lexicon, EdgeTrie
+import copy
+import random
+
+
+LETTERS = "абвгіо"
+
+
+def randomWord(rand, low=1, high=6):
+    return "".join(
+        rand.choice(LETTERS) for _ in range(rand.randint(low, high))
+    )
+
+
+def randomRules(rand, n):
+    rules = list()
+
+    for i in range(n):
+        type = rand.choice(["rules", "rules", "static", "exceptions"])
+        data = [
+            randomWord(rand, 0 if type == "rules" else 1, 3)
+            for _ in range(rand.randint(1, 4))
+        ]
+        rules.append({"_id": i, "type": type, "data": data, "upos": "X"})
+
+    return rules
+
+
+def test_affix_automaton_equals_storage():
+    rand = random.Random(4)
+    rules = randomRules(rand, 60)
+    storage = DictStorage(rules)
+    automaton = AffixAutomaton(storage.documents(["rules"]))
+
+    for _ in range(300):
+        token = randomWord(rand, 0, 8)
+        assert automaton.search(token) == storage.rulesFor(token)
+
+
+def test_lexicon_equals_storage():
+    rand = random.Random(5)
+    rules = randomRules(rand, 60)
+    storage = DictStorage(rules)
+    lexicon = Lexicon(storage.documents(Lexicon.TYPES))
+
+    for _ in range(300):
+        token = randomWord(rand, 1, 3)
+        for type in Lexicon.TYPES:
+            assert lexicon.get(type, token) == storage.wordRules(type, token)
+        assert lexicon.lookup(token) == (
+            storage.wordRules("exceptions", token) or
+            storage.wordRules("static", token)
+        )
+
+
+def test_edge_trie_equals_select_by_ending():
+    rand = random.Random(6)
+    rules = [rule for rule in randomRules(rand, 120) if rule["data"]]
+    trie = EdgeTrie(rules)
+    # Rules without "_id" are checked one by one
+    anonymous = [
+        {key: value for key, value in rule.items() if key != "_id"}
+        for rule in rules[:20]
+    ]
+
+    for _ in range(500):
+        bundle = rand.sample(rules + anonymous, rand.randint(0, 6))
+        token = randomWord(rand, 1, 8)
+        original = copy.deepcopy(bundle)
+
+        expected = MorphologyRecognizer.selectByEnding(bundle, token)
+        assert trie.select(bundle, token) == expected
+        assert EdgeTrie().select(bundle, token) == expected
+        assert MorphologyRecognizer.selectByEdge(bundle, token) == expected
+        assert bundle == original
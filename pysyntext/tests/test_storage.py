@@ -0,0 +1,41 @@
+from libs.morphology import MorphologyRecognizer
+from libs.storage import SQLiteStorage, asStorage
+import pytest
+
+
+def test_insert_many_replaces(tmp_path, documents):
+    path = str(tmp_path / "rules.db")
+
+    for _ in range(2):
+        storage = SQLiteStorage(path)
+        assert storage.insertMany(documents, replace=True) == len(documents)
+        storage.close()
+
+    storage = asStorage("sqlite:" + path)
+    assert list(storage.documents()) == documents
+    assert storage.wordRules("static", "у") == [documents[2]]
+    storage.insertMany(documents[:1])
+    assert len(list(storage.documents())) == len(documents) + 1
+    storage.close()
+
+
+def test_addresses(tmp_path, documents):
+    path = str(tmp_path / "rules.db")
+    storage = SQLiteStorage(path, name="ctx")
+    storage.insertMany(documents)
+    storage.close()
+
+    storage = asStorage(f"sqlite:{path}#ctx")
+    assert storage.name == "ctx"
+    assert list(storage.documents(["exceptions"])) == [documents[0]]
+    storage.close()
+
+    recognizer = MorphologyRecognizer(
+        f"sqlite:{path}#ctx", applierFunc=MorphologyRecognizer.selectFirst,
+        applySpecial=False
+    )
+    assert recognizer.recognize("був")["_id"] == 1
+    recognizer.storage.close()
+
+    with pytest.raises(ValueError):
+        asStorage("mongodb://localhost")
@@ -0,0 +1,102 @@
+from conftest import DictStorage, readLines
+from libs.asyncmorph import AsyncMorphologyRecognizer, AsyncContextualProcessor
+from libs.ctxmorph import ContextualProcessor
+from libs.morphology import MorphologyRecognizer
+from libs.tagcorpus import (
+    tagCorpus, tagCorpusAsync, textSentences, conlluSentences
+)
+from libs.ud.conllu import ConlluReader
+from libs.ud.conlluwriter import ConlluWriter
+from libs.ud.mte import MTEParser
+import asyncio
+import io
+import pytest
+
+
+TEXT = "Мама була у хатах. Зелений хліб!\n\nІ новий ліс був.\n"
+
+
+def recognizer(documents):
+    return MorphologyRecognizer(
+        DictStorage(documents), tagparser=MTEParser(),
+        applierFunc=MorphologyRecognizer.selectFirst, applySpecial=False
+    )
+
+
+# Processors have no Ctx19 rules to correct with
+def tagged(path, processor):
+    with ConlluWriter(open(path, "w", encoding="utf-8")) as writer:
+        return tagCorpus(textSentences(io.StringIO(TEXT)), processor, writer,
+                         window=2, correct=False)
+
+
+async def taggedAsync(path, processor):
+    with ConlluWriter(open(path, "w", encoding="utf-8")) as writer:
+        return await tagCorpusAsync(
+            textSentences(io.StringIO(TEXT)), processor, writer, window=2,
+            correct=False
+        )
+
+
+def readBack(path):
+    with open(path, encoding="utf-8") as fp:
+        # Tagger leaves HEAD and DEPREL unspecified
+        return readLines(ConlluReader(fp, strict=False, useIndex=False))
+
+
+def test_round_trip(tmp_path, documents):
+    path = str(tmp_path / "tagged.conllu")
+    processor = ContextualProcessor(recognizer(documents))
+
+    assert tagged(path, processor) == 3
+
+    lines = readBack(path)
+    tokens = [line["data"] for line in lines if line["type"] == 1]
+    expected = [
+        token for _, text in textSentences(io.StringIO(TEXT))
+        for token in processor.tagged(text)
+    ]
+
+    assert [token["form"] for token in tokens] == [
+        token["word"] for token in expected
+    ]
+    assert [token["upos"] for token in tokens] == [
+        token.get("upos", "X") for token in expected
+    ]
+    assert tokens[0]["feats"] == {
+        "Animate": "no", "Case": "nominative", "Gender": "feminine",
+        "Number": "singular", "Type": "common"
+    }
+    assert [
+        line["data"] for line in lines
+        if line["type"] == 0 and "sent_id" in line["data"]
+    ] == [{"sent_id": "1"}, {"sent_id": "2"}, {"sent_id": "3"}]
+
+    with open(path, encoding="utf-8") as fp:
+        assert [text for _, text in conlluSentences(
+            ConlluReader(fp, strict=False, useIndex=False)
+        )] == ["Мама була у хатах.", "Зелений хліб!", "І новий ліс був."]
+
+
+def test_async_equals_sync(tmp_path, documents):
+    sync = str(tmp_path / "sync.conllu")
+    tagged(sync, ContextualProcessor(recognizer(documents)))
+
+    wrapper = AsyncMorphologyRecognizer(recognizer(documents))
+    processor = AsyncContextualProcessor(wrapper)
+    paths = [str(tmp_path / name) for name in ["run", "awaited"]]
+
+    async def main():
+        # Running loop can't be blocked by tagCorpus
+        with pytest.raises(RuntimeError, match="await tagCorpusAsync"):
+            tagged(str(tmp_path / "nested"), processor)
+        return await taggedAsync(paths[1], processor)
+
+    try:
+        assert tagged(paths[0], processor) == 3
+        assert asyncio.run(main()) == 3
+    finally:
+        wrapper.close()
+
+    for path in paths:
+        assert readBack(path) == readBack(sync)
@@ -0,0 +1,33 @@
+import libs.timing as timing
+
+
+class Measured:
+
+    @timing.measured("double")
+    def double(self, value):
+        return value * 2
+
+
+def test_measured_only_while_enabled():
+    original = vars(Measured)["double"]
+    assert not hasattr(original, "__wrapped__")
+
+    timing.reset()
+    try:
+        timing.enable()
+        assert vars(Measured)["double"].__wrapped__ is original
+        assert Measured().double(2) == 4
+        with timing.stage("stage"):
+            pass
+    finally:
+        timing.disable()
+
+    assert vars(Measured)["double"] is original
+    assert Measured().double(3) == 6
+    with timing.stage("stage"):
+        pass
+
+    stats = timing.snapshot()
+    assert stats["double"]["count"] == 1
+    assert stats["stage"]["count"] == 1
+    timing.reset()
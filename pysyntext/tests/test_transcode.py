@@ -0,0 +1,30 @@
+from libs.ud.conllu import ConlluReader
+from libs.ud.transcode import batches, transcode
+import io
+import pytest
+
+
+@pytest.mark.parametrize("ending", ["\n", ""])
+def test_unterminated_files_are_not_merged(tmp_path, sample, ending):
+    path = str(tmp_path / "unterminated.conllu")
+    with open(sample, encoding="utf-8") as fp:
+        content = fp.read()
+    with open(path, "w", encoding="utf-8") as fp:
+        fp.write(content.rstrip("\n") + ending)
+
+    assert "".join(
+        line for batch in batches([path, sample], 3) for line in batch
+    ) == content * 2
+
+    expected = io.StringIO()
+    transcode([sample, sample], expected, processes=1, size=3)
+    output = io.StringIO()
+    assert transcode([path, sample], output, processes=1, size=3) == (
+        content.count("\n") * 2
+    )
+    assert output.getvalue() == expected.getvalue()
+
+    output.seek(0)
+    output.name = "output"
+    reader = ConlluReader(output, useIndex=False)
+    assert len(list(reader.sentences())) == 8
@@ -1,5 +1,29 @@
+from setuptools.command.build_py import build_py
+import importlib.util
+import os
 import setuptools
 
+
+class BuildWithTables(build_py):
+    """Compile tag tables of pysyntext/libs/ud into pickles, so parsers don't
+    build them at each start. See pysyntext/libs/ud/tables.py.
+    """
+
+    def run(self):
+        super().run()
+
+        spec = importlib.util.spec_from_file_location(
+            "tables", os.path.join("pysyntext", "libs", "ud", "tables.py")
+        )
+        tables = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(tables)
+
+        if not self.dry_run:
+            tables.dump(
+                os.path.join(self.build_lib, "pysyntext", "libs", "ud")
+            )
+
+
 with open("README.md", encoding="utf-8") as fp:
     long_description = fp.read()
 
@@ -26,6 +50,7 @@ setuptools.setup(
     keywords="nlp",
     packages=setuptools.find_packages(),
     package_data={"pysyntext": ["libs/ud/*.json", "*doc.md"]},
+    cmdclass={"build_py": BuildWithTables},
     python_requires=">3",
     project_urls={
         "Syntpump on GitHub": "https://github.com/syntpump"